@@ -11,6 +11,8 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 from difflib import get_close_matches, SequenceMatcher
 import re
@@ -22,17 +24,29 @@ from datetime import datetime
 import tkinter.simpledialog
 from threading import Thread
 import unicodedata
-from collections import defaultdict
+from collections import defaultdict, Counter, OrderedDict
 import time
-from functools import wraps
+import hashlib
+import math
+import copy
+import struct
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Thread, Lock
+import threading
 
 # Setup logging
 logging.basicConfig(filename='cbz_metadata.log', level=logging.INFO, format='%(asctime)s %(levelname)s:%(message)s')
 
 DUMP_PATH = "series.jsonl"
-CACHE_PATH = "api_cache.json"
+CACHE_PATH = "api_cache.json"  # legacy JSON cache, imported into API_CACHE_DB_PATH once
+API_CACHE_DB_PATH = "api_cache.db"
+API_CACHE_TTL = 30 * 24 * 3600  # seconds an API answer stays fresh
+API_CACHE_NEGATIVE_TTL = 24 * 3600  # "no results" answers expire sooner
+API_CACHE_MAX_ENTRIES = 200000
 DATABASE_PATH = "metadata_database.db"
 
 # Database initialization
@@ -158,13 +172,96 @@ class ToolTip:
 class SeriesDatabase:
     """Class to handle series metadata database operations"""
     
-    def __init__(self, db_path="series.db"):
+    # Connection tuning applied once per connection
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",   # readers never wait for a background writer
+        "PRAGMA synchronous = NORMAL",  # safe with WAL, no fsync per transaction
+        "PRAGMA cache_size = -16000",   # ~16 MB page cache per connection
+        "PRAGMA foreign_keys = ON",     # makes the alias ON DELETE CASCADE real
+        "PRAGMA temp_store = MEMORY",
+    )
+    
+    # Generated columns mirroring metadata_json fields used for filtering
+    # (column, expression, index collation or None); VIRTUAL, so they cost no
+    # row space and are always in sync with the JSON. Only columns compared
+    # by equality get an index: a '%term%' LIKE can't use one, so the title
+    # and genre columns just save re-parsing the JSON per condition.
+    _ANILIST_WEB = "json_extract(metadata_json, '$.Web')"
+    _ANILIST_AT = f"instr(lower({_ANILIST_WEB}), 'anilist.co/manga/')"
+    METADATA_COLUMNS = (
+        ("meta_series", "json_extract(metadata_json, '$.Series')", None),
+        ("meta_localized_series", "json_extract(metadata_json, '$.LocalizedSeries')", None),
+        ("meta_publisher", "json_extract(metadata_json, '$.Publisher')", "NOCASE"),
+        ("meta_genre", "json_extract(metadata_json, '$.Genre')", None),
+        ("meta_entry_id", "CAST(json_extract(metadata_json, '$.entry_id') AS TEXT)", "BINARY"),
+        # AniList id from the first anilist.co/manga/<id> link in Web (CAST keeps the leading digits)
+        ("meta_anilist_id",
+         f"CASE WHEN {_ANILIST_AT} > 0 "
+         f"THEN NULLIF(CAST(substr({_ANILIST_WEB}, {_ANILIST_AT} + 17) AS INTEGER), 0) END",
+         "BINARY"),
+    )
+    
+    # How metadata is stored: "compact" (minified JSON), "zlib" (plus long text
+    # values moved zlib-compressed into metadata_blob) or "zlib-dict" (the same
+    # with a preset dictionary trained on this database's own long values).
+    # Compression is opt-in, older builds can't read the packed fields: a
+    # database keeps the format recorded in storage_meta (STORAGE_FORMAT for
+    # one without), and only migrate_storage() or an explicit storage_format
+    # rewrites its rows.
+    STORAGE_FORMAT = "compact"
+    PACK_MIN_CHARS = 512  # string values this long or longer leave metadata_json
+    PACKED_KEY = "_packed"  # metadata_json key listing the fields kept in metadata_blob
+    # Fields read by SQL (generated columns, FTS, title lookups) always stay inline
+    INLINE_FIELDS = frozenset(("Series", "LocalizedSeries", "Publisher", "Genre", "entry_id", "Web",
+                               "Native", "Romaji", "Secondary"))
+    ZDICT_SIZE = 32 * 1024  # zlib uses at most a 32 KB window of the dictionary
+    ZDICT_TRAIN_MIN_ROWS = 64  # rows with long values needed before training a dictionary
+    
+    def __init__(self, db_path="series.db", storage_format=None):
         self.db_path = db_path
+        self._requested_format = storage_format
+        self.storage_format = storage_format or self.STORAGE_FORMAT
+        self._local = threading.local()
+        self.has_metadata_columns = False
+        self.has_search_index = False
+        self._zdicts = {}  # dictionary id -> bytes
+        self._zdict_id = None  # dictionary new blobs are compressed with
+        # series_name -> {"metadata": dict or None, "aliases": list}, least recently used first
+        self._cache = OrderedDict()
+        self._cache_lock = Lock()
+        self._cache_version = 0  # bumped by every invalidation, see _cache_put()
+        self.cache_hits = 0
+        self.cache_misses = 0
         self.init_database()
     
+    def _connect(self):
+        """This thread's long-lived connection, opened on first use.
+        
+        sqlite3 connections must stay on their thread, so each thread gets its
+        own; the per-connection statement cache then works as prepared
+        statements for the hot lookups.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, cached_statements=256)
+            for pragma in self.PRAGMAS:
+                try:
+                    conn.execute(pragma)
+                except sqlite3.Error as e:
+                    logging.warning(f"Could not apply '{pragma}': {e}")
+            self._local.conn = conn
+        return conn
+    
+    def close(self):
+        """Close this thread's connection (others close when their thread ends)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
     def init_database(self):
         """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -188,11 +285,395 @@ class SeriesDatabase:
                 )
             ''')
             
+            # Confirmed choices per normalized filename title, see save_resolution()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS title_resolutions (
+                    title_key TEXT PRIMARY KEY,
+                    entry_id TEXT,
+                    series_name TEXT,
+                    source TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            ''')
+            
             conn.commit()
         except Exception as e:
+            conn.rollback()
             logging.error(f"Error initializing database: {e}")
-        finally:
-            conn.close()
+        
+        self._migrate_metadata_columns()
+        self._init_search_index()
+        self._init_storage()
+    
+    # Full-text index over everything a series can be searched by. Trigram
+    # tokens make MATCH a case-insensitive substring search (what LIKE '%x%'
+    # did) that works for CJK titles too; rowid mirrors series_metadata.rowid.
+    _FTS_TITLES = ("COALESCE(json_extract({row}.metadata_json, '$.LocalizedSeries'), '') || char(10) || "
+                   "COALESCE(json_extract({row}.metadata_json, '$.Native'), '') || char(10) || "
+                   "COALESCE(json_extract({row}.metadata_json, '$.Romaji'), '')")
+    _FTS_ALIASES = ("(SELECT COALESCE(GROUP_CONCAT(alias, char(10)), '') FROM series_aliases "
+                    "WHERE series_name = {row}.series_name)")
+    FTS_MIN_TERM = 3  # shortest term a trigram index can match
+    
+    def _init_search_index(self):
+        """Create the series_fts index and the triggers keeping it in sync, filling it on first run"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        titles_new = self._FTS_TITLES.format(row="new")
+        aliases_new = self._FTS_ALIASES.format(row="new")
+        fts_row = "(SELECT rowid FROM series_metadata WHERE series_name = {row}.series_name)"
+        
+        try:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'series_fts'")
+            needs_fill = cursor.fetchone() is None
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS series_fts
+                USING fts5(series_name, aliases, titles, tokenize = 'trigram')
+            ''')
+            cursor.executescript(f'''
+                CREATE TRIGGER IF NOT EXISTS series_fts_insert AFTER INSERT ON series_metadata BEGIN
+                    INSERT INTO series_fts (rowid, series_name, aliases, titles)
+                    VALUES (new.rowid, new.series_name, {aliases_new}, {titles_new});
+                END;
+                CREATE TRIGGER IF NOT EXISTS series_fts_update
+                AFTER UPDATE OF series_name, metadata_json ON series_metadata BEGIN
+                    DELETE FROM series_fts WHERE rowid = old.rowid;
+                    INSERT INTO series_fts (rowid, series_name, aliases, titles)
+                    VALUES (new.rowid, new.series_name, {aliases_new}, {titles_new});
+                END;
+                CREATE TRIGGER IF NOT EXISTS series_fts_delete AFTER DELETE ON series_metadata BEGIN
+                    DELETE FROM series_fts WHERE rowid = old.rowid;
+                END;
+                CREATE TRIGGER IF NOT EXISTS series_fts_alias_insert AFTER INSERT ON series_aliases BEGIN
+                    UPDATE series_fts SET aliases = {aliases_new} WHERE rowid = {fts_row.format(row="new")};
+                END;
+                CREATE TRIGGER IF NOT EXISTS series_fts_alias_delete AFTER DELETE ON series_aliases BEGIN
+                    UPDATE series_fts SET aliases = {self._FTS_ALIASES.format(row="old")}
+                    WHERE rowid = {fts_row.format(row="old")};
+                END;
+            ''')
+            if needs_fill:
+                cursor.execute(f'''
+                    INSERT INTO series_fts (rowid, series_name, aliases, titles)
+                    SELECT sm.rowid, sm.series_name, {self._FTS_ALIASES.format(row="sm")},
+                           {self._FTS_TITLES.format(row="sm")}
+                    FROM series_metadata sm
+                ''')
+                logging.info(f"Built series search index for {cursor.rowcount} series")
+            conn.commit()
+            self.has_search_index = True
+        except Exception as e:
+            conn.rollback()
+            self.has_search_index = False
+            logging.warning(f"FTS5 series search index unavailable, using LIKE search: {e}")
+    
+    def _fts_query(self, search_term):
+        """FTS5 MATCH expression for a search box string, or None if LIKE must be used.
+        
+        Every term of FTS_MIN_TERM+ characters becomes a quoted substring that
+        must appear somewhere; shorter terms can't be looked up in a trigram
+        index, so filter_series() adds a LIKE condition for each of them.
+        """
+        if not self.has_search_index:
+            return None
+        terms = [term for term in search_term.split() if len(term) >= self.FTS_MIN_TERM]
+        if not terms:
+            return None
+        return " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+    
+    def _migrate_metadata_columns(self):
+        """Add missing METADATA_COLUMNS and their indexes to an existing series_metadata table.
+        
+        ALTER TABLE commits on its own, so a failed migration can't be rolled
+        back: each column is checked and added as a separate step, and a
+        later startup picks up where an interrupted one stopped. Generated
+        columns need SQLite 3.31+; until every column exists the filter
+        methods use the json_extract() expressions instead (correct, just slower).
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            for column, expression, collation in self.METADATA_COLUMNS:
+                # table_xinfo (unlike table_info) lists generated columns too
+                cursor.execute('PRAGMA table_xinfo(series_metadata)')
+                if column not in {row[1] for row in cursor.fetchall()}:
+                    cursor.execute(
+                        f'ALTER TABLE series_metadata ADD COLUMN {column} '
+                        f'GENERATED ALWAYS AS ({expression}) VIRTUAL'
+                    )
+                    logging.info(f"Added series_metadata column {column}")
+                if collation:
+                    cursor.execute(
+                        f'CREATE INDEX IF NOT EXISTS idx_series_{column} '
+                        f'ON series_metadata ({column} COLLATE {collation})'
+                    )
+                else:
+                    # Earlier builds indexed columns only ever matched with LIKE '%term%'
+                    cursor.execute(f'DROP INDEX IF EXISTS idx_series_{column}')
+                conn.commit()
+            self.has_metadata_columns = True
+        except Exception as e:
+            logging.warning(f"Generated metadata columns unavailable, filtering without indexes: {e}")
+    
+    def _metadata_column(self, column):
+        """SQL for a METADATA_COLUMNS field: the indexed column, or its expression if not migrated"""
+        if self.has_metadata_columns:
+            return column
+        return dict((name, expression) for name, expression, _ in self.METADATA_COLUMNS)[column]
+    
+    # Series kept decoded in memory (metadata and aliases), least recently used evicted
+    CACHE_SIZE = 512
+    
+    def _cache_get(self, series_name, kind):
+        """(hit, copy of the cached value, cache version to hand to _cache_put on a miss)"""
+        with self._cache_lock:
+            entry = self._cache.get(series_name)
+            if entry is not None and kind in entry:
+                self._cache.move_to_end(series_name)
+                self.cache_hits += 1
+                return True, copy.deepcopy(entry[kind]), self._cache_version
+            self.cache_misses += 1
+            return False, None, self._cache_version
+    
+    def _cache_put(self, series_name, kind, value, version):
+        """Cache a value read from the DB, unless a write invalidated anything since it was read"""
+        with self._cache_lock:
+            if version != self._cache_version:
+                return
+            self._cache.setdefault(series_name, {})[kind] = copy.deepcopy(value)
+            self._cache.move_to_end(series_name)
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+    
+    def _cache_invalidate(self, series_names=None, kind=None):
+        """Drop cached values for these series (all series if None), only `kind` if given"""
+        with self._cache_lock:
+            self._cache_version += 1
+            if series_names is None:
+                self._cache.clear()
+                return
+            for series_name in series_names:
+                if kind is None:
+                    self._cache.pop(series_name, None)
+                else:
+                    self._cache.get(series_name, {}).pop(kind, None)
+    
+    def cache_stats(self):
+        """Hit/miss counters and current size of the series cache"""
+        with self._cache_lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {"hits": self.cache_hits, "misses": self.cache_misses, "size": len(self._cache),
+                    "hit_rate": self.cache_hits / lookups if lookups else 0.0}
+    
+    def _init_storage(self):
+        """Add the storage columns/tables; migrate rows only if a different format was requested"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('PRAGMA table_xinfo(series_metadata)')
+            if 'metadata_blob' not in {row[1] for row in cursor.fetchall()}:
+                cursor.execute('ALTER TABLE series_metadata ADD COLUMN metadata_blob BLOB')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS storage_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS storage_dicts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    zdict BLOB NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            ''')
+            cursor.execute('SELECT MAX(id) FROM storage_dicts')
+            self._zdict_id = cursor.fetchone()[0]
+            cursor.execute("SELECT key, value FROM storage_meta WHERE key IN ('storage_format', 'zdict_attempt_rows')")
+            meta = dict(cursor.fetchall())
+            cursor.execute('SELECT COUNT(*) FROM series_metadata WHERE metadata_blob IS NOT NULL')
+            packed_rows = cursor.fetchone()[0]
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Error initializing metadata storage: {e}")
+            return
+        
+        stored_format = meta.get('storage_format')
+        if self._requested_format is None:
+            self.storage_format = stored_format or self.STORAGE_FORMAT
+            changed = False
+        else:
+            changed = stored_format != self._requested_format
+        
+        # A database that started empty gets its dictionary once there is enough to
+        # train on; after an attempt that found too little, wait for twice the rows
+        untrained = (self.storage_format == "zlib-dict" and self._zdict_id is None
+                     and packed_rows >= max(self.ZDICT_TRAIN_MIN_ROWS, 2 * int(meta.get('zdict_attempt_rows', 0))))
+        if changed or untrained:
+            self.migrate_storage()
+    
+    def _zdict(self, dict_id):
+        """Compression dictionary by id (cached after the first read)"""
+        zdict = self._zdicts.get(dict_id)
+        if zdict is None:
+            cursor = self._connect().cursor()
+            cursor.execute('SELECT zdict FROM storage_dicts WHERE id = ?', (dict_id,))
+            zdict = self._zdicts[dict_id] = cursor.fetchone()[0]
+        return zdict
+    
+    def _compress(self, data):
+        """Tagged zlib blob: b"Z" + stream, or b"D" + dictionary id + stream"""
+        if self.storage_format == "zlib-dict" and self._zdict_id is not None:
+            compressor = zlib.compressobj(9, zdict=self._zdict(self._zdict_id))
+            return b"D" + struct.pack(">I", self._zdict_id) + compressor.compress(data) + compressor.flush()
+        return b"Z" + zlib.compress(data, 9)
+    
+    def _decompress(self, blob):
+        blob = bytes(blob)
+        if blob[:1] == b"D":
+            (dict_id,) = struct.unpack(">I", blob[1:5])
+            decompressor = zlib.decompressobj(zdict=self._zdict(dict_id))
+            return decompressor.decompress(blob[5:]) + decompressor.flush()
+        return zlib.decompress(blob[1:])
+    
+    def _encode_metadata(self, metadata):
+        """(metadata_json, metadata_blob) for a metadata dict in the current storage format.
+        
+        Long text values are replaced by null in the compact JSON (keeping the
+        field order) and listed under PACKED_KEY; their values go compressed
+        into the blob.
+        """
+        inline = dict(metadata)
+        packed = {}
+        if self.storage_format != "compact":
+            for key, value in metadata.items():
+                if key not in self.INLINE_FIELDS and isinstance(value, str) and len(value) >= self.PACK_MIN_CHARS:
+                    packed[key] = value
+                    inline[key] = None
+        metadata_blob = None
+        if packed:
+            inline[self.PACKED_KEY] = list(packed)
+            metadata_blob = self._compress(json.dumps(packed, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        return json.dumps(inline, ensure_ascii=False, separators=(',', ':')), metadata_blob
+    
+    def _decode_metadata(self, metadata_json, metadata_blob):
+        """Metadata dict from any storage format (old indented rows included)"""
+        metadata = json.loads(metadata_json)
+        packed_keys = metadata.pop(self.PACKED_KEY, None) if isinstance(metadata, dict) else None
+        if packed_keys and metadata_blob is not None:
+            packed = json.loads(self._decompress(metadata_blob))
+            for key in packed_keys:
+                metadata[key] = packed.get(key, "")
+        return metadata
+    
+    @classmethod
+    def _train_zdict(cls, samples):
+        """Build a zlib preset dictionary from sample texts.
+        
+        Scores word pairs by (documents containing them x length) and keeps the
+        best up to ZDICT_SIZE, most valuable last since zlib reaches the end
+        of the dictionary with the shortest distances.
+        """
+        counts = Counter()
+        for sample in samples:
+            words = re.findall(r'\S+\s*', sample)
+            counts.update({a + b for a, b in zip(words, words[1:])})
+        
+        chosen = []
+        size = 0
+        for phrase, count in sorted(counts.items(), key=lambda item: item[1] * len(item[0]), reverse=True):
+            if count < 2:
+                continue
+            encoded = phrase.encode('utf-8')
+            if size + len(encoded) > cls.ZDICT_SIZE:
+                break
+            chosen.append(encoded)
+            size += len(encoded)
+        return b"".join(reversed(chosen))
+    
+    def migrate_storage(self, storage_format=None):
+        """Rewrite every row in storage_format (default: the current one); returns (before, after) storage reports.
+        
+        For "zlib-dict" a fresh dictionary is trained from the rows first (older
+        dictionaries stay, other blobs may still reference them). updated_at is
+        left alone, and the file is vacuumed afterwards to hand back the space.
+        """
+        if storage_format is not None:
+            if storage_format not in ("compact", "zlib", "zlib-dict"):
+                raise ValueError(f"Unknown storage format: {storage_format}")
+            self.storage_format = storage_format
+        before = self.storage_report()
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('SELECT series_name, metadata_json, metadata_blob FROM series_metadata')
+            rows = [(name, self._decode_metadata(metadata_json, blob)) for name, metadata_json, blob in cursor.fetchall()]
+            
+            if self.storage_format == "zlib-dict":
+                samples = [json.dumps(value, ensure_ascii=False)
+                           for _, metadata in rows for key, value in metadata.items()
+                           if key not in self.INLINE_FIELDS and isinstance(value, str)
+                           and len(value) >= self.PACK_MIN_CHARS]
+                zdict = self._train_zdict(samples) if len(samples) >= self.ZDICT_TRAIN_MIN_ROWS else b""
+                if zdict:
+                    cursor.execute('INSERT INTO storage_dicts (zdict, created_at) VALUES (?, ?)',
+                                   (zdict, datetime.now().isoformat()))
+                    self._zdict_id = cursor.lastrowid
+                    self._zdicts[self._zdict_id] = zdict
+                else:
+                    # Remembered so the next start doesn't retrain (and rewrite) for nothing
+                    cursor.execute("INSERT OR REPLACE INTO storage_meta (key, value) VALUES ('zdict_attempt_rows', ?)",
+                                   (str(len(samples)),))
+            
+            cursor.executemany(
+                'UPDATE series_metadata SET metadata_json = ?, metadata_blob = ? WHERE series_name = ?',
+                [self._encode_metadata(metadata) + (name,) for name, metadata in rows]
+            )
+            cursor.execute("INSERT OR REPLACE INTO storage_meta (key, value) VALUES ('storage_format', ?)",
+                           (self.storage_format,))
+            conn.commit()
+            self._cache_invalidate()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Error migrating metadata storage to '{self.storage_format}': {e}")
+            return before, before
+        
+        try:
+            conn.execute('VACUUM')
+        except sqlite3.Error as e:
+            logging.warning(f"Could not vacuum series database: {e}")
+        
+        after = self.storage_report()
+        logging.info(f"Migrated {len(rows)} series to '{self.storage_format}' storage: "
+                     f"{before['file_bytes']} -> {after['file_bytes']} bytes on disk")
+        return before, after
+    
+    def storage_report(self):
+        """Storage sizes: rows, JSON and blob bytes, the same data as indented JSON, and the file"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        report = {"format": self.storage_format, "rows": 0, "packed_rows": 0, "json_bytes": 0,
+                  "blob_bytes": 0, "pretty_bytes": 0, "file_bytes": 0, "free_bytes": 0}
+        
+        try:
+            cursor.execute('SELECT metadata_json, metadata_blob FROM series_metadata')
+            for metadata_json, metadata_blob in cursor:
+                report["rows"] += 1
+                report["json_bytes"] += len(metadata_json.encode('utf-8'))
+                if metadata_blob is not None:
+                    report["packed_rows"] += 1
+                    report["blob_bytes"] += len(metadata_blob)
+                metadata = self._decode_metadata(metadata_json, metadata_blob)
+                report["pretty_bytes"] += len(json.dumps(metadata, ensure_ascii=False, indent=2).encode('utf-8'))
+            page_size = cursor.execute('PRAGMA page_size').fetchone()[0]
+            report["file_bytes"] = cursor.execute('PRAGMA page_count').fetchone()[0] * page_size
+            report["free_bytes"] = cursor.execute('PRAGMA freelist_count').fetchone()[0] * page_size
+        except Exception as e:
+            logging.error(f"Error building storage report: {e}")
+        return report
     
     def save_series_metadata(self, series_name, metadata):
         """Save or update series metadata in the database"""
@@ -200,25 +681,30 @@ class SeriesDatabase:
             raise ValueError("Series name cannot be empty")
         
         series_name = series_name.strip()
-        metadata_json = json.dumps(metadata, ensure_ascii=False, indent=2)
+        metadata_json, metadata_blob = self._encode_metadata(metadata)
         
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
+            # Upsert rather than INSERT OR REPLACE: a replace deletes the row first,
+            # which would cascade to the series' aliases now that foreign keys are on
             cursor.execute('''
-                INSERT OR REPLACE INTO series_metadata 
-                (series_name, metadata_json, updated_at) 
-                VALUES (?, ?, ?)
-            ''', (series_name, metadata_json, datetime.now().isoformat()))
+                INSERT INTO series_metadata (series_name, metadata_json, metadata_blob, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(series_name) DO UPDATE SET
+                    metadata_json = excluded.metadata_json,
+                    metadata_blob = excluded.metadata_blob,
+                    updated_at = excluded.updated_at
+            ''', (series_name, metadata_json, metadata_blob, datetime.now().isoformat()))
             
             conn.commit()
+            self._cache_invalidate([series_name], "metadata")
             return True
         except Exception as e:
+            conn.rollback()
             logging.error(f"Error saving series metadata: {e}")
             return False
-        finally:
-            conn.close()
     
     def load_series_metadata(self, series_name):
         """Load series metadata from the database"""
@@ -226,28 +712,30 @@ class SeriesDatabase:
             return None
         
         series_name = series_name.strip()
-        conn = sqlite3.connect(self.db_path)
+        cached, metadata, version = self._cache_get(series_name, "metadata")
+        if cached:
+            return metadata
+        
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
             cursor.execute(
-                'SELECT metadata_json FROM series_metadata WHERE series_name = ?',
+                'SELECT metadata_json, metadata_blob FROM series_metadata WHERE series_name = ?',
                 (series_name,)
             )
             result = cursor.fetchone()
             
-            if result:
-                return json.loads(result[0])
-            return None
+            metadata = self._decode_metadata(result[0], result[1]) if result else None
+            self._cache_put(series_name, "metadata", metadata, version)
+            return metadata
         except Exception as e:
             logging.error(f"Error loading series metadata: {e}")
             return None
-        finally:
-            conn.close()
     
     def get_all_series(self):
         """Get all series names from the database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -258,8 +746,6 @@ class SeriesDatabase:
         except Exception as e:
             logging.error(f"Error getting all series: {e}")
             return []
-        finally:
-            conn.close()
     
     def delete_series(self, series_name):
         """Delete a series from the database (aliases are deleted automatically via CASCADE)"""
@@ -267,39 +753,24 @@ class SeriesDatabase:
             return False
         
         series_name = series_name.strip()
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
             cursor.execute('DELETE FROM series_metadata WHERE series_name = ?', (series_name,))
             conn.commit()
+            self._cache_invalidate([series_name])
             return cursor.rowcount > 0
         except Exception as e:
+            conn.rollback()
             logging.error(f"Error deleting series metadata: {e}")
             return False
-        finally:
-            conn.close()
     
     def search_series(self, search_term):
-        """Search for series by name (case-insensitive partial match)"""
+        """Search for series by name, alias or localized title (case-insensitive, ranked)"""
         if not search_term or not search_term.strip():
             return []
-        
-        search_term = f"%{search_term.strip()}%"
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute(
-                'SELECT series_name, updated_at FROM series_metadata WHERE series_name LIKE ? ORDER BY updated_at DESC',
-                (search_term,)
-            )
-            return [(row[0], row[1]) for row in cursor.fetchall()]
-        except Exception as e:
-            logging.error(f"Error searching series: {e}")
-            return []
-        finally:
-            conn.close()
+        return [(series_name, updated_at) for series_name, updated_at, _ in self.filter_series(search_term)]
     
     def save_series_aliases(self, series_name, aliases):
         """Save aliases for a series (replaces all existing aliases)"""
@@ -307,7 +778,7 @@ class SeriesDatabase:
             raise ValueError("Series name cannot be empty")
         
         series_name = series_name.strip()
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -323,12 +794,12 @@ class SeriesDatabase:
                 )
             
             conn.commit()
+            self._cache_invalidate([series_name], "aliases")
             return True
         except Exception as e:
+            conn.rollback()
             logging.error(f"Error saving series aliases: {e}")
             return False
-        finally:
-            conn.close()
     
     def load_series_aliases(self, series_name):
         """Load aliases for a series"""
@@ -336,7 +807,11 @@ class SeriesDatabase:
             return []
         
         series_name = series_name.strip()
-        conn = sqlite3.connect(self.db_path)
+        cached, aliases, version = self._cache_get(series_name, "aliases")
+        if cached:
+            return aliases
+        
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -344,16 +819,337 @@ class SeriesDatabase:
                 'SELECT alias FROM series_aliases WHERE series_name = ? ORDER BY alias',
                 (series_name,)
             )
-            return [row[0] for row in cursor.fetchall()]
+            aliases = [row[0] for row in cursor.fetchall()]
+            self._cache_put(series_name, "aliases", aliases, version)
+            return aliases
         except Exception as e:
             logging.error(f"Error loading series aliases: {e}")
             return []
-        finally:
-            conn.close()
+    
+    # Bound parameters per IN (...) query, well under SQLite's variable limit
+    IN_BATCH_SIZE = 500
+    
+    def _select_in(self, cursor, sql, values):
+        """Run sql (with a single {placeholders} slot) over values in IN batches, yielding rows"""
+        values = list(values)
+        for start in range(0, len(values), self.IN_BATCH_SIZE):
+            batch = values[start:start + self.IN_BATCH_SIZE]
+            cursor.execute(sql.format(placeholders=",".join("?" * len(batch))), batch)
+            yield from cursor.fetchall()
+    
+    def load_series_metadata_many(self, series_names):
+        """Load metadata for many series at once, as {series_name: metadata}.
+        
+        Cached series are served from the cache; the rest are read in bulk but
+        not added to it, so one large load doesn't flush the working set.
+        """
+        names = {name.strip() for name in series_names if name and name.strip()}
+        if not names:
+            return {}
+        
+        result = {}
+        missing = []
+        for name in names:
+            cached, metadata, _ = self._cache_get(name, "metadata")
+            if not cached:
+                missing.append(name)
+            elif metadata is not None:
+                result[name] = metadata
+        if not missing:
+            return result
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            rows = self._select_in(
+                cursor, 'SELECT series_name, metadata_json, metadata_blob FROM series_metadata '
+                        'WHERE series_name IN ({placeholders})',
+                missing)
+            result.update((name, self._decode_metadata(metadata_json, blob)) for name, metadata_json, blob in rows)
+            return result
+        except Exception as e:
+            logging.error(f"Error loading series metadata in bulk: {e}")
+            return {}
+    
+    def load_aliases_many(self, series_names):
+        """Load aliases for many series at once, as {series_name: [aliases]} (every name present)"""
+        names = {name.strip() for name in series_names if name and name.strip()}
+        aliases = {name: [] for name in names}
+        if not names:
+            return aliases
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            rows = self._select_in(
+                cursor, 'SELECT series_name, alias FROM series_aliases WHERE series_name IN ({placeholders}) '
+                        'ORDER BY series_name, alias',
+                names)
+            for name, alias in rows:
+                aliases[name].append(alias)
+            return aliases
+        except Exception as e:
+            logging.error(f"Error loading series aliases in bulk: {e}")
+            return aliases
+    
+    def save_series_many(self, items, resolutions=(), replace_aliases=True, keep_existing=False):
+        """Save many series in one transaction.
+        
+        items yields (series_name, metadata) or (series_name, metadata, aliases);
+        aliases, when given and not None, replace the series' existing ones
+        (or are added to them with replace_aliases=False). resolutions holds
+        (title, entry_id, series_name, source) tuples for save_resolution(),
+        written in the same transaction. keep_existing=True only creates the
+        metadata of new series and leaves saved templates untouched.
+        """
+        now = datetime.now().isoformat()
+        metadata_rows = []
+        alias_series = []
+        alias_rows = []
+        for item in items:
+            series_name, metadata = item[0], item[1]
+            aliases = item[2] if len(item) > 2 else None
+            if not series_name or not series_name.strip():
+                raise ValueError("Series name cannot be empty")
+            series_name = series_name.strip()
+            metadata_rows.append((series_name, *self._encode_metadata(metadata), now))
+            if aliases is not None:
+                alias_series.append((series_name,))
+                alias_rows.extend((series_name, alias.strip()) for alias in aliases if alias.strip())
+        if not metadata_rows:
+            return True
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        on_conflict = "DO NOTHING" if keep_existing else '''DO UPDATE SET
+                    metadata_json = excluded.metadata_json,
+                    metadata_blob = excluded.metadata_blob,
+                    updated_at = excluded.updated_at'''
+        
+        try:
+            cursor.executemany(f'''
+                INSERT INTO series_metadata (series_name, metadata_json, metadata_blob, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(series_name) {on_conflict}
+            ''', metadata_rows)
+            if replace_aliases:
+                cursor.executemany('DELETE FROM series_aliases WHERE series_name = ?', alias_series)
+            cursor.executemany('INSERT OR IGNORE INTO series_aliases (series_name, alias) VALUES (?, ?)', alias_rows)
+            cursor.executemany(self.RESOLUTION_UPSERT,
+                               [row for row in (self._resolution_row(*r) for r in resolutions) if row is not None])
+            conn.commit()
+            self._cache_invalidate([row[0] for row in metadata_rows])
+            return True
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Error saving series in bulk: {e}")
+            return False
+    
+    # Series per transaction when importing, and rows per fetch when exporting
+    IMPORT_CHUNK_SIZE = 1000
+    
+    def export_jsonl(self, path):
+        """Stream every series to a JSONL file, one series with its aliases per line; returns the count"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        count = 0
+        
+        cursor.execute('''
+            SELECT sm.series_name, sm.updated_at, sm.metadata_json, sm.metadata_blob,
+                   (SELECT json_group_array(sa.alias) FROM series_aliases sa
+                    WHERE sa.series_name = sm.series_name) as aliases
+            FROM series_metadata sm
+            ORDER BY sm.series_name
+        ''')
+        with open(path, 'w', encoding='utf-8') as f:
+            while True:
+                rows = cursor.fetchmany(self.IMPORT_CHUNK_SIZE)
+                if not rows:
+                    break
+                for series_name, updated_at, metadata_json, metadata_blob, aliases in rows:
+                    record = {
+                        "series_name": series_name,
+                        "updated_at": updated_at,
+                        "aliases": sorted(json.loads(aliases)),
+                        "metadata": self._decode_metadata(metadata_json, metadata_blob),
+                    }
+                    f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+                    count += 1
+        
+        logging.info(f"Exported {count} series to {path}")
+        return count
+    
+    def import_jsonl(self, path):
+        """Merge a JSONL export into this database, IMPORT_CHUNK_SIZE series per transaction.
+        
+        A series is written (metadata and aliases together) only if it is new
+        here or its updated_at is newer than the stored one, so importing the
+        same file twice or merging two databases both ways is safe. Returns
+        counts: inserted, updated, skipped (older or same age), invalid lines
+        and failed (series in chunks that could not be written).
+        """
+        stats = {"inserted": 0, "updated": 0, "skipped": 0, "invalid": 0, "failed": 0}
+        chunk = []
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    series_name = record["series_name"].strip()
+                    if not series_name or not isinstance(record["metadata"], dict):
+                        raise ValueError("empty series name or metadata")
+                    chunk.append((series_name, record["metadata"], record.get("aliases") or [],
+                                  record.get("updated_at") or datetime.now().isoformat()))
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    stats["invalid"] += 1
+                    logging.warning(f"Skipping invalid line {line_number} in {path}: {e}")
+                    continue
+                if len(chunk) >= self.IMPORT_CHUNK_SIZE:
+                    self._import_chunk(chunk, stats)
+                    chunk = []
+        if chunk:
+            self._import_chunk(chunk, stats)
+        
+        logging.info(f"Imported {path}: {stats}")
+        return stats
+    
+    def _import_chunk(self, chunk, stats):
+        """Upsert one import chunk in a single transaction (see import_jsonl)"""
+        # Last occurrence wins within a chunk
+        latest = {}
+        for item in chunk:
+            if item[0] not in latest or item[3] >= latest[item[0]][3]:
+                latest[item[0]] = item
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            stored = dict(self._select_in(
+                cursor, 'SELECT series_name, updated_at FROM series_metadata WHERE series_name IN ({placeholders})',
+                latest))
+            winners = [item for name, item in latest.items() if name not in stored or item[3] > stored[name]]
+            
+            # Aliases go in before their series (foreign keys checked at commit): the
+            # series_fts insert trigger then indexes each new series once with all its
+            # aliases instead of being re-run by every alias insert
+            cursor.execute('PRAGMA defer_foreign_keys = ON')
+            cursor.executemany('DELETE FROM series_aliases WHERE series_name = ?',
+                               [(name,) for name, _, _, _ in winners])
+            cursor.executemany('INSERT OR IGNORE INTO series_aliases (series_name, alias) VALUES (?, ?)',
+                               [(name, alias.strip()) for name, _, aliases, _ in winners
+                                for alias in aliases if isinstance(alias, str) and alias.strip()])
+            cursor.executemany('''
+                INSERT INTO series_metadata (series_name, metadata_json, metadata_blob, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(series_name) DO UPDATE SET
+                    metadata_json = excluded.metadata_json,
+                    metadata_blob = excluded.metadata_blob,
+                    updated_at = excluded.updated_at
+                WHERE excluded.updated_at > series_metadata.updated_at
+            ''', [(name, *self._encode_metadata(metadata), updated_at) for name, metadata, _, updated_at in winners])
+            conn.commit()
+            self._cache_invalidate([name for name, _, _, _ in winners])
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Error importing series chunk: {e}")
+            stats["failed"] += len(chunk)
+            return
+        
+        updated = sum(1 for name, _, _, _ in winners if name in stored)
+        stats["updated"] += updated
+        stats["inserted"] += len(winners) - updated
+        stats["skipped"] += len(chunk) - len(winners)
+    
+    RESOLUTION_UPSERT = '''
+        INSERT INTO title_resolutions (title_key, entry_id, series_name, source, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(title_key) DO UPDATE SET
+            entry_id = COALESCE(excluded.entry_id, entry_id),
+            series_name = COALESCE(excluded.series_name, series_name),
+            source = excluded.source,
+            updated_at = excluded.updated_at
+    '''
+    
+    @staticmethod
+    def _resolution_row(title, entry_id, series_name, source):
+        """RESOLUTION_UPSERT parameters, or None if there is no title or nothing to remember"""
+        title_key = normalize_romaji_cached(title.strip()) if title else ""
+        if not title_key or (entry_id in (None, "") and not series_name):
+            return None
+        return (title_key, str(entry_id) if entry_id not in (None, "") else None,
+                series_name.strip() if series_name else None, source, datetime.now().isoformat())
+    
+    def save_resolution(self, title, entry_id=None, series_name=None, source="dropdown"):
+        """Remember which dump entry and/or saved series a filename title resolved to.
+        
+        Only the given target is overwritten, so a title can keep both an
+        entry (used by Fetch) and a series (used by Match Series).
+        """
+        row = self._resolution_row(title, entry_id, series_name, source)
+        if row is None:
+            return False
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(self.RESOLUTION_UPSERT, row)
+            conn.commit()
+            return True
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Error saving title resolution: {e}")
+            return False
+    
+    def load_resolution(self, title):
+        """Learned resolution of a filename title as a dict, or None"""
+        title_key = normalize_romaji_cached(title.strip()) if title else ""
+        if not title_key:
+            return None
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(
+                'SELECT entry_id, series_name, source FROM title_resolutions WHERE title_key = ?',
+                (title_key,)
+            )
+            row = cursor.fetchone()
+            if row:
+                return {"entry_id": row[0], "series_name": row[1], "source": row[2]}
+            return None
+        except Exception as e:
+            logging.error(f"Error loading title resolution: {e}")
+            return None
+    
+    def delete_resolution(self, title):
+        """Forget what a filename title resolved to; returns True if something was forgotten"""
+        title_key = normalize_romaji_cached(title.strip()) if title else ""
+        if not title_key:
+            return False
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('DELETE FROM title_resolutions WHERE title_key = ?', (title_key,))
+            conn.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Error deleting title resolution: {e}")
+            return False
     
     def get_all_series_with_aliases(self):
         """Get all series with their aliases for matching"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
     
         try:
@@ -379,8 +1175,143 @@ class SeriesDatabase:
             logging.error(f"Error getting series with aliases: {e}")
             return []
     
-        finally:
-            conn.close()
+    def _search_like_condition(self):
+        """WHERE clause matching one LIKE pattern (4 params) against name, titles and aliases"""
+        return f'''(sm.series_name LIKE ?
+                OR {self._metadata_column("meta_series")} LIKE ?
+                OR {self._metadata_column("meta_localized_series")} LIKE ?
+                OR EXISTS (SELECT 1 FROM series_aliases a
+                           WHERE a.series_name = sm.series_name AND a.alias LIKE ?))'''
+    
+    def filter_series(self, search_term=None, publisher=None, genre=None, missing_field=None):
+        """Series with aliases matching every given filter, in get_all_series_with_aliases() format.
+        
+        search_term: case-insensitive substring search over the name, aliases
+        and localized titles, ranked by the series_fts index (name hits first)
+        when available, else an unindexed LIKE scan. publisher: exact
+        (case-insensitive, indexed). genre: substring of the Genre list,
+        checked per row. missing_field: metadata field that is absent or
+        empty. Unranked results are most recently updated first.
+        """
+        join = ""
+        join_params = []
+        conditions = []
+        params = []
+        order = "sm.updated_at DESC"
+        
+        fts_query = self._fts_query(search_term) if search_term else None
+        if fts_query:
+            # bm25 weights per column: series_name, aliases, titles (lower score ranks first)
+            join = '''JOIN (SELECT rowid AS fts_rowid, bm25(series_fts, 10.0, 5.0, 2.0) AS score
+                          FROM series_fts WHERE series_fts MATCH ?) f ON f.fts_rowid = sm.rowid'''
+            join_params.append(fts_query)
+            order = "f.score, sm.updated_at DESC"
+            # Terms too short for the trigram index must still match somewhere
+            for term in search_term.split():
+                if len(term) < self.FTS_MIN_TERM:
+                    conditions.append(self._search_like_condition())
+                    params.extend([f"%{term}%"] * 4)
+        elif search_term and search_term.strip():
+            conditions.append(self._search_like_condition())
+            params.extend([f"%{search_term.strip()}%"] * 4)
+        if publisher and publisher.strip():
+            conditions.append(f'{self._metadata_column("meta_publisher")} = ? COLLATE NOCASE')
+            params.append(publisher.strip())
+        if genre and genre.strip():
+            conditions.append(f'{self._metadata_column("meta_genre")} LIKE ?')
+            params.append(f"%{genre.strip()}%")
+        if missing_field:
+            # Long values moved to metadata_blob are null in the JSON but listed under PACKED_KEY
+            conditions.append(f'''COALESCE(json_extract(sm.metadata_json, ?), '') = ''
+                AND NOT EXISTS (SELECT 1 FROM json_each(sm.metadata_json, '$.{self.PACKED_KEY}')
+                                WHERE json_each.value = ?)''')
+            params.extend([f'$."{missing_field}"', missing_field])
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            # Aliases via a correlated subquery: bm25() is not allowed under a GROUP BY
+            cursor.execute(f'''
+                SELECT sm.series_name, sm.updated_at,
+                       (SELECT GROUP_CONCAT(sa.alias, '|') FROM series_aliases sa
+                        WHERE sa.series_name = sm.series_name) as aliases
+                FROM series_metadata sm
+                {join}
+                {where}
+                ORDER BY {order}
+            ''', join_params + params)
+            return [(row[0], row[1], row[2].split('|') if row[2] else []) for row in cursor.fetchall()]
+        except Exception as e:
+            logging.error(f"Error filtering series: {e}")
+            return []
+    
+    def get_distinct_publishers(self):
+        """Every non-empty Publisher value in the database, sorted (read from the index)"""
+        column = self._metadata_column("meta_publisher")
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(
+                f"SELECT DISTINCT {column} COLLATE NOCASE FROM series_metadata "
+                f"WHERE {column} != '' ORDER BY 1"
+            )
+            return [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            logging.error(f"Error getting publishers: {e}")
+            return []
+    
+    def find_series_by_id(self, entry_id=None, anilist_id=None):
+        """Most recently updated series saved with this dump entry_id or AniList id, or None"""
+        if entry_id:
+            condition, value = f'{self._metadata_column("meta_entry_id")} = ?', str(entry_id)
+        elif anilist_id and str(anilist_id).isdigit():
+            condition, value = f'{self._metadata_column("meta_anilist_id")} = ?', int(anilist_id)
+        else:
+            return None
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(
+                f'SELECT series_name FROM series_metadata WHERE {condition} ORDER BY updated_at DESC LIMIT 1',
+                (value,)
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            logging.error(f"Error finding series by id: {e}")
+            return None
+    
+    def load_title_fields_many(self, series_names):
+        """Alternative-title fields per series, as {series_name: {field: value}}.
+        
+        Extracted in SQL, so matching doesn't decode every full metadata blob.
+        """
+        names = {name.strip() for name in series_names if name and name.strip()}
+        if not names:
+            return {}
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            rows = self._select_in(
+                cursor, f'''SELECT series_name, {self._metadata_column("meta_localized_series")},
+                           json_extract(metadata_json, '$.Native'),
+                           json_extract(metadata_json, '$.Romaji'),
+                           json_extract(metadata_json, '$.Secondary')
+                    FROM series_metadata WHERE series_name IN ({{placeholders}})''',
+                names)
+            fields = ('LocalizedSeries', 'Native', 'Romaji', 'Secondary')
+            return {row[0]: {field: str(value or '') for field, value in zip(fields, row[1:])} for row in rows}
+        except Exception as e:
+            logging.error(f"Error loading series title fields: {e}")
+            return {}
+    
 
 
 
@@ -465,6 +1396,9 @@ class AliasEditorDialog(tk.Toplevel):
 
 # Initialize database
 series_db = SeriesDatabase()
+# Single background thread for series DB work started from dialogs (it gets its
+# own connection); submit() returns a Future
+series_db_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="series-db")
 
 local_dump = []
 if os.path.exists(DUMP_PATH):
@@ -474,15 +1408,323 @@ if os.path.exists(DUMP_PATH):
     except Exception as e:
         logging.error(f"Failed to load local dump: {e}")
 
-if os.path.exists(CACHE_PATH):
-    try:
-        with open(CACHE_PATH, 'r', encoding='utf-8') as f:
-            api_cache = json.load(f)
-    except Exception as e:
-        logging.error(f"Failed to load API cache: {e}")
-        api_cache = {}
-else:
-    api_cache = {}
+class ApiCache:
+    """SQLite-backed cache of API search results keyed by normalized query.
+    
+    Every write is a single-row upsert, so it costs the same at any cache
+    size; WAL mode lets several app instances share the file. Entries
+    expire after API_CACHE_TTL (API_CACHE_NEGATIVE_TTL for empty answers,
+    which are cached too) and the oldest entries beyond max_entries are
+    evicted every EVICT_EVERY writes.
+    """
+    
+    EVICT_EVERY = 1000
+    
+    def __init__(self, db_path=API_CACHE_DB_PATH, max_entries=API_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = Lock()
+        self.init_database()
+    
+    def _connect(self):
+        """This thread's connection (see SeriesDatabase._connect)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            for pragma in ("PRAGMA journal_mode = WAL", "PRAGMA synchronous = NORMAL"):
+                try:
+                    conn.execute(pragma)
+                except sqlite3.Error as e:
+                    logging.warning(f"Could not apply '{pragma}' to the API cache: {e}")
+            self._local.conn = conn
+        return conn
+    
+    def init_database(self):
+        """Create the cache table and import a legacy api_cache.json if there is one"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS api_cache (
+                    query_key TEXT PRIMARY KEY,
+                    results_json TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_api_cache_fetched ON api_cache (fetched_at)')
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Error initializing API cache: {e}")
+            return
+        
+        if os.path.exists(CACHE_PATH):
+            self._import_json(CACHE_PATH)
+    
+    def _import_json(self, path):
+        """Move entries of the old JSON cache in (one transaction), then retire the file"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            logging.error(f"Failed to load legacy API cache {path}: {e}")
+            return
+        
+        now = time.time()
+        rows = []
+        for query_key, results in legacy.items() if isinstance(legacy, dict) else ():
+            if isinstance(results, dict):
+                results = [results]
+            if isinstance(results, list):
+                rows.append((query_key, json.dumps(results, ensure_ascii=False, separators=(',', ':')),
+                             now, now + API_CACHE_TTL))
+        
+        conn = self._connect()
+        try:
+            conn.executemany('INSERT OR IGNORE INTO api_cache VALUES (?, ?, ?, ?)', rows)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Failed to import legacy API cache: {e}")
+            return
+        
+        try:
+            os.replace(path, path + ".migrated")
+        except OSError as e:
+            logging.warning(f"Imported {path} but could not rename it: {e}")
+        logging.info(f"Imported {len(rows)} entries from {path} into {self.db_path}")
+    
+    def get(self, query_key):
+        """Cached result list ([] for a cached "no results"), or None if missing or expired"""
+        try:
+            row = self._connect().execute(
+                'SELECT results_json FROM api_cache WHERE query_key = ? AND expires_at > ?',
+                (query_key, time.time())
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            logging.error(f"Error reading API cache for '{query_key}': {e}")
+            return None
+    
+    def put(self, query_key, results):
+        """Store results for a query (an empty list caches a negative answer)"""
+        now = time.time()
+        ttl = API_CACHE_TTL if results else API_CACHE_NEGATIVE_TTL
+        conn = self._connect()
+        try:
+            conn.execute('''
+                INSERT INTO api_cache (query_key, results_json, fetched_at, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(query_key) DO UPDATE SET
+                    results_json = excluded.results_json,
+                    fetched_at = excluded.fetched_at,
+                    expires_at = excluded.expires_at
+            ''', (query_key, json.dumps(results, ensure_ascii=False, separators=(',', ':')), now, now + ttl))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Error writing API cache for '{query_key}': {e}")
+            return
+        
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self.EVICT_EVERY == 0
+        if evict:
+            self.evict()
+    
+    def evict(self):
+        """Drop expired entries, then the oldest ones beyond max_entries"""
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM api_cache WHERE expires_at <= ?', (time.time(),))
+            conn.execute('''
+                DELETE FROM api_cache WHERE query_key IN (
+                    SELECT query_key FROM api_cache ORDER BY fetched_at DESC LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_entries,))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Error evicting API cache entries: {e}")
+
+api_cache = ApiCache()
+
+# HTTP client settings, shared by every Mangabaka and AniList call
+HTTP_POOL_SIZE = 8  # keep-alive connections per host (>= parallel worker threads)
+HTTP_TIMEOUT = (5, 15)  # (connect, read) seconds
+HTTP_RETRIES = 3  # for connection failures and 5xx answers, with backoff
+HTTP_USER_AGENT = 'CBZ-Metadata-Tool/2.0'
+HTTP_RETRY_STATUSES = (500, 502, 503, 504)
+# Per-host request budgets: (requests per minute, burst). Hosts not listed are not limited.
+# A full bucket adds its burst to the first minute, so rate + burst stays within the server's limit.
+RATE_LIMITS = {
+    'graphql.anilist.co': (85, 5),  # AniList's documented 90/min
+    'mangabaka.dev': (110, 10),
+}
+RATE_LIMIT_BACKOFF = 60  # seconds a 429 without Retry-After / X-RateLimit-Reset blocks its host
+
+class TokenBucket:
+    """Thread-safe token bucket that also follows the server's rate limit headers.
+    
+    Tokens refill at `per_minute` / 60 per second up to `burst`. Callers sleep
+    outside the lock, so waiting threads don't serialize each other. Response
+    headers tighten it: X-RateLimit-Limit resets the rate (AniList counts per
+    minute, the burst is kept as headroom), X-RateLimit-Remaining caps the
+    tokens, and a spent budget or a Retry-After blocks everyone until
+    X-RateLimit-Reset / the retry time. A 429 without either blocks for
+    RATE_LIMIT_BACKOFF.
+    """
+    
+    def __init__(self, per_minute, burst):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = Lock()
+    
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def acquire(self):
+        """Block until a request may be sent, then take its token"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+    
+    def update(self, headers, status=None):
+        """Adapt to the X-RateLimit-* / Retry-After headers (and status code) of a response"""
+        def number(name):
+            try:
+                return float(headers[name])
+            except (KeyError, TypeError, ValueError):
+                return None
+        
+        limit = number('X-RateLimit-Limit')
+        remaining = number('X-RateLimit-Remaining')
+        reset = number('X-RateLimit-Reset')  # epoch seconds
+        retry_after = number('Retry-After')
+        
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if limit:
+                self.rate = max(1.0, limit - self.capacity) / 60.0
+            blocked = False
+            if remaining is not None:
+                self.tokens = min(self.tokens, remaining)
+                if remaining <= 0 and reset:
+                    self.blocked_until = max(self.blocked_until, now + max(0.0, reset - time.time()))
+                    blocked = True
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+                blocked = True
+            if status == 429:
+                self.tokens = 0.0
+                if not blocked:
+                    self.blocked_until = max(self.blocked_until, now + RATE_LIMIT_BACKOFF)
+
+class HostRateLimiter:
+    """One TokenBucket per host from RATE_LIMITS"""
+    
+    def __init__(self, limits=RATE_LIMITS):
+        self._buckets = {host: TokenBucket(per_minute, burst) for host, (per_minute, burst) in limits.items()}
+    
+    def acquire(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is not None:
+            bucket.acquire()
+    
+    def update(self, host, headers, status=None):
+        bucket = self._buckets.get(host)
+        if bucket is not None:
+            bucket.update(headers, status)
+
+class HttpClient:
+    """Thread-safe HTTP layer: one pooled keep-alive requests.Session per host.
+    
+    Sessions are created once per host under a lock and never reconfigured
+    afterwards, so worker threads can share them (urllib3's connection pool
+    does its own locking). urllib3 retries connection errors; 5xx answers
+    are retried here, so every attempt that reaches the server waits for its
+    host's rate limiter, which then learns from the response. Read timeouts
+    and 429s are left to the caller.
+    """
+    
+    def __init__(self, pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT, retries=HTTP_RETRIES, limiter=None):
+        self.limiter = limiter or HostRateLimiter()
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self._sessions = {}
+        self._lock = Lock()
+    
+    def _new_session(self):
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=0,
+            status=0,  # see request()
+            allowed_methods=frozenset(("GET", "POST")),  # AniList queries are read-only POSTs
+            backoff_factor=0.5,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['User-Agent'] = HTTP_USER_AGENT
+        return session
+    
+    def session(self, url, host=None):
+        """The shared session for url's host"""
+        host = host or urlparse(url).netloc.lower()
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = self._sessions[host] = self._new_session()
+        return session
+    
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlparse(url).netloc.lower()
+        session = self.session(url, host)
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire(host)
+            response = session.request(method, url, **kwargs)
+            self.limiter.update(host, response.headers, response.status_code)
+            if response.status_code not in HTTP_RETRY_STATUSES or attempt == self.retries:
+                return response
+            logging.warning(f"{host} answered {response.status_code}, retry {attempt + 1}/{self.retries}")
+            response.close()
+            time.sleep(0.5 * 2 ** attempt)
+    
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+    
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+    
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+http_client = HttpClient()
 
 def is_url(text):
     return text.strip().lower().startswith(("http://", "https://"))
@@ -502,11 +1744,7 @@ def get_metadata_from_direct_url(url):
             return []
 
         # Call Mangabaka entry endpoint
-        response = requests.get(
-            f"https://mangabaka.dev/api/entry?id={entry_id}",
-            timeout=10,
-            headers={'User-Agent': 'CBZ-Metadata-Tool/1.0'}
-        )
+        response = http_client.get(f"https://mangabaka.dev/api/entry?id={entry_id}")
         response.raise_for_status()
 
         entry = response.json()
@@ -518,13 +1756,6 @@ def get_metadata_from_direct_url(url):
 
     return []
     
-def save_api_cache():
-    try:
-        with open(CACHE_PATH, 'w', encoding='utf-8') as f:
-            json.dump(api_cache, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        logging.error(f"Failed to save API cache: {e}")
-
 def normalize_romaji_cached(text, cache={}):
     """Normalize romaji with caching for performance - IMPROVED VERSION"""
     if not text or text in cache:
@@ -558,6 +1789,52 @@ def normalize_romaji_cached(text, cache={}):
     cache[original_text] = text
     return text
 
+# Hepburn spellings folded onto one form so romanization variants share a key
+_PHONETIC_SPELLINGS = [
+    ("tsu", "tu"), ("shi", "si"), ("sh", "sy"), ("chi", "ti"), ("ch", "ty"),
+    ("ji", "zi"), ("j", "zy"), ("fu", "hu"), ("mb", "nb"), ("mp", "np"),
+]
+_PHONETIC_PARTICLES = {"ha": "wa", "wo": "o"}
+_PHONETIC_LONG_VOWELS = re.compile(r"o[ou]+|([aiue])\1+")
+# A word spelled only from romaji syllables: vowels, consonant(+y)+vowel, syllabic n and doubled consonants
+_ROMAJI_WORD = re.compile(r"(?:[aiueo]|(?:[kgsztdnhbpmrwfjv]y?|sh|ch|ts|y)[aiueo]|n|m(?=[bpm])|t(?=ch)"
+                          r"|([kgsztdhbpcfmrj])(?=\1))+")
+
+def looks_like_romaji(text_norm):
+    """True if every word of a normalized title could be romanized Japanese (numbers aside).
+    
+    English words mostly end in a consonant or hold consonant clusters, so
+    "good night" or "shoot" are not romaji while "sousou no furiren" is.
+    """
+    words = [re.sub(r"[\W_]", "", word) for word in text_norm.split()]
+    words = [word for word in words if word and not word.isdigit()]
+    return bool(words) and all(_ROMAJI_WORD.fullmatch(word) for word in words)
+
+def phonetic_key(text_norm, cache={}):
+    """Canonical romanization key of a normalized title.
+    
+    Folds the usual variants: ou/oo/ō (already "ou" after normalization) and
+    other long vowels to one vowel, tsu/tu, shi/si, chi/ti, fu/hu, ji/zi,
+    the particles "wo" -> "o" and "ha" -> "wa", and drops spaces and
+    punctuation. "Sōsō no Furīren" and "Soso no Furiren" share a key.
+    Titles that don't look_like_romaji() only lose spaces and punctuation
+    ("Tokyo Ghoul:re"), so English words like shoot/shot keep apart.
+    """
+    if not text_norm or text_norm in cache:
+        return cache.get(text_norm, "")
+    
+    if not looks_like_romaji(text_norm):
+        key = re.sub(r"[\W_]", "", text_norm)
+    else:
+        words = [_PHONETIC_PARTICLES.get(word, word) for word in text_norm.split()]
+        key = re.sub(r"[\W_]", "", "".join(words))
+        for spelling, canonical in _PHONETIC_SPELLINGS:
+            key = key.replace(spelling, canonical)
+        key = _PHONETIC_LONG_VOWELS.sub(lambda m: m.group(0)[0], key)
+    
+    cache[text_norm] = key
+    return key
+
 def build_merge_map(local_dump):
     """Build a map of merged entries to avoid duplicates"""
     merge_map = {}  # merged_id -> target_id
@@ -624,153 +1901,1223 @@ def filter_merged_entries(entries, merge_map):
             else:
                 filtered_entries.append(entry)
     
-    return filtered_entries
+    return filtered_entries
+
+def collect_entry_titles(entry):
+    """Collect every searchable title of a dump entry (primary, native, romanized, secondary)"""
+    texts = []
+    for field in ["title", "native_title", "romanized_title"]:
+        val = entry.get(field)
+        if val:
+            texts.append(val)
+    
+    secondary = entry.get("secondary_titles")
+    if isinstance(secondary, dict):
+        for lang_titles in secondary.values():
+            if isinstance(lang_titles, list):
+                for t in lang_titles:
+                    if isinstance(t, dict) and t.get("title"):
+                        texts.append(t["title"])
+    return texts
+
+def title_shingles(text_norm, k=3):
+    """Character k-gram shingles of a normalized title (spaces ignored)"""
+    compact = text_norm.replace(' ', '')
+    if len(compact) <= k:
+        return {compact} if compact else set()
+    return {compact[i:i + k] for i in range(len(compact) - k + 1)}
+
+def jaccard_similarity(a, b):
+    """Jaccard similarity of two shingle sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class MinHashLSHIndex:
+    """MinHash signatures over title shingles, bucketed into LSH bands.
+    
+    All 32 MinHash values of a shingle come from a single blake2b digest,
+    memoized per shingle as one int with a 24-bit lane per value, so a
+    signature is a lane-wise min of a few big ints (SWAR) instead of 32 Python
+    mins. Titles sharing every row of at least one band are candidates, and
+    query() verifies them with the exact Jaccard. With 16 bands of 2 rows a
+    pair at Jaccard 0.6 shares a bucket 99.9% of the time.
+    
+    Buckets are one sorted array('Q') per band of (band value << 32 | key
+    number), about 8 bytes per key and band, searched with bisect.
+    """
+    
+    NUM_PERM = 32  # one 64-byte blake2b digest = 32 x 16-bit hash values
+    _GUARDS = int.from_bytes(b"\0\0\1" * NUM_PERM, 'little')  # bit 16 of every lane
+    
+    def __init__(self, bands=16):
+        if self.NUM_PERM % bands:
+            raise ValueError("bands must divide the signature length")
+        self.bands = bands
+        self.rows = self.NUM_PERM // bands
+        self.keys = []
+        self._buckets = [array('Q') for _ in range(bands)]
+        self._sorted = True
+        self._shingle_hashes = {}
+        self._unpack = struct.Struct(f'<{self.NUM_PERM}H').unpack
+        # Bands of up to 2 rows are their own 32-bit value, longer ones are hashed down
+        self._unpack_bands = struct.Struct(f'<{bands}{"HI"[self.rows - 1]}').unpack if self.rows <= 2 else None
+    
+    def _hash_shingle(self, shingle):
+        hashes = self._shingle_hashes.get(shingle)
+        if hashes is None:
+            digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=64).digest()
+            lanes = bytearray(3 * self.NUM_PERM)
+            lanes[0::3] = digest[0::2]
+            lanes[1::3] = digest[1::2]
+            hashes = self._shingle_hashes[shingle] = int.from_bytes(lanes, 'little')
+        return hashes
+    
+    def _packed_signature(self, shingles):
+        guards = self._GUARDS
+        signature = None
+        for shingle in shingles:
+            hashes = self._hash_shingle(shingle)
+            if signature is None:
+                signature = hashes
+                continue
+            # Lanes where signature >= hashes keep their guard bit after the subtraction
+            take = ((((signature | guards) - hashes) & guards) >> 16) * 0xFFFF
+            signature = (hashes & take) | (signature ^ (signature & take))
+        return signature
+    
+    def _values_bytes(self, packed):
+        lanes = packed.to_bytes(3 * self.NUM_PERM, 'little')
+        values = bytearray(2 * self.NUM_PERM)
+        values[0::2] = lanes[0::3]
+        values[1::2] = lanes[1::3]
+        return bytes(values)
+    
+    def signature(self, shingles):
+        """MinHash signature (tuple of NUM_PERM ints) of a shingle set"""
+        packed = self._packed_signature(shingles)
+        if packed is None:
+            return None
+        return self._unpack(self._values_bytes(packed))
+    
+    def _band_values(self, packed):
+        values = self._values_bytes(packed)
+        if self._unpack_bands:
+            return self._unpack_bands(values)
+        width = 2 * self.rows
+        return [zlib.crc32(values[i:i + width]) for i in range(0, len(values), width)]
+    
+    def add(self, key, shingles):
+        """Index a title key by its shingle set"""
+        packed = self._packed_signature(shingles)
+        if packed is None:
+            return
+        number = len(self.keys)
+        self.keys.append(key)
+        for bucket, value in zip(self._buckets, self._band_values(packed)):
+            bucket.append(value << 32 | number)
+        self._sorted = False
+    
+    def freeze(self):
+        """Sort the buckets for lookups and drop the per-shingle memo, once everything is added"""
+        if not self._sorted:
+            self._buckets = [array('Q', sorted(bucket)) for bucket in self._buckets]
+            self._sorted = True
+        self._shingle_hashes = {}
+    
+    def query(self, shingles, min_jaccard=0.5, limit=50):
+        """Return [(key, jaccard)] for indexed titles above min_jaccard, best first (all of them with limit=None)"""
+        packed = self._packed_signature(shingles)
+        if packed is None:
+            return []
+        if not self._sorted:
+            self.freeze()
+        
+        candidates = set()
+        for bucket, value in zip(self._buckets, self._band_values(packed)):
+            start = bisect_left(bucket, value << 32)
+            end = bisect_left(bucket, (value + 1) << 32, start)
+            candidates.update(item & 0xFFFFFFFF for item in bucket[start:end])
+        
+        scored = []
+        for number in candidates:
+            key = self.keys[number]
+            similarity = jaccard_similarity(shingles, title_shingles(key))
+            if similarity >= min_jaccard:
+                scored.append((key, similarity))
+        scored.sort(key=lambda x: (-x[1], len(x[0])))
+        return scored[:limit] if limit is not None else scored
+
+class TitleSuffixArray:
+    """Suffix array over the concatenated normalized title keys.
+    
+    Answers "which titles contain this string" with two binary searches
+    (O(m log n)) and "which titles are contained in this string" by narrowing
+    the suffix range character by character from every start of the query.
+    Suffixes are sorted on their first KEY_PREFIX characters only; longer
+    queries are searched on that prefix and verified afterwards. Sorting goes
+    bucket by bucket of suffixes sharing their first two characters, so sort
+    keys only exist for one bucket at a time.
+    """
+    
+    SEPARATOR = '\x00'
+    KEY_PREFIX = 48
+    
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self.key_set = set(self.keys)
+        self.starts = array('l')
+        offset = 0
+        for key in self.keys:
+            self.starts.append(offset)
+            offset += len(key) + 1
+        
+        self.text = text = self.SEPARATOR.join(self.keys) + self.SEPARATOR
+        key_prefix = self.KEY_PREFIX
+        buckets = defaultdict(lambda: array('l'))
+        for position, ch in enumerate(text):
+            if ch != self.SEPARATOR and ch != ' ':
+                buckets[text[position:position + 2]].append(position)
+        self.suffixes = array('l')
+        for head in sorted(buckets):
+            self.suffixes.extend(sorted(buckets.pop(head), key=lambda p: text[p:p + key_prefix]))
+    
+    def _bound(self, query, lo, hi, upper):
+        """First suffix index in [lo, hi) whose prefix is > query (upper) or >= query"""
+        text = self.text
+        suffixes = self.suffixes
+        m = len(query)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            prefix = text[suffixes[mid]:suffixes[mid] + m]
+            if prefix < query or (upper and prefix == query):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def _range(self, query, lo=0, hi=None):
+        if hi is None:
+            hi = len(self.suffixes)
+        lo = self._bound(query, lo, hi, upper=False)
+        return lo, self._bound(query, lo, hi, upper=True)
+    
+    def _key_index(self, position):
+        return bisect_right(self.starts, position) - 1
+    
+    def containing(self, query, max_length=None):
+        """Keys that contain query as a substring (optionally no longer than max_length)"""
+        if not query:
+            return set()
+        lo, hi = self._range(query[:self.KEY_PREFIX])
+        text = self.text
+        found = set()
+        for i in range(lo, hi):
+            position = self.suffixes[i]
+            if len(query) > self.KEY_PREFIX and not text.startswith(query, position):
+                continue
+            key = self.keys[self._key_index(position)]
+            if max_length is None or len(key) <= max_length:
+                found.add(key)
+        return found
+    
+    def contained_in(self, query, min_length=1):
+        """Keys that occur as a substring of query (and are at least min_length long)"""
+        found = set()
+        key_prefix = self.KEY_PREFIX
+        for start in range(len(query)):
+            if query[start] == ' ':
+                continue
+            lo, hi = 0, len(self.suffixes)
+            for end in range(start + 1, len(query) + 1):
+                candidate = query[start:end]
+                # Stop extending as soon as no title continues with this text
+                if end - start <= key_prefix:
+                    lo, hi = self._range(candidate, lo, hi)
+                    if lo >= hi:
+                        break
+                if end - start >= min_length and candidate in self.key_set:
+                    found.add(candidate)
+        return found
+
+class PrefixCompleter:
+    """Sorted normalized title keys searched with bisect for type-ahead completion"""
+    
+    def __init__(self, titles):
+        self.display = {}  # normalized key -> first display title seen
+        for title in titles:
+            key = normalize_romaji_cached(title)
+            if key:
+                self.display.setdefault(key, title)
+        self.keys = sorted(self.display)
+    
+    def complete(self, prefix_norm, max_scan=2000):
+        """Return [(key, display)] for keys starting with prefix_norm (scan is capped)"""
+        if not prefix_norm:
+            return []
+        keys = self.keys
+        start = bisect_left(keys, prefix_norm)
+        matches = []
+        for i in range(start, min(len(keys), start + max_scan)):
+            key = keys[i]
+            if not key.startswith(prefix_norm):
+                break
+            matches.append((key, self.display[key]))
+        return matches
+
+def rank_completions(prefix_norm, *completers, limit=10):
+    """Merge completions from several completers: exact match first, then shorter titles.
+    
+    Earlier completers win when two of them know the same key.
+    """
+    seen = {}
+    for completer in completers:
+        if completer is None:
+            continue
+        for key, display in completer.complete(prefix_norm):
+            seen.setdefault(key, display)
+    ranked = sorted(seen.items(), key=lambda kv: (kv[0] != prefix_norm, len(kv[0]), kv[0]))
+    return [display for _, display in ranked[:limit]]
+
+def entry_facet_values(entry):
+    """Facet values of a dump/API entry used by the search filters (lowercased strings)"""
+    year = entry.get("year")
+    try:
+        year = str(int(year)) if year not in (None, "") else ""
+    except (TypeError, ValueError):
+        year = ""
+    return {
+        "type": str(entry.get("type") or "").strip().lower(),
+        "state": str(entry.get("state") or "").strip().lower(),
+        "content_rating": str(entry.get("content_rating") or "").strip().lower(),
+        "year": year,
+    }
+
+def entry_matches_filters(entry, filters):
+    """Check a single entry against search filters (see FacetBitmaps.mask for the format)"""
+    if not filters:
+        return True
+    values = entry_facet_values(entry)
+    for facet, allowed in filters.items():
+        if facet == "year" and isinstance(allowed, tuple):
+            low, high = allowed
+            if not values["year"]:
+                return False
+            year = int(values["year"])
+            if (low is not None and year < low) or (high is not None and year > high):
+                return False
+        elif allowed and values.get(facet) not in {str(v).lower() for v in allowed}:
+            return False
+    return True
+
+def filter_metadata_results(results, filters):
+    """Apply search filters to extracted metadata dicts (API results have no record state)"""
+    if not filters:
+        return results
+    facet_filters = {facet: allowed for facet, allowed in filters.items() if facet != "state"}
+    return [meta for meta in results if entry_matches_filters(
+        {"type": meta.get("type"), "content_rating": meta.get("content_rating"), "year": meta.get("Year")},
+        facet_filters)]
+
+class FacetBitmaps:
+    """Compact bitsets over dump positions, one per facet value.
+    
+    Filters look like {"type": {"manga", "manhwa"}, "content_rating": {"safe"},
+    "year": (2010, None)}: values inside a facet are OR-ed, facets are AND-ed,
+    "year" takes an inclusive (min, max) range with None for an open end.
+    Combined masks are cached per filter set, so a search only pays a byte
+    lookup per candidate.
+    """
+    
+    FACETS = ("type", "state", "content_rating", "year")
+    
+    def __init__(self, size):
+        self._nbytes = (size + 7) // 8
+        self.bitmaps = {facet: {} for facet in self.FACETS}
+        self._mask_cache = {}
+    
+    def add(self, position, values):
+        for facet, value in values.items():
+            bitmap = self.bitmaps[facet].get(value)
+            if bitmap is None:
+                bitmap = self.bitmaps[facet][value] = bytearray(self._nbytes)
+            bitmap[position >> 3] |= 1 << (position & 7)
+    
+    def values(self, facet):
+        """Known non-empty values of a facet, sorted"""
+        return sorted(v for v in self.bitmaps[facet] if v)
+    
+    def _filter_key(self, filters):
+        key = []
+        for facet in self.FACETS:
+            allowed = filters.get(facet)
+            if not allowed:
+                continue
+            if facet == "year" and isinstance(allowed, tuple):
+                low, high = allowed
+                if low is None and high is None:
+                    continue
+                allowed = [v for v in self.bitmaps["year"] if v
+                           and (low is None or int(v) >= low) and (high is None or int(v) <= high)]
+            key.append((facet, frozenset(str(v).lower() for v in allowed)))
+        return tuple(key)
+    
+    def mask(self, filters):
+        """Bitset (bytes) of positions passing every active filter, or None when none is active"""
+        if not filters:
+            return None
+        key = self._filter_key(filters)
+        if not key:
+            return None
+        
+        mask = self._mask_cache.get(key)
+        if mask is None:
+            combined = None
+            for facet, allowed in key:
+                facet_bits = 0
+                for value in allowed:
+                    bitmap = self.bitmaps[facet].get(value)
+                    if bitmap is not None:
+                        facet_bits |= int.from_bytes(bitmap, 'little')
+                combined = facet_bits if combined is None else combined & facet_bits
+            mask = combined.to_bytes(self._nbytes, 'little')
+            self._mask_cache[key] = mask
+        return mask
+    
+    @staticmethod
+    def contains(mask, position):
+        return (mask[position >> 3] >> (position & 7)) & 1
+
+# Shorter romanization keys collide too easily to be trusted
+PHONETIC_MIN_KEY_LENGTH = 4
+
+class DumpSearchIndex:
+    """Lookup structures over the local dump, built once per loaded dump.
+    
+    Merged entries are left out, exactly like the scan loops skip them.
+    """
+    
+    def __init__(self, dump):
+        self.merge_map, self.active_ids = build_merge_map(dump)
+        self.entries_by_id = {}
+        self.positions = {}
+        self.entry_texts = {}  # entry_id -> [(text, text_norm), ...]
+        self.title_entries = defaultdict(set)  # text_norm -> entry ids
+        self.word_index = defaultdict(set)
+        self.exact_titles = defaultdict(list)  # text_norm -> final entry ids (merges resolved)
+        self.phonetic_titles = defaultdict(list)  # phonetic_key -> final entry ids (merges resolved)
+        self.facets = FacetBitmaps(len(dump))
+        self._lsh = None
+        self._lsh_lock = Lock()
+        
+        for position, entry in enumerate(dump):
+            entry_id = entry.get("id")
+            if entry_id is None:
+                continue
+            self.entries_by_id.setdefault(entry_id, entry)
+            self.facets.add(position, entry_facet_values(entry))
+            texts = [(text, normalize_romaji_cached(text)) for text in collect_entry_titles(entry)]
+            
+            # Exact keys cover merged entries too, pointing at their final target
+            final_id = resolve_merged_entry(entry_id, self.merge_map)
+            for _, text_norm in texts:
+                if text_norm and final_id not in self.exact_titles[text_norm]:
+                    self.exact_titles[text_norm].append(final_id)
+                key = phonetic_key(text_norm)
+                if len(key) >= PHONETIC_MIN_KEY_LENGTH and final_id not in self.phonetic_titles[key]:
+                    self.phonetic_titles[key].append(final_id)
+            
+            if entry.get("state", "").lower() == "merged":
+                continue
+            
+            self.positions[entry_id] = position
+            self.entry_texts[entry_id] = texts
+            for _, text_norm in texts:
+                if not text_norm:
+                    continue
+                self.title_entries[text_norm].add(entry_id)
+                for word in text_norm.split():
+                    self.word_index[word].add(entry_id)
+        
+        self.suffix_array = TitleSuffixArray(self.title_entries)
+        self.completer = PrefixCompleter(text for texts in self.entry_texts.values() for text, _ in texts)
+    
+    def filter_ids(self, ids, filters):
+        """Keep only ids whose entry passes the facet filters"""
+        mask = self.facets.mask(filters)
+        if mask is None:
+            return ids
+        positions = self.positions
+        return [i for i in ids if i in positions and FacetBitmaps.contains(mask, positions[i])]
+    
+    def exact_matches(self, search_term_norm, filters=None):
+        """Entries whose normalized title equals the search term, merges resolved"""
+        ids = self.exact_titles.get(search_term_norm)
+        if not ids:
+            return []
+        ids = self.filter_ids(ids, filters)
+        return [self.entries_by_id[i] for i in ids if i in self.entries_by_id]
+    
+    def phonetic_ids(self, search_term_norm):
+        """Final entry ids whose titles share the search term's romanization key"""
+        key = phonetic_key(search_term_norm)
+        if len(key) < PHONETIC_MIN_KEY_LENGTH:
+            return set()
+        return {i for i in self.phonetic_titles.get(key, ()) if i in self.positions}
+    
+    @property
+    def lsh(self):
+        """MinHashLSHIndex over the title keys, built on first use.
+        
+        Only searches nothing cheaper answered look here, so most sessions never
+        pay for it. Keys with fewer shingles than a SHINGLE_MIN_COUNT search
+        needs for SHINGLE_MATCH_JACCARD can never match and are left out.
+        """
+        if self._lsh is None:
+            with self._lsh_lock:
+                if self._lsh is None:
+                    start = time.time()
+                    lsh = MinHashLSHIndex()
+                    min_shingles = math.ceil(SHINGLE_MATCH_JACCARD * SHINGLE_MIN_COUNT)
+                    for key in self.title_entries:
+                        shingles = title_shingles(key)
+                        if len(shingles) >= min_shingles:
+                            lsh.add(key, shingles)
+                    lsh.freeze()
+                    self._lsh = lsh
+                    logging.info(f"Title shingle index built in {time.time() - start:.2f}s: "
+                                 f"{len(lsh.keys)} of {len(self.title_entries)} titles")
+        return self._lsh
+    
+    def similar_title_ids(self, search_term_norm, min_jaccard=None, limit=None):
+        """Entry ids whose titles have a high shingle Jaccard with the search term"""
+        if min_jaccard is None:
+            min_jaccard = SHINGLE_MATCH_JACCARD
+        ids = set()
+        for key, _ in self.lsh.query(title_shingles(search_term_norm), min_jaccard, limit):
+            ids.update(self.title_entries[key])
+        return ids
+    
+    def substring_ids(self, search_term_norm, min_ratio=0.3):
+        """Entry ids with a title containing the search term or contained in it.
+        
+        min_ratio is the shortest length ratio the substring scoring accepts,
+        so titles that could never score are not returned.
+        """
+        if not search_term_norm:
+            return set()
+        search_len = len(search_term_norm)
+        keys = self.suffix_array.containing(search_term_norm, max_length=int(search_len / min_ratio))
+        keys |= self.suffix_array.contained_in(search_term_norm, min_length=int(search_len * min_ratio) + 1)
+        ids = set()
+        for key in keys:
+            ids.update(self.title_entries[key])
+        return ids
+    
+    def candidate_ids(self, search_term_norm):
+        """Entry ids worth scoring for a search term.
+        
+        Union of the word postings (word overlap branch) and the suffix array
+        (exact, substring and reverse substring branches). Together with
+        similar_title_ids() (shingle branch), which the SearchEngine consults
+        for every strategy when nothing else matched, every entry that can
+        reach the match threshold is in here, so callers never need a full scan.
+        """
+        ids = set()
+        for word in set(search_term_norm.split()):
+            ids.update(self.word_index.get(word, ()))
+        ids.update(self.substring_ids(search_term_norm))
+        return ids
+    
+    def candidate_entries(self, search_term_norm, filters=None):
+        """Candidate entries intersected with the facet filters, in dump order"""
+        ids = self.filter_ids(self.candidate_ids(search_term_norm), filters)
+        return [self.entries_by_id[i] for i in sorted(ids, key=self.positions.__getitem__)]
+
+# Global dump index, rebuilt only when the loaded dump changes
+_dump_search_index = None
+_dump_search_index_size = 0
+_dump_search_index_lock = Lock()
+_dump_search_index_builder = None  # background build thread started by wait=False callers
+_dump_search_index_builder_lock = Lock()
+
+def _build_dump_search_index():
+    """Build the index for the current dump unless it is already up to date"""
+    global _dump_search_index, _dump_search_index_size
+    
+    with _dump_search_index_lock:
+        current_size = len(local_dump)
+        if _dump_search_index is None or _dump_search_index_size != current_size:
+            logging.info("Building dump search index...")
+            start = time.time()
+            _dump_search_index = DumpSearchIndex(local_dump)
+            _dump_search_index_size = current_size
+            logging.info(f"Dump search index built in {time.time() - start:.2f}s: "
+                         f"{len(_dump_search_index.entry_texts)} entries, "
+                         f"{len(_dump_search_index.title_entries)} distinct titles")
+        return _dump_search_index
+
+def get_dump_search_index(wait=True):
+    """Get the cached dump search index or build it if needed (thread-safe).
+    
+    With wait=False the call never blocks (for the Tk thread): it returns the
+    cached index as-is, possibly None or built for an older dump, and starts a
+    background build when the index is missing or stale.
+    """
+    global _dump_search_index_builder
+    
+    if not local_dump:
+        return None
+    
+    if not wait:
+        index = _dump_search_index
+        if index is None or _dump_search_index_size != len(local_dump):
+            with _dump_search_index_builder_lock:
+                if _dump_search_index_builder is None or not _dump_search_index_builder.is_alive():
+                    _dump_search_index_builder = Thread(target=_build_dump_search_index, daemon=True,
+                                                        name="dump-search-index")
+                    _dump_search_index_builder.start()
+        return index
+    
+    return _build_dump_search_index()
+
+# Search engine configuration: "auto" picks the fastest strategy that is
+# available, otherwise one of SEARCH_STRATEGIES by name
+SEARCH_STRATEGY = "auto"
+MATCH_THRESHOLD = 65
+# Near-duplicate titles ("onepiece", "one pice") nothing else matched: trigram Jaccard
+# of at least SHINGLE_MATCH_JACCARD scores 45 + 45 * jaccard (72 at 0.6, 90 at 1.0)
+SHINGLE_MATCH_JACCARD = 0.6
+SHINGLE_MIN_COUNT = 4  # fewer search trigrams than this are too noisy to compare
+# Same title up to romanization (romaji) or punctuation, just below an exact hit;
+# only applied when no title is equal to or contains the search term
+PHONETIC_MATCH_SCORE = 98
+
+# Individual mode auto-accept: the top match needs this score and this lead over the runner-up
+AUTO_ACCEPT_SCORE = 90
+AUTO_ACCEPT_MARGIN = 10
+MAX_RESULTS = 30
+
+def score_title_match(search_term_norm, search_words, texts):
+    """Score an entry's titles against a normalized search term.
+    
+    texts is a list of (text, text_norm) pairs. Returns (score, match_text,
+    branch) where branch names the check that set the score: "exact",
+    "substring", "reverse", "word_overlap", "shingle" or "char_overlap" (None
+    if nothing scored). This is the only place the match thresholds live.
+    """
+    search_len = len(search_term_norm)
+    search_shingles = None
+    best_score = 0
+    best_match_text = None
+    best_branch = None
+    
+    for text, text_norm in texts:
+        # Exact match check first
+        if text_norm == search_term_norm:
+            return 100, text, "exact"
+        
+        # BALANCED: More selective substring matching
+        if search_term_norm in text_norm:
+            ratio = search_len / len(text_norm)
+            if ratio > 0.4:  # Slightly more restrictive than 0.3
+                score = min(95, int(65 + (ratio * 30)))  # Better scoring
+                if score > best_score:
+                    best_score, best_match_text, best_branch = score, text, "substring"
+        
+        # BALANCED: Reverse substring check (text in search term) - more restrictive
+        elif text_norm in search_term_norm and len(text_norm) >= 4:  # Minimum length requirement
+            ratio = len(text_norm) / search_len
+            if ratio > 0.4:  # More restrictive
+                score = min(85, int(50 + (ratio * 35)))
+                if score > best_score:
+                    best_score, best_match_text, best_branch = score, text, "reverse"
+        
+        # BALANCED: More selective word overlap check
+        elif best_score < 75:
+            text_words = set(text_norm.split())
+            overlap = search_words & text_words
+            
+            if overlap and len(overlap) >= min(2, len(search_words)):  # Need at least 2 words or all words
+                overlap_ratio = len(overlap) / len(search_words) if search_words else 0
+                text_coverage = len(overlap) / len(text_words) if text_words else 0
+                
+                # Stricter requirements
+                if overlap_ratio >= 0.5:  # Back to more restrictive
+                    word_score = int(45 + (overlap_ratio * 30))
+                    if word_score > best_score:
+                        best_score, best_match_text, best_branch = word_score, text, "word_overlap"
+                elif text_coverage >= 0.6 and overlap_ratio >= 0.3:  # Good coverage + decent overlap
+                    word_score = int(40 + (text_coverage * 25))
+                    if word_score > best_score:
+                        best_score, best_match_text, best_branch = word_score, text, "word_overlap"
+        
+        # Near-duplicates (missing spaces, typos) only when nothing above matched
+        if best_score < MATCH_THRESHOLD and text_norm:
+            if search_shingles is None:
+                search_shingles = title_shingles(search_term_norm)
+            if len(search_shingles) >= SHINGLE_MIN_COUNT:
+                similarity = jaccard_similarity(search_shingles, title_shingles(text_norm))
+                if similarity >= SHINGLE_MATCH_JACCARD:
+                    shingle_score = int(45 + similarity * 45)
+                    if shingle_score > best_score:
+                        best_score, best_match_text, best_branch = shingle_score, text, "shingle"
+        
+        # BALANCED: More restrictive fuzzy character-level matching
+        if best_score < 50 and search_len <= 6:  # Only for very short terms
+            # Simple character overlap for short terms
+            search_chars = set(search_term_norm.replace(' ', ''))
+            text_chars = set(text_norm.replace(' ', ''))
+            char_overlap = len(search_chars & text_chars)
+            
+            # Much stricter character matching
+            if char_overlap >= max(3, len(search_chars) * 0.8):  # Need most characters
+                char_score = int(30 + (char_overlap / len(search_chars)) * 20)
+                if char_score > best_score:
+                    best_score, best_match_text, best_branch = char_score, text, "char_overlap"
+    
+    return best_score, best_match_text, best_branch
+
+class FullScanStrategy:
+    """Scores every non-merged entry. Slow, but the reference for parity checks."""
+    
+    name = "full_scan"
+    
+    def __init__(self, index):
+        self.index = index
+    
+    @staticmethod
+    def is_available():
+        return True
+    
+    def candidate_ids(self, search_term_norm):
+        return set(self.index.entry_texts)
+
+class InvertedIndexStrategy:
+    """Word postings and suffix array from the DumpSearchIndex"""
+    
+    name = "inverted"
+    
+    def __init__(self, index):
+        self.index = index
+    
+    @staticmethod
+    def is_available():
+        return True
+    
+    def candidate_ids(self, search_term_norm):
+        return self.index.candidate_ids(search_term_norm)
+
+class FTSSearchStrategy:
+    """SQLite FTS5 tables over the normalized titles, kept in memory.
+    
+    A trigram table answers "title contains the term", a word table answers
+    word overlap and a plain keyed table answers "title is contained in the
+    term" through the term's own substrings.
+    """
+    
+    name = "fts"
+    WORD_TOKENIZER = "unicode61 remove_diacritics 0 tokenchars '''.!?:;_'"
+    
+    def __init__(self, index):
+        self.index = index
+        self._lock = Lock()
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        cursor = self.conn.cursor()
+        cursor.execute("CREATE TABLE titles (key TEXT PRIMARY KEY)")
+        cursor.execute("CREATE VIRTUAL TABLE title_trigrams USING fts5(key, tokenize='trigram')")
+        cursor.execute(f"CREATE VIRTUAL TABLE title_words USING fts5(key, tokenize=\"{self.WORD_TOKENIZER}\")")
+        rows = [(key,) for key in index.title_entries]
+        cursor.executemany("INSERT INTO titles (key) VALUES (?)", rows)
+        cursor.executemany("INSERT INTO title_trigrams (key) VALUES (?)", rows)
+        cursor.executemany("INSERT INTO title_words (key) VALUES (?)", rows)
+        self.conn.commit()
+    
+    @staticmethod
+    def is_available():
+        try:
+            conn = sqlite3.connect(":memory:")
+            try:
+                conn.execute("CREATE VIRTUAL TABLE probe USING fts5(key, tokenize='trigram')")
+            finally:
+                conn.close()
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def _containing(self, cursor, search_term_norm, max_length):
+        if len(search_term_norm) >= 3:
+            cursor.execute("SELECT key FROM title_trigrams WHERE title_trigrams MATCH ? AND length(key) <= ?",
+                           (f'"{search_term_norm}"', max_length))
+        else:
+            # Trigrams cannot match shorter terms
+            cursor.execute("SELECT key FROM titles WHERE instr(key, ?) > 0 AND length(key) <= ?",
+                           (search_term_norm, max_length))
+        return {row[0] for row in cursor.fetchall()}
+    
+    def _contained_in(self, cursor, search_term_norm, min_length):
+        substrings = {search_term_norm[i:j]
+                      for i in range(len(search_term_norm))
+                      for j in range(i + min_length, len(search_term_norm) + 1)}
+        substrings = list(substrings)
+        keys = set()
+        for start in range(0, len(substrings), 500):
+            chunk = substrings[start:start + 500]
+            cursor.execute(f"SELECT key FROM titles WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+            keys.update(row[0] for row in cursor.fetchall())
+        return keys
+    
+    def _sharing_words(self, cursor, search_term_norm):
+        words = set(search_term_norm.split())
+        if not words:
+            return set()
+        cursor.execute("SELECT key FROM title_words WHERE title_words MATCH ?",
+                       (" OR ".join(f'"{word}"' for word in words),))
+        return {row[0] for row in cursor.fetchall()}
+    
+    def candidate_ids(self, search_term_norm):
+        if not search_term_norm:
+            return set()
+        search_len = len(search_term_norm)
+        with self._lock:
+            cursor = self.conn.cursor()
+            keys = self._containing(cursor, search_term_norm, int(search_len / 0.3))
+            keys |= self._contained_in(cursor, search_term_norm, int(search_len * 0.3) + 1)
+            keys |= self._sharing_words(cursor, search_term_norm)
+        ids = set()
+        for key in keys:
+            ids.update(self.index.title_entries.get(key, ()))
+        return ids
+
+class VectorizedScanStrategy:
+    """Brute-force scan done in C: one str.find sweep over all titles joined in a single string.
+    
+    Each title is stored as " key \\n", so a term found anywhere is a substring
+    hit and " word " is a whole-word hit. Titles inside the term are looked up
+    directly from the term's substrings.
+    """
+    
+    name = "vectorized"
+    
+    def __init__(self, index):
+        self.index = index
+        self.keys = list(index.title_entries)
+        self.starts = array('l')
+        parts = []
+        offset = 0
+        for key in self.keys:
+            self.starts.append(offset)
+            parts.append(f" {key} \n")
+            offset += len(key) + 3
+        self.blob = "".join(parts)
+    
+    @staticmethod
+    def is_available():
+        return True
+    
+    def _find_all(self, needle):
+        """Positions (into self.keys) of every title whose segment contains needle"""
+        found = set()
+        blob, starts = self.blob, self.starts
+        position = blob.find(needle)
+        while position != -1:
+            key_pos = bisect_right(starts, position) - 1
+            found.add(key_pos)
+            # Jump to the next title, one hit per title is enough
+            next_start = starts[key_pos + 1] if key_pos + 1 < len(starts) else len(blob)
+            position = blob.find(needle, next_start)
+        return found
+    
+    def candidate_ids(self, search_term_norm):
+        if not search_term_norm:
+            return set()
+        positions = self._find_all(search_term_norm)
+        for word in set(search_term_norm.split()):
+            positions |= self._find_all(f" {word} ")
+        
+        keys = {self.keys[p] for p in positions}
+        title_entries = self.index.title_entries
+        search_len = len(search_term_norm)
+        for i in range(search_len):
+            for j in range(i + int(search_len * 0.3) + 1, search_len + 1):
+                if search_term_norm[i:j] in title_entries:
+                    keys.add(search_term_norm[i:j])
+        
+        ids = set()
+        for key in keys:
+            ids.update(title_entries[key])
+        return ids
+
+# Fastest first; "auto" takes the first one that is available
+SEARCH_STRATEGIES = {
+    strategy.name: strategy
+    for strategy in (InvertedIndexStrategy, FTSSearchStrategy, VectorizedScanStrategy, FullScanStrategy)
+}
+
+class SearchEngine:
+    """Merge-aware title search over a DumpSearchIndex.
+    
+    Strategies only decide which entries get scored for the exact, substring
+    and word branches. Phonetic and near-duplicate (shingle) candidates come
+    from the DumpSearchIndex for all of them, and scoring, merge resolution
+    and ranking are shared, so every strategy returns the same top results.
+    """
+    
+    STREAM_CHUNK = 250  # candidates scored between two snapshots
+    
+    def __init__(self, index, strategy="auto"):
+        self.index = index
+        self._strategies = {}
+        self.strategy = self.get_strategy(strategy)
+    
+    def get_strategy(self, name):
+        """Strategy instance by name, built on first use"""
+        if name == "auto":
+            name = next(n for n, cls in SEARCH_STRATEGIES.items() if cls.is_available())
+        strategy = self._strategies.get(name)
+        if strategy is None:
+            cls = SEARCH_STRATEGIES.get(name)
+            if cls is None:
+                raise ValueError(f"Unknown search strategy: {name}")
+            if not cls.is_available():
+                raise ValueError(f"Search strategy not available: {name}")
+            start = time.time()
+            strategy = self._strategies[name] = cls(self.index)
+            logging.info(f"Search strategy '{name}' ready in {time.time() - start:.2f}s")
+        return strategy
+    
+    def _resolve_candidates(self, ids):
+        """Map candidate ids to {final_id: (position, entry, texts)}, merges resolved.
+        
+        Several ids can resolve to the same final entry; the earliest dump
+        position wins, which is what ranks equal scores.
+        """
+        index = self.index
+        candidates = {}
+        for entry_id in ids:
+            # Resolve this entry to its final ID (in case something points to it)
+            final_id = resolve_merged_entry(entry_id, index.merge_map)
+            position = index.positions[entry_id]
+            current = candidates.get(final_id)
+            if current is not None:
+                if position < current[0]:
+                    candidates[final_id] = (position,) + current[1:]
+                continue
+            actual_entry = index.entries_by_id.get(final_id)
+            if not actual_entry:
+                continue
+            texts = index.entry_texts.get(final_id)
+            if texts is None:
+                texts = [(text, normalize_romaji_cached(text)) for text in collect_entry_titles(actual_entry)]
+            candidates[final_id] = (position, actual_entry, texts)
+        return candidates
+    
+    def iter_search(self, title, filters=None, limit=MAX_RESULTS, strategy=None, trace=None):
+        """Generator of improving top-k snapshots for a title, as (stage, matches).
+        
+        matches has the same shape as search(). The stage is "exact" for the
+        exact-key fast path (nothing follows it), then "substring" while titles
+        containing the term are scored and "word" for the word-overlap tail.
+        Titles equal to the term up to romanization are scored
+        PHONETIC_MATCH_SCORE in a "phonetic" stage, if no title contains the
+        term. Near-duplicate titles (shingle branch) only count
+        when nothing else matched, in a final "similar" stage. The last snapshot equals search(); closing the
+        generator cancels the remaining work. Pass a SearchTrace to collect
+        timings and score branches.
+        """
+        search_term = title.strip()
+        if not search_term:
+            return
+        trace = trace or _NULL_TRACE
+        index = self.index
+        strategy = self.get_strategy(strategy) if strategy else self.strategy
+        trace.query, trace.strategy = title, strategy.name
+        
+        with trace.stage("normalize"):
+            search_term_norm = normalize_romaji_cached(search_term)
+            search_words = set(search_term_norm.split())
+        trace.normalized = search_term_norm
+        
+        # Fast path: exact normalized title hit, no scoring needed
+        with trace.stage("exact_lookup"):
+            exact_entries = index.exact_matches(search_term_norm, filters)
+        trace.count("exact_hits", len(exact_entries))
+        if exact_entries:
+            logging.info(f"Exact-key hit for '{title}': {len(exact_entries)} entries")
+            for entry in exact_entries:
+                trace.record("exact", entry, 100, search_term, "exact")
+            trace.count("returned", min(len(exact_entries), limit))
+            yield "exact", [(entry, 100, search_term, "exact") for entry in exact_entries[:limit]]
+            return
+        
+        # Romanization variants of a romaji term ("Soso no Furiren"), near-exact if nothing contains it
+        with trace.stage("phonetic_lookup"):
+            phonetic_ids = index.phonetic_ids(search_term_norm)
+        trace.count("phonetic_hits", len(phonetic_ids))
+        
+        with trace.stage("candidates"):
+            ids = strategy.candidate_ids(search_term_norm) | phonetic_ids
+        trace.count("candidates", len(ids))
+        with trace.stage("filters"):
+            ids = index.filter_ids(ids, filters)
+        trace.count("after_filters", len(ids))
+        with trace.stage("merge_resolution"):
+            candidates = self._resolve_candidates(ids)
+        trace.count("resolved", len(candidates))
+        
+        # Titles containing the term hold the high scores, score them before the long tail
+        with trace.stage("tier_split"):
+            tiers = {"substring": [], "word": []}
+            for final_id, candidate in candidates.items():
+                contains = any(search_term_norm in text_norm for _, text_norm in candidate[2])
+                tiers["substring" if contains else "word"].append(candidate)
+        
+        matches = []  # (position, entry, score, match_text, branch), best first, at most limit
+        phonetic = []  # phonetic candidates, promoted in the "phonetic" stage
+        direct_hit = False  # some title contains the term
+        last_snapshot = []
+        for stage, tier in tiers.items():
+            trace.count(f"{stage}_tier", len(tier))
+            tier.sort(key=lambda c: c[0])
+            for start in range(0, len(tier), self.STREAM_CHUNK):
+                with trace.stage("scoring"):
+                    for position, entry, texts in tier[start:start + self.STREAM_CHUNK]:
+                        match = self._score_candidate(search_term_norm, search_words,
+                                                      stage, position, entry, texts, trace)
+                        if entry.get("id") in phonetic_ids:
+                            phonetic.append((position, entry, texts, match))
+                        # Shingle matches come from the "similar" stage only, whatever the strategy
+                        if match is not None and match[4] != "shingle":
+                            direct_hit = direct_hit or match[4] == "substring"
+                            matches.append(match)
+                with trace.stage("ranking"):
+                    # Ties keep dump order; anything past the limit can never climb back
+                    matches.sort(key=lambda m: (-m[2], m[0]))
+                    del matches[limit:]
+                    snapshot = [m[1:] for m in matches]
+                if snapshot != last_snapshot:
+                    last_snapshot = snapshot
+                    trace.count("returned", len(snapshot))
+                    yield stage, snapshot
+        
+        # No title contains the term: same title in another romanization ranks first
+        if phonetic and not direct_hit:
+            with trace.stage("scoring"):
+                search_key = phonetic_key(search_term_norm)
+                promoted = {}
+                for position, entry, texts, match in phonetic:
+                    if match is None or match[2] < PHONETIC_MATCH_SCORE:
+                        match_text = next((text for text, text_norm in texts
+                                           if phonetic_key(text_norm) == search_key), entry.get("title"))
+                        trace.record("phonetic", entry, PHONETIC_MATCH_SCORE, match_text, "phonetic")
+                        promoted[id(entry)] = (position, entry, PHONETIC_MATCH_SCORE, match_text, "phonetic")
+            with trace.stage("ranking"):
+                matches = [m for m in matches if id(m[1]) not in promoted] + list(promoted.values())
+                matches.sort(key=lambda m: (-m[2], m[0]))
+                del matches[limit:]
+                snapshot = [m[1:] for m in matches]
+            if snapshot != last_snapshot:
+                last_snapshot = snapshot
+                trace.count("returned", len(snapshot))
+                yield "phonetic", snapshot
+        
+        # Nothing matched: near-duplicate titles ("onepiece", "kimetsu no yaibq") are the answer.
+        # Every strategy takes them from the shingle index, so they get the same ones.
+        if not matches:
+            with trace.stage("similar_lookup"):
+                similar_ids = index.filter_ids(index.similar_title_ids(search_term_norm), filters)
+                similar = list(self._resolve_candidates(similar_ids).values())
+            trace.count("similar_tier", len(similar))
+            with trace.stage("scoring"):
+                for position, entry, texts in similar:
+                    match = self._score_candidate(search_term_norm, search_words,
+                                                  "similar", position, entry, texts, trace)
+                    if match is not None:
+                        matches.append(match)
+            with trace.stage("ranking"):
+                matches.sort(key=lambda m: (-m[2], m[0]))
+                del matches[limit:]
+                snapshot = [m[1:] for m in matches]
+            if snapshot:
+                last_snapshot = snapshot
+                trace.count("returned", len(snapshot))
+                yield "similar", snapshot
+        
+        trace.count("matched", len({r["id"] for r in trace.scored if r["score"] >= MATCH_THRESHOLD}))
+        if not last_snapshot:
+            trace.count("returned", 0)
+            yield "word", []
+    
+    @staticmethod
+    def _score_candidate(search_term_norm, search_words, stage, position, entry, texts, trace):
+        """(position, entry, score, match_text, branch) for a candidate at or above MATCH_THRESHOLD, else None"""
+        score, match_text, branch = score_title_match(search_term_norm, search_words, texts)
+        trace.record(stage, entry, score, match_text, branch)
+        if score < MATCH_THRESHOLD:
+            return None
+        return position, entry, score, match_text, branch
+    
+    def search(self, title, filters=None, limit=MAX_RESULTS, strategy=None, trace=None):
+        """Ranked matches for a title as (entry, score, match_text, branch) tuples"""
+        matches = []
+        for _, matches in self.iter_search(title, filters, limit, strategy, trace):
+            pass
+        return matches
 
-def find_best_match_merge_aware(title):
-    """IMPROVED: Optimized search that handles merged entries properly"""
-    if not local_dump:
-        return []
+class SearchTrace:
+    """Explain data for one search: per-stage timings and counts, and the
+    branch that set every scored candidate's score. See explain_search().
+    """
     
-    search_term = title.strip()
-    if not search_term:
-        return []
+    def __init__(self):
+        self.query = None
+        self.normalized = None
+        self.strategy = None
+        self.timings = {}  # stage -> seconds
+        self.counts = {}
+        self.scored = []
+        self.results = []  # returned entry ids, best first
+    
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+    
+    def count(self, name, value):
+        self.counts[name] = value
+    
+    def record(self, stage, entry, score, match_text, branch):
+        self.scored.append({"id": entry.get("id"), "title": entry.get("title"), "score": score,
+                            "branch": branch, "match_text": match_text, "stage": stage})
+    
+    def as_dict(self):
+        scored = sorted(self.scored, key=lambda r: r["score"], reverse=True)
+        return {"query": self.query, "normalized": self.normalized, "strategy": self.strategy,
+                "timings": dict(self.timings), "total_time": sum(self.timings.values()),
+                "counts": dict(self.counts), "results": list(self.results), "scored": scored}
+    
+    def format(self, max_rows=50):
+        """Human readable report"""
+        lines = [f"Query: '{self.query}'  (normalized: '{self.normalized}')",
+                 f"Strategy: {self.strategy}",
+                 "",
+                 "Stage timings:"]
+        for name, seconds in self.timings.items():
+            lines.append(f"  {name:<18}{seconds * 1000:9.2f} ms")
+        lines.append(f"  {'total':<18}{sum(self.timings.values()) * 1000:9.2f} ms")
+        lines += ["", "Counts:"]
+        lines += [f"  {name:<18}{value}" for name, value in self.counts.items()]
+        lines += ["", f"Returned IDs: {', '.join(str(i) for i in self.results) or '(none)'}"]
+        scored = sorted(self.scored, key=lambda r: r["score"], reverse=True)
+        lines += ["", f"Scored candidates (top {min(max_rows, len(scored))} of {len(scored)}):"]
+        for row in scored[:max_rows]:
+            mark = "+" if row["score"] >= MATCH_THRESHOLD else " "
+            lines.append(f" {mark}{row['score']:>4}  {row['branch'] or '-':<13} ID={row['id']}  "
+                         f"'{row['title']}'  match='{row['match_text'] or ''}'  [{row['stage']}]")
+        return "\n".join(lines)
+
+class _NullTrace:
+    """Stand-in when a search is not traced, every hook is a no-op"""
     
-    # Build merge map once (you might want to cache this globally)
-    merge_map, active_ids = build_merge_map(local_dump)
+    query = normalized = strategy = None
+    scored = ()
     
-    # Pre-normalize search term once
-    search_term_norm = normalize_romaji_cached(search_term)
-    search_words = set(search_term_norm.split())
-    search_len = len(search_term_norm)
+    @contextmanager
+    def stage(self, name):
+        yield
     
-    matches = []
-    processed_final_ids = set()  # Track final IDs to avoid duplicates
+    def count(self, name, value):
+        pass
     
-    for entry in local_dump:
-        entry_id = entry.get("id")
-        state = entry.get("state", "").lower()
-        
-        # Skip merged entries entirely - they're obsolete
-        if state == "merged":
-            continue
-        
-        # Resolve this entry to its final ID (in case something points to it)
-        final_id = resolve_merged_entry(entry_id, merge_map)
-        
-        # Skip if we've already processed this final ID
-        if final_id in processed_final_ids:
+    def record(self, stage, entry, score, match_text, branch):
+        pass
+    
+    def __setattr__(self, name, value):
+        pass
+
+_NULL_TRACE = _NullTrace()
+
+# Global search engine, rebuilt with the dump index
+_search_engine = None
+
+def get_search_engine(wait=True):
+    """Get the search engine for the current dump index (None while it is unavailable)"""
+    global _search_engine
+    index = get_dump_search_index(wait)
+    if index is None:
+        return None
+    engine = _search_engine
+    if engine is None or engine.index is not index:
+        engine = _search_engine = SearchEngine(index, SEARCH_STRATEGY)
+    return engine
+
+def check_search_strategy_parity(queries, k=MAX_RESULTS, filters=None):
+    """Run queries through every available strategy and compare top-k ids with a full scan.
+    
+    Returns {strategy_name: [queries whose results differ]}; all lists are
+    empty when the strategies agree. Shingle matches come from the same
+    MinHash index for every strategy, a full scan included, so a near-duplicate
+    the LSH banding misses is missed by all of them alike.
+    """
+    engine = get_search_engine()
+    if engine is None:
+        return {}
+    mismatches = {}
+    for name, cls in SEARCH_STRATEGIES.items():
+        if name == FullScanStrategy.name or not cls.is_available():
             continue
-        
-        # Get the actual entry to use (might be different if there were merges)
-        if final_id != entry_id:
-            actual_entry = next((e for e in local_dump if e.get("id") == final_id), None)
-            if not actual_entry:
-                continue
-        else:
-            actual_entry = entry
-        
-        # Now do the matching logic on the actual entry
-        texts_to_check = []
-        
-        # Primary titles
-        for field in ["title", "native_title", "romanized_title"]:
-            val = actual_entry.get(field)
-            if val:
-                texts_to_check.append(val)
-        
-        # Secondary titles
-        secondary = actual_entry.get("secondary_titles")
-        if isinstance(secondary, dict):
-            for lang_titles in secondary.values():
-                if isinstance(lang_titles, list):
-                    for t in lang_titles:
-                        if isinstance(t, dict) and t.get("title"):
-                            texts_to_check.append(t["title"])
-        
-        best_score = 0
-        best_match_text = None
-        
-        for text in texts_to_check:
-            text_norm = normalize_romaji_cached(text)
-            
-            # Exact match check first
-            if text_norm == search_term_norm:
-                best_score = 100
-                best_match_text = text
-                break
-            
-            # BALANCED: More selective substring matching
-            if search_term_norm in text_norm:
-                ratio = search_len / len(text_norm)
-                if ratio > 0.4:  # Slightly more restrictive than 0.3
-                    score = min(95, int(65 + (ratio * 30)))  # Better scoring
-                    if score > best_score:
-                        best_score = score
-                        best_match_text = text
-            
-            # BALANCED: Reverse substring check (text in search term) - more restrictive
-            elif text_norm in search_term_norm and len(text_norm) >= 4:  # Minimum length requirement
-                ratio = len(text_norm) / search_len
-                if ratio > 0.4:  # More restrictive
-                    score = min(85, int(50 + (ratio * 35)))
-                    if score > best_score:
-                        best_score = score
-                        best_match_text = text
-            
-            # BALANCED: More selective word overlap check
-            elif best_score < 75:
-                text_words = set(text_norm.split())
-                overlap = search_words & text_words
-                
-                if overlap and len(overlap) >= min(2, len(search_words)):  # Need at least 2 words or all words
-                    overlap_ratio = len(overlap) / len(search_words) if search_words else 0
-                    text_coverage = len(overlap) / len(text_words) if text_words else 0
-                    
-                    # Stricter requirements
-                    if overlap_ratio >= 0.5:  # Back to more restrictive
-                        word_score = int(45 + (overlap_ratio * 30))
-                        if word_score > best_score:
-                            best_score = word_score
-                            best_match_text = text
-                    elif text_coverage >= 0.6 and overlap_ratio >= 0.3:  # Good coverage + decent overlap
-                        word_score = int(40 + (text_coverage * 25))
-                        if word_score > best_score:
-                            best_score = word_score
-                            best_match_text = text
-            
-            # BALANCED: More restrictive fuzzy character-level matching
-            if best_score < 50 and len(search_term_norm) <= 6:  # Only for very short terms
-                # Simple character overlap for short terms
-                search_chars = set(search_term_norm.replace(' ', ''))
-                text_chars = set(text_norm.replace(' ', ''))
-                char_overlap = len(search_chars & text_chars)
-                
-                # Much stricter character matching
-                if char_overlap >= max(3, len(search_chars) * 0.8):  # Need most characters
-                    char_score = int(30 + (char_overlap / len(search_chars)) * 20)
-                    if char_score > best_score:
-                        best_score = char_score
-                        best_match_text = text
-        
-        # BALANCED: Higher threshold to avoid irrelevant results
-        if best_score >= 65:  # Balanced threshold
-            matches.append((actual_entry, best_score, best_match_text))
-            processed_final_ids.add(final_id)
-            
-            # Early termination for perfect matches
-            if best_score == 100 and len(matches) >= 30:
-                break
+        mismatches[name] = []
+        for query in queries:
+            expected = [m[0].get("id") for m in engine.search(query, filters, k, FullScanStrategy.name)]
+            actual = [m[0].get("id") for m in engine.search(query, filters, k, name)]
+            if actual != expected:
+                mismatches[name].append(query)
+        logging.info(f"Strategy '{name}': {len(mismatches[name])} of {len(queries)} queries differ from a full scan")
+    return mismatches
+
+def explain_search(title, filters=None, strategy=None, limit=MAX_RESULTS):
+    """Run one traced search and return its SearchTrace (.format() or .as_dict()).
+    
+    All local entry points (find_best_match_*, get_metadata_from_dump_or_api)
+    share the engine, so this explains any of them; the API fallback is not traced.
+    Also reachable without the GUI: --explain TITLE [--strategy NAME].
+    """
+    trace = SearchTrace()
+    engine = get_search_engine()
+    if engine is not None:
+        matches = engine.search(title, filters, limit, strategy, trace)
+        trace.results = [m[0].get("id") for m in matches]
+    return trace
+
+def find_dump_entry(entry_id):
+    """Dump entry for an id as stored in metadata (a string), merges resolved"""
+    index = get_dump_search_index()
+    if index is None or entry_id in (None, ""):
+        return None
+    for candidate in (entry_id, int(entry_id) if str(entry_id).isdigit() else None):
+        if candidate is not None and candidate in index.entries_by_id:
+            return index.entries_by_id.get(resolve_merged_entry(candidate, index.merge_map))
+    return None
+
+def find_best_match_merge_aware(title, filters=None):
+    """Merge-aware search of the local dump, best matches first"""
+    if not local_dump:
+        return []
     
-    # Sort by score and return balanced number of results
-    matches.sort(key=lambda x: x[1], reverse=True)
-    result_entries = [m[0] for m in matches[:30]]  # Balanced result count
+    engine = get_search_engine()
+    matches = engine.search(title, filters)
     
     # Debug logging
-    logging.info(f"Merge-aware search for '{title}' found {len(result_entries)} unique entries")
-    for i, (entry, score, match_text) in enumerate(matches[:5]):
-        logging.info(f"  Result {i}: ID={entry.get('id')}, Score={score}, Title='{entry.get('title')}', Match='{match_text}'")
+    logging.info(f"Merge-aware search for '{title}' found {len(matches)} unique entries "
+                 f"(strategy: {engine.strategy.name})")
+    for i, (entry, score, match_text, branch) in enumerate(matches[:5]):
+        logging.info(f"  Result {i}: ID={entry.get('id')}, Score={score}, Title='{entry.get('title')}', "
+                     f"Match='{match_text}' ({branch})")
     
-    return result_entries
+    return [m[0] for m in matches]
 
 # Global cache for merge map to avoid rebuilding it every time
 _merge_map_cache = None
@@ -795,136 +3142,35 @@ def get_cached_merge_map():
     
     return _merge_map_cache
 
-def find_best_match_cached_merge_aware(title):
-    """IMPROVED: Version that uses cached merge map for better performance"""
+def find_best_match_scored(title, filters=None):
+    """Local matches as (entry, score) pairs, best first"""
     if not local_dump:
         return []
-    
-    search_term = title.strip()
-    if not search_term:
+    return [(m[0], m[1]) for m in get_search_engine().search(title, filters)]
+
+def match_confidence(scores, threshold=AUTO_ACCEPT_SCORE, margin=AUTO_ACCEPT_MARGIN):
+    """(confidence, auto_accept) for a ranked score list.
+    
+    The confidence is the top score (0 if unknown, e.g. API results). A match is
+    auto-accepted when it reaches threshold and leads the runner-up by margin.
+    """
+    if not scores or scores[0] is None:
+        return 0, False
+    top = scores[0]
+    runner_up = scores[1] if len(scores) > 1 and scores[1] is not None else 0
+    return top, top >= threshold and top - runner_up >= margin
+
+def find_best_match_cached_merge_aware(title, filters=None):
+    """Merge-aware search without the debug logging, for the batch paths.
+    
+    Scores with score_title_match like every other entry point, so this path
+    (and get_metadata_from_dump_or_api) uses the merge-aware thresholds: a
+    substring must cover over 40% of a title (was 30%) and word overlap needs
+    two shared words or all of the term's words.
+    """
+    if not local_dump:
         return []
-    
-    # Use cached merge map
-    merge_map, active_ids = get_cached_merge_map()
-    
-    # IMPROVED search logic
-    search_term_norm = normalize_romaji_cached(search_term)
-    search_words = set(search_term_norm.split())
-    search_len = len(search_term_norm)
-    
-    matches = []
-    processed_final_ids = set()
-    
-    for entry in local_dump:
-        entry_id = entry.get("id")
-        state = entry.get("state", "").lower()
-        
-        # Skip merged entries
-        if state == "merged":
-            continue
-        
-        # Resolve to final ID
-        final_id = resolve_merged_entry(entry_id, merge_map)
-        
-        if final_id in processed_final_ids:
-            continue
-        
-        # Get actual entry to use
-        if final_id != entry_id:
-            actual_entry = next((e for e in local_dump if e.get("id") == final_id), None)
-            if not actual_entry:
-                continue
-        else:
-            actual_entry = entry
-        
-        # Collect all searchable texts
-        texts_to_check = []
-        for field in ["title", "native_title", "romanized_title"]:
-            val = actual_entry.get(field)
-            if val:
-                texts_to_check.append(val)
-        
-        secondary = actual_entry.get("secondary_titles")
-        if isinstance(secondary, dict):
-            for lang_titles in secondary.values():
-                if isinstance(lang_titles, list):
-                    for t in lang_titles:
-                        if isinstance(t, dict) and t.get("title"):
-                            texts_to_check.append(t["title"])
-        
-        best_score = 0
-        best_match_text = None
-        
-        for text in texts_to_check:
-            text_norm = normalize_romaji_cached(text)
-            
-            # Exact match
-            if text_norm == search_term_norm:
-                best_score = 100
-                best_match_text = text
-                break
-            
-            # IMPROVED substring matching
-            elif search_term_norm in text_norm:
-                ratio = search_len / len(text_norm)
-                if ratio > 0.3:
-                    score = min(95, int(60 + (ratio * 35)))
-                    if score > best_score:
-                        best_score = score
-                        best_match_text = text
-            
-            # Reverse substring
-            elif text_norm in search_term_norm:
-                ratio = len(text_norm) / search_len
-                if ratio > 0.3:
-                    score = min(90, int(50 + (ratio * 40)))
-                    if score > best_score:
-                        best_score = score
-                        best_match_text = text
-            
-            # IMPROVED word overlap
-            elif best_score < 80:
-                text_words = set(text_norm.split())
-                overlap = search_words & text_words
-                
-                if overlap:
-                    overlap_ratio = len(overlap) / len(search_words) if search_words else 0
-                    text_coverage = len(overlap) / len(text_words) if text_words else 0
-                    
-                    if overlap_ratio >= 0.4:
-                        word_score = int(40 + (overlap_ratio * 40))
-                        if word_score > best_score:
-                            best_score = word_score
-                            best_match_text = text
-                    elif text_coverage >= 0.5:
-                        word_score = int(35 + (text_coverage * 35))
-                        if word_score > best_score:
-                            best_score = word_score
-                            best_match_text = text
-            
-            # Character-level fuzzy matching for short terms
-            if best_score < 60 and len(search_term_norm) <= 8:
-                search_chars = set(search_term_norm.replace(' ', ''))
-                text_chars = set(text_norm.replace(' ', ''))
-                char_overlap = len(search_chars & text_chars)
-                
-                if char_overlap >= max(2, len(search_chars) * 0.6):
-                    char_score = int(25 + (char_overlap / len(search_chars)) * 25)
-                    if char_score > best_score:
-                        best_score = char_score
-                        best_match_text = text
-        
-        # BALANCED: Tighter threshold
-        if best_score >= 65:
-            matches.append((actual_entry, best_score, best_match_text))
-            processed_final_ids.add(final_id)
-            
-            # Less aggressive early termination
-            if best_score == 100 and len(matches) >= 20:
-                break
-    
-    matches.sort(key=lambda x: x[1], reverse=True)
-    return [m[0] for m in matches[:30]]
+    return [m[0] for m in get_search_engine().search(title, filters)]
 
 def build_search_index(local_dump):
     """Build a search index for faster lookups - call this once when loading data"""
@@ -955,130 +3201,26 @@ def build_search_index(local_dump):
         # Store normalized texts for this entry
         entry_texts[entry_id] = [(text, normalize_romaji_cached(text)) for text in all_texts]
         
-        # IMPROVED: Index more comprehensively
+        # Index full words (partial matches come from the MinHash/LSH index)
         for text, text_norm in entry_texts[entry_id]:
-            # Index full words
             for word in text_norm.split():
                 if len(word) > 1:
                     word_to_entries[word].add(entry_id)
-            
-            # IMPROVED: Index character n-grams for better partial matching
-            if len(text_norm.replace(' ', '')) >= 3:
-                clean_text = text_norm.replace(' ', '')
-                for i in range(len(clean_text) - 2):
-                    trigram = clean_text[i:i+3]
-                    word_to_entries[f"__{trigram}"].add(entry_id)
     
     return word_to_entries, entry_texts
 
 def find_best_match_indexed(title, word_index, entry_texts):
-    """IMPROVED: Ultra-fast search using pre-built index"""
-    if not title.strip():
-        return []
-    
-    search_term_norm = normalize_romaji_cached(title.strip())
-    search_words = set(search_term_norm.split())
-    
-    # Find candidate entries using index
-    candidate_ids = set()
-    
-    # Word-based candidates
-    for word in search_words:
-        if word in word_index:
-            candidate_ids.update(word_index[word])
-    
-    # IMPROVED: Also try n-gram matching for partial matches
-    if len(candidate_ids) < 20:  # If we don't have many candidates, try harder
-        clean_search = search_term_norm.replace(' ', '')
-        if len(clean_search) >= 3:
-            for i in range(len(clean_search) - 2):
-                trigram = clean_search[i:i+3]
-                trigram_key = f"__{trigram}"
-                if trigram_key in word_index:
-                    candidate_ids.update(word_index[trigram_key])
-    
-    if not candidate_ids:
+    """Search through the shared engine; the prebuilt index arguments are kept for old callers"""
+    if not local_dump:
         return []
+    return [m[0] for m in get_search_engine().search(title)]
     
-    # Score only the candidates with IMPROVED scoring
-    matches = []
-    for entry_id in candidate_ids:
-        if entry_id not in entry_texts:
-            continue
-            
-        entry = next((e for e in local_dump if e.get("id") == entry_id), None)
-        if not entry:
-            continue
-        
-        best_score = 0
-        best_match_text = None
-        
-        for text, text_norm in entry_texts[entry_id]:
-            # Exact match
-            if text_norm == search_term_norm:
-                best_score = 100
-                best_match_text = text
-                break
-            
-            # BALANCED substring matching
-            elif search_term_norm in text_norm:
-                ratio = len(search_term_norm) / len(text_norm)
-                if ratio > 0.4:
-                    score = min(95, int(65 + (ratio * 30)))
-                    if score > best_score:
-                        best_score = score
-                        best_match_text = text
-            
-            # Reverse substring with restrictions
-            elif text_norm in search_term_norm and len(text_norm) >= 4:
-                ratio = len(text_norm) / len(search_term_norm)
-                if ratio > 0.4:
-                    score = min(85, int(50 + (ratio * 35)))
-                    if score > best_score:
-                        best_score = score
-                        best_match_text = text
-            
-            # Word overlap
-            else:
-                text_words = set(text_norm.split())
-                overlap = search_words & text_words
-                
-                if overlap and len(overlap) >= min(2, len(search_words)):
-                    overlap_ratio = len(overlap) / len(search_words) if search_words else 0
-                    text_coverage = len(overlap) / len(text_words) if text_words else 0
-                    
-                    if overlap_ratio >= 0.5:
-                        word_score = int(45 + (overlap_ratio * 30))
-                        if word_score > best_score:
-                            best_score = word_score
-                            best_match_text = text
-                    elif text_coverage >= 0.6 and overlap_ratio >= 0.3:
-                        word_score = int(40 + (text_coverage * 25))
-                        if word_score > best_score:
-                            best_score = word_score
-                            best_match_text = text
-                
-                # Character-level matching for very short terms only
-                if best_score < 50 and len(search_term_norm) <= 6:
-                    search_chars = set(search_term_norm.replace(' ', ''))
-                    text_chars = set(text_norm.replace(' ', ''))
-                    char_overlap = len(search_chars & text_chars)
-                    
-                    if char_overlap >= max(3, len(search_chars) * 0.8):
-                        char_score = int(30 + (char_overlap / len(search_chars)) * 20)
-                        if char_score > best_score:
-                            best_score = char_score
-                            best_match_text = text
-        
-        # BALANCED: Stricter threshold
-        if best_score >= 65:
-            matches.append((entry, best_score, best_match_text))
-    
-    matches.sort(key=lambda x: x[1], reverse=True)
-    return [m[0] for m in matches[:30]]
+def get_metadata_from_dump_or_api(title, local_only=False, filters=None):
+    """Fixed version with optimized search and better error handling.
     
-def get_metadata_from_dump_or_api(title, local_only=False):
-    """Fixed version with optimized search and better error handling"""
+    filters restricts results by facet (type, state, content_rating, year),
+    see FacetBitmaps for the format.
+    """
     if not title or not title.strip():
         return []
     
@@ -1091,8 +3233,8 @@ def get_metadata_from_dump_or_api(title, local_only=False):
     
     logging.info(f"Fetching metadata for: {title}")
     
-    # LOCAL SEARCH - Use merge-aware version
-    matches = find_best_match_cached_merge_aware(title)  # Handles merged entries
+    # LOCAL SEARCH - the engine tries the exact normalized key before scoring
+    matches = find_best_match_cached_merge_aware(title, filters)  # Handles merged entries
     if matches:
         try:
             # Extract metadata from matches
@@ -1120,20 +3262,11 @@ def get_metadata_from_dump_or_api(title, local_only=False):
     # API SEARCH - Only if not local_only
     query_key = title.lower().strip()
     
-    # Check API cache first
-    if query_key in api_cache:
-        logging.info("Loaded metadata from API cache")
-        cached_result = api_cache[query_key]
-        
-        # Handle different cache formats
-        if isinstance(cached_result, dict):
-            return [cached_result]
-        elif isinstance(cached_result, list):
-            return cached_result
-        else:
-            logging.warning(f"Invalid cache format for '{query_key}': {type(cached_result)}")
-            # Clear invalid cache entry
-            del api_cache[query_key]
+    # Check API cache first (an empty list is a cached "no results")
+    cached_result = api_cache.get(query_key)
+    if cached_result is not None:
+        logging.info(f"Loaded {len(cached_result)} results from API cache")
+        return filter_metadata_results(cached_result, filters)
     
     # Make API request
     try:
@@ -1141,11 +3274,7 @@ def get_metadata_from_dump_or_api(title, local_only=False):
         api_url = f"https://mangabaka.dev/api/search?query={encoded_title}"
         logging.info(f"Making API request to: {api_url}")
         
-        response = requests.get(
-            api_url,
-            timeout=10,
-            headers={'User-Agent': 'CBZ-Metadata-Tool/1.0'}
-        )
+        response = http_client.get(api_url)
         response.raise_for_status()
         
         data = response.json()
@@ -1169,12 +3298,14 @@ def get_metadata_from_dump_or_api(title, local_only=False):
             
             if results:
                 # Cache the results - store the full list, not just first result
-                api_cache[query_key] = results
-                save_api_cache()
+                api_cache.put(query_key, results)
                 logging.info(f"Cached {len(results)} API results")
-                return results
+                return filter_metadata_results(results, filters)
             else:
                 logging.warning("API returned data but no valid metadata could be extracted")
+        elif isinstance(data, list):
+            # A real "no results" answer: cache it so the title isn't asked again soon
+            api_cache.put(query_key, [])
         else:
             logging.warning(f"API returned unexpected data format: {type(data)}")
             
@@ -1362,44 +3493,31 @@ def extract_anilist_id_from_url(url):
 
 
 
-def rate_limit(max_calls_per_minute=60):
-    """Decorator to limit API calls per minute"""
-    min_interval = 60.0 / max_calls_per_minute
-    last_called = [0.0]
-    
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            elapsed = time.time() - last_called[0]
-            left_to_wait = min_interval - elapsed
-            if left_to_wait > 0:
-                time.sleep(left_to_wait)
-            ret = func(*args, **kwargs)
-            last_called[0] = time.time()
-            return ret
-        return wrapper
-    return decorator
-
-@rate_limit(max_calls_per_minute=85)  # 90 rate limit for AniList
-
 def make_anilist_request(query, variables, max_retries=3):
-    """Make a rate-limited request to AniList API with retry logic"""
+    """Make a rate-limited request to AniList API with retry logic (limits: see RATE_LIMITS)"""
     for attempt in range(max_retries):
         try:
-            response = requests.post(
+            response = http_client.post(
                 'https://graphql.anilist.co',
                 json={'query': query, 'variables': variables},
-                timeout=15,  # Increased timeout
-                headers={'User-Agent': 'CBZ-Metadata-Tool/2.0'}
             )
             
-            # Handle rate limiting
+            # Handle rate limiting: http_client already blocked the AniList bucket (Retry-After,
+            # else RATE_LIMIT_BACKOFF), so the retry waits in acquire() with every other caller
             if response.status_code == 429:
-                retry_after = int(response.headers.get('Retry-After', 60))
-                print(f"Rate limited. Waiting {retry_after} seconds...")
-                time.sleep(retry_after)
+                print(f"Rate limited. Waiting {response.headers.get('Retry-After', RATE_LIMIT_BACKOFF)} seconds...")
                 continue
             
+            # GraphQL errors (a missing Media is a 404, a rejected query a 400) won't change
+            # on retry; hand the body back so aliased batches keep their partial data
+            if 400 <= response.status_code < 500:
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = None
+                if isinstance(body, dict) and 'errors' in body:
+                    return body
+            
             response.raise_for_status()
             return response.json()
             
@@ -1418,27 +3536,14 @@ def make_anilist_request(query, variables, max_retries=3):
     
     return None
 
-def fetch_anilist_metadata(anilist_id, max_pages_per_type=50):
-    """Fetch metadata from AniList GraphQL API with pagination for both staff and characters"""
-    if not anilist_id:
-        return None
-    
-    # Validate that anilist_id is purely numeric
-    if not str(anilist_id).isdigit():
-        logging.error(f"Invalid AniList ID format: '{anilist_id}' - must be numeric")
-        return None
-    
-    # First query to get basic info, characters, and staff
-    query = '''
-    query ($id: Int) {
-        Media(id: $id, type: MANGA) {
-            id
-            title {
-                romaji
-                english
-                native
-            }
-            characters(perPage: 100, sort: FAVOURITES_DESC) {
+# Media fields packed into one aliased GraphQL document (m0: Media(...), m1: ...);
+# a document AniList rejects (e.g. over its complexity limit) is retried in halves
+# and later batches keep the smaller size for the rest of the session
+ANILIST_BATCH_SIZE = 10
+_anilist_batch_size = ANILIST_BATCH_SIZE
+
+ANILIST_CONNECTION_FIELDS = {
+    'characters': '''
                 pageInfo {
                     hasNextPage
                     currentPage
@@ -1455,9 +3560,8 @@ def fetch_anilist_metadata(anilist_id, max_pages_per_type=50):
                             alternative
                         }
                     }
-                }
-            }
-            staff(perPage: 100, sort: FAVOURITES_DESC) {
+                }''',
+    'staff': '''
                 pageInfo {
                     hasNextPage
                     currentPage
@@ -1469,151 +3573,150 @@ def fetch_anilist_metadata(anilist_id, max_pages_per_type=50):
                             full
                         }
                     }
-                }
-            }
-        }
-    }
-    '''
-    
-    variables = {'id': int(anilist_id)}
-    
+                }''',
+}
+
+def build_anilist_batch_query(media_requests):
+    """Build one aliased GraphQL document for (media_id, connection, page) requests.
+    
+    connection None asks for the title plus the first page of characters and staff,
+    otherwise only that page of 'characters' or 'staff'. Returns (query, variables).
+    """
+    declarations, fields, variables = [], [], {}
+    for i, (media_id, connection, page) in enumerate(media_requests):
+        declarations.append(f"$id{i}: Int")
+        variables[f"id{i}"] = int(media_id)
+        if connection is None:
+            body = '''
+            id
+            title {
+                romaji
+                english
+                native
+            }'''
+            for name, selection in ANILIST_CONNECTION_FIELDS.items():
+                body += f'''
+            {name}(perPage: 100, sort: FAVOURITES_DESC) {{{selection}
+            }}'''
+        else:
+            declarations.append(f"$page{i}: Int")
+            variables[f"page{i}"] = page
+            body = f'''
+            {connection}(page: $page{i}, perPage: 100, sort: FAVOURITES_DESC) {{{ANILIST_CONNECTION_FIELDS[connection]}
+            }}'''
+        fields.append(f'''
+        m{i}: Media(id: $id{i}, type: MANGA) {{{body}
+        }}''')
+    query = f"query ({', '.join(declarations)}) {{{''.join(fields)}\n}}"
+    return query, variables
+
+def _run_anilist_batch(media_requests):
+    """Send one aliased document; returns the Media dict (or None) for each request"""
+    global _anilist_batch_size
+    query, variables = build_anilist_batch_query(media_requests)
     try:
-        # Fetch first page
-        print(f"Fetching initial data for AniList ID: {anilist_id}")
         data = make_anilist_request(query, variables)
-        
-        if not data or not ('data' in data and data['data']['Media']):
-            logging.error(f"No data found for AniList ID: {anilist_id}")
-            return None
-        
-        media_data = data['data']['Media']
-        all_staff = media_data['staff']['edges'].copy()
-        all_characters = media_data['characters']['edges'].copy()
-        
-        # Check if there are more pages of staff data
-        staff_page_info = media_data['staff']['pageInfo']
-        staff_current_page = staff_page_info['currentPage']
-        staff_pages_fetched = 0
-        
-        # Fetch additional pages of staff if needed (with limits)
-        while staff_page_info['hasNextPage'] and staff_pages_fetched < max_pages_per_type:
-            staff_current_page += 1
-            staff_pages_fetched += 1
-            
-            print(f"Fetching staff page {staff_current_page}...")
-            
-            # Query for next page of staff
-            staff_query = '''
-            query ($id: Int, $page: Int) {
-                Media(id: $id, type: MANGA) {
-                    staff(page: $page, perPage: 100, sort: FAVOURITES_DESC) {
-                        pageInfo {
-                            hasNextPage
-                            currentPage
-                        }
-                        edges {
-                            role
-                            node {
-                                name {
-                                    full
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-            '''
-            
-            staff_variables = {'id': int(anilist_id), 'page': staff_current_page}
-            
-            try:
-                staff_data = make_anilist_request(staff_query, staff_variables)
-                if staff_data and 'data' in staff_data and staff_data['data']['Media']:
-                    staff_page = staff_data['data']['Media']['staff']
-                    all_staff.extend(staff_page['edges'])
-                    staff_page_info = staff_page['pageInfo']
-                else:
-                    print(f"No more staff data available at page {staff_current_page}")
-                    break
-            except Exception as e:
-                print(f"Error fetching staff page {staff_current_page}: {e}")
-                break
-        
-        if staff_pages_fetched >= max_pages_per_type and staff_page_info.get('hasNextPage'):
-            print(f"Reached maximum staff pages limit ({max_pages_per_type}). Some staff may not be included.")
-        
-        # Check if there are more pages of character data
-        char_page_info = media_data['characters']['pageInfo']
-        char_current_page = char_page_info['currentPage']
-        char_pages_fetched = 0
-        
-        # Fetch additional pages of characters if needed (with limits)
-        while char_page_info['hasNextPage'] and char_pages_fetched < max_pages_per_type:
-            char_current_page += 1
-            char_pages_fetched += 1
-            
-            print(f"Fetching characters page {char_current_page}...")
-            
-            # Query for next page of characters
-            char_query = '''
-            query ($id: Int, $page: Int) {
-                Media(id: $id, type: MANGA) {
-                    characters(page: $page, perPage: 100, sort: FAVOURITES_DESC) {
-                        pageInfo {
-                            hasNextPage
-                            currentPage
-                        }
-                        edges {
-                            role
-                            node {
-                                name {
-                                    first
-                                    middle
-                                    last
-                                    full
-                                    native
-                                    alternative
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-            '''
-            
-            char_variables = {'id': int(anilist_id), 'page': char_current_page}
-            
-            try:
-                char_data = make_anilist_request(char_query, char_variables)
-                if char_data and 'data' in char_data and char_data['data']['Media']:
-                    char_page = char_data['data']['Media']['characters']
-                    all_characters.extend(char_page['edges'])
-                    char_page_info = char_page['pageInfo']
-                else:
-                    print(f"No more character data available at page {char_current_page}")
-                    break
-            except Exception as e:
-                print(f"Error fetching characters page {char_current_page}: {e}")
-                break
-        
-        if char_pages_fetched >= max_pages_per_type and char_page_info.get('hasNextPage'):
-            print(f"Reached maximum character pages limit ({max_pages_per_type}). Some characters may not be included.")
-        
-        # Update media_data with all staff and characters
-        media_data['staff']['edges'] = all_staff
-        media_data['characters']['edges'] = all_characters
-        
-        print(f"Result: Total staff members fetched: {len(all_staff)} (from {staff_pages_fetched + 1} pages)")
-        print(f"Result: Total characters fetched: {len(all_characters)} (from {char_pages_fetched + 1} pages)")
-        
-        return parse_anilist_data(media_data)
-            
     except requests.exceptions.RequestException as e:
-        logging.error(f"AniList API request error: {e}")
-        return None
+        logging.error(f"AniList API request error for {len(media_requests)} batched media: {e}")
+        return [None] * len(media_requests)
     except json.JSONDecodeError as e:
-        logging.error(f"AniList JSON decode error: {e}")
+        logging.error(f"AniList JSON decode error for {len(media_requests)} batched media: {e}")
+        return [None] * len(media_requests)
+    
+    results = (data or {}).get('data')
+    if results is None:
+        errors = (data or {}).get('errors')
+        if errors and len(media_requests) > 1:
+            # The whole document was refused, not just one Media: halve the size and re-chunk
+            _anilist_batch_size = min(_anilist_batch_size, len(media_requests) // 2)
+            logging.info(f"AniList refused a batch of {len(media_requests)} ({errors[0].get('message')}), "
+                         f"retrying {_anilist_batch_size} per request")
+            return anilist_batch_request(media_requests)
+        logging.error(f"AniList returned no data: {errors}")
+        return [None] * len(media_requests)
+    return [results.get(f"m{i}") for i in range(len(media_requests))]
+
+def anilist_batch_request(media_requests):
+    """Resolve (media_id, connection, page) requests, as many per document as AniList accepted last"""
+    results = []
+    start = 0
+    while start < len(media_requests):
+        size = _anilist_batch_size
+        results.extend(_run_anilist_batch(media_requests[start:start + size]))
+        start += size
+    return results
+
+def fetch_anilist_metadata_many(anilist_ids, max_pages_per_type=50):
+    """Fetch metadata for several AniList IDs with aliased batch queries.
+    
+    Returns {anilist_id: parsed metadata or None}, keyed by the IDs as given.
+    Further staff/character pages are only requested for media whose previous
+    page reported hasNextPage, and those follow-up pages are batched as well.
+    """
+    ids = {}
+    for anilist_id in anilist_ids:
+        if not anilist_id:
+            continue
+        # Validate that anilist_id is purely numeric
+        if not str(anilist_id).isdigit():
+            logging.error(f"Invalid AniList ID format: '{anilist_id}' - must be numeric")
+            continue
+        ids.setdefault(int(anilist_id), []).append(anilist_id)
+    
+    print(f"Fetching initial data for {len(ids)} AniList IDs "
+          f"(up to {_anilist_batch_size} per request)")
+    media_by_id = {}
+    for media_id, media in zip(ids, anilist_batch_request([(media_id, None, None) for media_id in ids])):
+        if media and media.get('staff') and media.get('characters'):
+            media_by_id[media_id] = media
+        else:
+            logging.error(f"No data found for AniList ID: {media_id}")
+    
+    pages_fetched = Counter()
+    pending = [(media_id, connection)
+               for media_id, media in media_by_id.items()
+               for connection in ANILIST_CONNECTION_FIELDS
+               if media[connection]['pageInfo']['hasNextPage']]
+    while pending:
+        page_requests = [(media_id, connection, media_by_id[media_id][connection]['pageInfo']['currentPage'] + 1)
+                         for media_id, connection in pending]
+        print(f"Fetching {len(page_requests)} further staff/character pages...")
+        pending = []
+        for (media_id, connection, page), media in zip(page_requests, anilist_batch_request(page_requests)):
+            page_data = (media or {}).get(connection)
+            if not page_data:
+                print(f"No more {connection} data available at page {page} for AniList ID {media_id}")
+                continue
+            target = media_by_id[media_id][connection]
+            target['edges'].extend(page_data['edges'])
+            target['pageInfo'] = page_data['pageInfo']
+            pages_fetched[media_id, connection] += 1
+            if not page_data['pageInfo']['hasNextPage']:
+                continue
+            if pages_fetched[media_id, connection] < max_pages_per_type:
+                pending.append((media_id, connection))
+            else:
+                print(f"Reached maximum {connection} pages limit ({max_pages_per_type}) for AniList ID {media_id}. "
+                      f"Some {connection} may not be included.")
+    
+    results = {}
+    for media_id, originals in ids.items():
+        metadata = None
+        media = media_by_id.get(media_id)
+        if media:
+            print(f"Result: AniList ID {media_id}: {len(media['staff']['edges'])} staff members, "
+                  f"{len(media['characters']['edges'])} characters")
+            metadata = parse_anilist_data(media)
+        for original in originals:
+            results[original] = metadata
+    return results
+
+def fetch_anilist_metadata(anilist_id, max_pages_per_type=50):
+    """Fetch metadata from AniList GraphQL API with pagination for both staff and characters"""
+    if not anilist_id:
         return None
+    try:
+        return fetch_anilist_metadata_many([anilist_id], max_pages_per_type).get(anilist_id)
     except Exception as e:
         logging.error(f"Unexpected AniList API error: {e}")
         return None
@@ -1809,6 +3912,9 @@ def auto_extract_title(filename):
 class SeriesManagerDialog(tk.Toplevel):
     """Dialog for managing saved series metadata"""
     
+    SEARCH_DEBOUNCE_MS = 200  # wait for a typing pause before querying
+    TREE_CHUNK_SIZE = 500  # rows inserted per idle callback
+    
     def __init__(self, parent):
         super().__init__(parent)
         self.parent = parent
@@ -1819,6 +3925,12 @@ class SeriesManagerDialog(tk.Toplevel):
         self.selected_series = None
         self.load_to_all = True
         self.match_mode = False
+        # DB queries run on series_db_worker; only the latest one may touch the tree
+        self._query_future = None
+        self._query_generation = 0
+        self._search_after = None
+        self._fill_after = None
+        self._closed = False
         self.create_widgets()
         self.refresh_series_list()
         
@@ -1846,6 +3958,37 @@ class SeriesManagerDialog(tk.Toplevel):
         self.search_entry.bind('<KeyRelease>', self.on_search)
         ToolTip(self.search_entry, "Type to filter the series list by name or alias")
         
+        self.status_var = tk.StringVar()
+        ttk.Label(search_frame, textvariable=self.status_var, width=18, anchor='e').pack(side='left', padx=(10, 0))
+        
+        # Metadata filters (answered from indexed columns in the database)
+        filter_frame = ttk.Frame(main_frame)
+        filter_frame.pack(fill='x', pady=(0, 10))
+        
+        ttk.Label(filter_frame, text="Publisher:").pack(side='left')
+        self.publisher_var = tk.StringVar()
+        self.publisher_combo = ttk.Combobox(filter_frame, textvariable=self.publisher_var, width=25,
+                                            postcommand=self._refresh_publisher_values)
+        self.publisher_combo.pack(side='left', padx=(5, 10))
+        self.publisher_combo.bind('<<ComboboxSelected>>', self.on_search)
+        self.publisher_combo.bind('<KeyRelease>', self.on_search)
+        ToolTip(self.publisher_combo, "Only show series from this publisher (exact, case-insensitive)")
+        
+        ttk.Label(filter_frame, text="Genre:").pack(side='left')
+        self.genre_var = tk.StringVar()
+        genre_entry = ttk.Entry(filter_frame, textvariable=self.genre_var, width=15)
+        genre_entry.pack(side='left', padx=(5, 10))
+        genre_entry.bind('<KeyRelease>', self.on_search)
+        ToolTip(genre_entry, "Only show series whose Genre list contains this text")
+        
+        ttk.Label(filter_frame, text="Missing:").pack(side='left')
+        self.missing_var = tk.StringVar()
+        missing_combo = ttk.Combobox(filter_frame, textvariable=self.missing_var, width=18, state='readonly',
+                                     values=[""] + list(getattr(self.parent, 'fields', [])))
+        missing_combo.pack(side='left', padx=(5, 0))
+        missing_combo.bind('<<ComboboxSelected>>', self.on_search)
+        ToolTip(missing_combo, "Only show series where this field is empty or not set")
+        
         # Series list frame
         list_frame = ttk.LabelFrame(main_frame, text="Saved Series", padding=5)
         list_frame.pack(fill='both', expand=True, pady=(0, 10))
@@ -1902,6 +4045,14 @@ class SeriesManagerDialog(tk.Toplevel):
         delete_btn.pack(side='left', padx=(0, 5))
         ToolTip(delete_btn, "Delete the selected series from the database (cannot be undone)")
         
+        export_btn = ttk.Button(button_frame, text="Export...", command=self.export_series)
+        export_btn.pack(side='left', padx=(0, 5))
+        ToolTip(export_btn, "Export all series with their aliases to a JSONL file")
+        
+        import_btn = ttk.Button(button_frame, text="Import...", command=self.import_series)
+        import_btn.pack(side='left', padx=(0, 5))
+        ToolTip(import_btn, "Merge a JSONL export into this database (newer entries win)")
+        
         refresh_btn = ttk.Button(button_frame, text="Refresh", command=self.refresh_series_list)
         refresh_btn.pack(side='left', padx=(0, 15))
         ToolTip(refresh_btn, "Refresh the series list from the database")
@@ -1910,87 +4061,189 @@ class SeriesManagerDialog(tk.Toplevel):
         close_btn.pack(side='right')
         ToolTip(close_btn, "Close the series manager dialog")
         
+    def destroy(self):
+        """Stop pending searches and tree fills before the widgets go away"""
+        self._closed = True
+        self._query_generation += 1
+        for after_id in (self._search_after, self._fill_after):
+            if after_id is not None:
+                self.after_cancel(after_id)
+        if self._query_future is not None:
+            self._query_future.cancel()
+        super().destroy()
+    
+    def _submit(self, callback, fn, *args, **kwargs):
+        """Run fn on the series DB worker; callback(future) then runs on the Tk thread"""
+        future = series_db_worker.submit(fn, *args, **kwargs)
+        
+        def done(finished):
+            if finished.cancelled() or self._closed:
+                return
+            try:
+                self.after(0, callback, finished)
+            except (RuntimeError, tk.TclError):
+                pass  # main loop already gone
+        
+        future.add_done_callback(done)
+        return future
+    
+    def _query_tree(self, fn, *args, **kwargs):
+        """Fill the tree from a DB query, superseding (and cancelling if still queued) the previous one"""
+        if self._query_future is not None:
+            self._query_future.cancel()
+        self._query_generation += 1
+        generation = self._query_generation
+        self.status_var.set("Searching...")
+        
+        def apply(future):
+            if generation != self._query_generation or self._closed:
+                return  # a newer query owns the tree
+            try:
+                results = future.result()
+            except Exception as e:
+                logging.error(f"Series manager query failed: {e}")
+                results = []
+            self.populate_tree(results)
+        
+        self._query_future = self._submit(apply, fn, *args, **kwargs)
+    
     def refresh_series_list(self):
         """Refresh the series list with aliases - FIXED VERSION"""
         self.search_var.set("")
-        results = series_db.get_all_series_with_aliases()
-        self.populate_tree(results)
+        self.publisher_var.set("")
+        self.genre_var.set("")
+        self.missing_var.set("")
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+            self._search_after = None
+        self._query_tree(series_db.get_all_series_with_aliases)
+    
+    def export_series(self):
+        """Export the series database to a JSONL file"""
+        path = filedialog.asksaveasfilename(parent=self, title="Export Series Database",
+                                            defaultextension=".jsonl",
+                                            filetypes=[("JSON Lines", "*.jsonl"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            count = series_db.export_jsonl(path)
+            messagebox.showinfo("Export Complete", f"Exported {count} series to:\n{path}", parent=self)
+        except Exception as e:
+            logging.error(f"Error exporting series database: {e}")
+            messagebox.showerror("Export Failed", f"Failed to export series: {str(e)}", parent=self)
+    
+    def import_series(self):
+        """Merge a JSONL export into the series database"""
+        path = filedialog.askopenfilename(parent=self, title="Import Series Database",
+                                          filetypes=[("JSON Lines", "*.jsonl"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            stats = series_db.import_jsonl(path)
+        except Exception as e:
+            logging.error(f"Error importing series database: {e}")
+            messagebox.showerror("Import Failed", f"Failed to import series: {str(e)}", parent=self)
+            return
+        
+        if hasattr(self.parent, '_invalidate_series_caches'):
+            self.parent._invalidate_series_caches()
+        self.refresh_series_list()
+        messagebox.showinfo("Import Complete",
+                            f"New: {stats['inserted']}\nUpdated: {stats['updated']}\n"
+                            f"Unchanged (not newer): {stats['skipped']}\n"
+                            f"Invalid lines: {stats['invalid']}\nFailed: {stats['failed']}", parent=self)
+    
+    def _refresh_publisher_values(self):
+        """Fill the publisher dropdown right before it opens"""
+        self.publisher_combo['values'] = series_db.get_distinct_publishers()
         
     def populate_tree(self, series_list):
-        """Populate the treeview with series data including aliases - FIXED VERSION"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-    
-        for series_data in series_list:
-            try:
-                if len(series_data) == 3:
-                    # Database returns: (series_name, updated_at, aliases)
-                    series_name, updated_at, aliases = series_data
-    
-                    # Format the date safely
-                    try:
-                        if updated_at:
-                            dt = datetime.fromisoformat(updated_at)
-                            formatted_date = dt.strftime('%Y-%m-%d %H:%M')
-                        else:
-                            formatted_date = ""
-                    except Exception as date_error:
-                        print(f"Date formatting error for {series_name}: {date_error}")
-                        formatted_date = str(updated_at) if updated_at else ""
-    
-                    # Join aliases safely - FIXED: Handle string and list cases
-                    if aliases:
-                        if isinstance(aliases, list):
-                            valid_aliases = [a.strip() for a in aliases if a and a.strip()]
-                            aliases_text = ", ".join(valid_aliases)
-                        elif isinstance(aliases, str):
-                            # Handle case where aliases is a delimited string
-                            alias_list = [a.strip() for a in aliases.split('|') if a and a.strip()]
-                            aliases_text = ", ".join(alias_list)
-                        else:
-                            aliases_text = str(aliases)
-                    else:
-                        aliases_text = ""
-    
-                    # Insert in CORRECT order: Series Name, Aliases, Last Updated
-                    self.tree.insert('', 'end', values=(series_name, aliases_text, formatted_date))
+        """Populate the treeview with series data including aliases, TREE_CHUNK_SIZE rows per idle callback"""
+        if self._fill_after is not None:
+            self.after_cancel(self._fill_after)
+            self._fill_after = None
+        self.tree.delete(*self.tree.get_children())
+        self.status_var.set(f"{len(series_list)} series")
+        self._fill_tree(list(series_list), 0)
+    
+    def _fill_tree(self, series_list, start):
+        """Insert one chunk of rows, then yield to the event loop before the next"""
+        self._fill_after = None
+        for series_data in series_list[start:start + self.TREE_CHUNK_SIZE]:
+            self.tree.insert('', 'end', values=self._tree_values(series_data))
+        if start + self.TREE_CHUNK_SIZE < len(series_list):
+            self._fill_after = self.after_idle(self._fill_tree, series_list, start + self.TREE_CHUNK_SIZE)
+    
+    def _tree_values(self, series_data):
+        """(name, aliases, last updated) columns for one series row"""
+        try:
+            if len(series_data) == 3:
+                # Database returns: (series_name, updated_at, aliases)
+                series_name, updated_at, aliases = series_data
     
-                elif len(series_data) == 2:
-                    # Fallback for old format without aliases
-                    series_name, updated_at = series_data
-                    try:
+                # Format the date safely
+                try:
+                    if updated_at:
                         dt = datetime.fromisoformat(updated_at)
                         formatted_date = dt.strftime('%Y-%m-%d %H:%M')
-                    except:
-                        formatted_date = str(updated_at)
-                    
-                    self.tree.insert('', 'end', values=(series_name, "", formatted_date))
+                    else:
+                        formatted_date = ""
+                except Exception as date_error:
+                    print(f"Date formatting error for {series_name}: {date_error}")
+                    formatted_date = str(updated_at) if updated_at else ""
+    
+                # Join aliases safely - FIXED: Handle string and list cases
+                if aliases:
+                    if isinstance(aliases, list):
+                        valid_aliases = [a.strip() for a in aliases if a and a.strip()]
+                        aliases_text = ", ".join(valid_aliases)
+                    elif isinstance(aliases, str):
+                        # Handle case where aliases is a delimited string
+                        alias_list = [a.strip() for a in aliases.split('|') if a and a.strip()]
+                        aliases_text = ", ".join(alias_list)
+                    else:
+                        aliases_text = str(aliases)
                 else:
-                    # Fallback for unexpected structure
-                    series_name = series_data[0] if len(series_data) > 0 else "Unknown"
-                    self.tree.insert('', 'end', values=(series_name, "Error", "Error"))
+                    aliases_text = ""
     
-            except Exception as e:
-                print(f"Error processing series data {series_data}: {e}")
-                safe_name = str(series_data[0]) if len(series_data) > 0 else "Error"
-                self.tree.insert('', 'end', values=(safe_name, "Error", "Error"))
+                # Columns in CORRECT order: Series Name, Aliases, Last Updated
+                return (series_name, aliases_text, formatted_date)
+    
+            elif len(series_data) == 2:
+                # Fallback for old format without aliases
+                series_name, updated_at = series_data
+                try:
+                    dt = datetime.fromisoformat(updated_at)
+                    formatted_date = dt.strftime('%Y-%m-%d %H:%M')
+                except:
+                    formatted_date = str(updated_at)
+                
+                return (series_name, "", formatted_date)
+            else:
+                # Fallback for unexpected structure
+                series_name = series_data[0] if len(series_data) > 0 else "Unknown"
+                return (series_name, "Error", "Error")
+    
+        except Exception as e:
+            print(f"Error processing series data {series_data}: {e}")
+            safe_name = str(series_data[0]) if len(series_data) > 0 else "Error"
+            return (safe_name, "Error", "Error")
 
     def on_search(self, event=None):
-        """Handle search input - FIXED VERSION"""
-        search_term = self.search_var.get().strip()
-        if search_term:
-            results = series_db.search_series(search_term)
-            # Convert to format expected by populate_tree and load aliases
-            results_with_aliases = []
-            for series_name, updated_at in results:
-                aliases = series_db.load_series_aliases(series_name)
-                results_with_aliases.append((series_name, updated_at, aliases))
-            self.populate_tree(results_with_aliases)
-        else:
-            # Use the same method as refresh_series_list
-            results = series_db.get_all_series_with_aliases()
-            self.populate_tree(results)
+        """Handle search input and metadata filters (debounced, filtered in SQL on the worker)"""
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+        self._search_after = self.after(self.SEARCH_DEBOUNCE_MS, self._run_search)
+    
+    def _run_search(self):
+        self._search_after = None
+        self._query_tree(
+            series_db.filter_series,
+            search_term=self.search_var.get(),
+            publisher=self.publisher_var.get(),
+            genre=self.genre_var.get(),
+            missing_field=self.missing_var.get() or None,
+        )
 
     def edit_aliases(self):
         """Edit aliases for the selected series"""
@@ -2072,11 +4325,16 @@ class SeriesManagerDialog(tk.Toplevel):
             return
         
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete '{series_name}' from the database?\n\nThis will also delete all associated aliases."):
-            if series_db.delete_series(series_name):
-                messagebox.showinfo("Deleted", f"Successfully deleted '{series_name}' and its aliases")
-                self.refresh_series_list()
-            else:
-                messagebox.showerror("Error", f"Failed to delete '{series_name}'")
+            def deleted(future):
+                if future.exception() is None and future.result():
+                    if hasattr(self.parent, '_invalidate_series_caches'):
+                        self.parent._invalidate_series_caches()
+                    messagebox.showinfo("Deleted", f"Successfully deleted '{series_name}' and its aliases", parent=self)
+                    self.refresh_series_list()
+                else:
+                    messagebox.showerror("Error", f"Failed to delete '{series_name}'", parent=self)
+            
+            self._submit(deleted, series_db.delete_series, series_name)
 
 class MetadataGUI(tk.Tk):
     def __init__(self):
@@ -2092,6 +4350,20 @@ class MetadataGUI(tk.Tk):
         self.title_var = tk.StringVar()
         self.dropdown_selection_per_file = {}
         self.bulk_edit_enabled = tk.BooleanVar(value=False)
+        self._series_completer = None  # Caches derived from the series DB,
+        self._series_exact_map = None  # see _invalidate_series_caches()
+        self._series_version = 0  # Bumped with them, so background readers can spot a change
+        self._search_generation = 0  # Bumped to cancel a streaming dropdown search
+        self._search_streaming = False
+        self._anilist_fetch_running = False  # Individual-mode AniList fetch on its worker thread
+        self.speculative_matching = tk.BooleanVar(value=False)
+        self.auto_learn_series = tk.BooleanVar(value=False)
+        self._speculative_cache = {}  # cbz_path -> ready local match, see _start_speculative_matching()
+        self._speculative_generation = 0
+        self.auto_accept_score = tk.IntVar(value=AUTO_ACCEPT_SCORE)
+        self.auto_accept_margin = tk.IntVar(value=AUTO_ACCEPT_MARGIN)
+        self.sort_by_confidence = tk.BooleanVar(value=False)
+        self._load_order = {}  # cbz_path -> position in the loaded order
 
         self.cbz_paths = []
         self.file_metadata = {}
@@ -2173,6 +4445,10 @@ class MetadataGUI(tk.Tk):
         self.dropdown_var = tk.StringVar()
         self.title_entry = tk.StringVar()
         self.create_widgets()
+        self.create_menu()
+        
+        # Build the dump search indexes in the background so the first search doesn't pay for it
+        Thread(target=get_dump_search_index, daemon=True).start()
         
         # Center the main window AFTER all widgets are created
         self.update_idletasks()
@@ -2222,6 +4498,89 @@ class MetadataGUI(tk.Tk):
         else:
             return widget.get().strip()
             
+    def create_menu(self):
+        """Menu bar (debug tools)"""
+        menubar = tk.Menu(self)
+        debug_menu = tk.Menu(menubar, tearoff=False)
+        debug_menu.add_command(label="Explain Search...", command=self.explain_search_dialog)
+        debug_menu.add_command(label="Series DB Storage Report", command=self.storage_report_dialog)
+        debug_menu.add_command(label="Compress Series DB...",
+                               command=lambda: self.migrate_storage_dialog("zlib-dict"))
+        debug_menu.add_command(label="Uncompress Series DB...",
+                               command=lambda: self.migrate_storage_dialog("compact"))
+        menubar.add_cascade(label="Debug", menu=debug_menu)
+        self.config(menu=menubar)
+    
+    def explain_search_dialog(self):
+        """Trace one search (timings, counts, score branches) and show the report"""
+        title = tkinter.simpledialog.askstring("Explain Search", "Search title:",
+                                               initialvalue=self.title_var.get().strip(), parent=self)
+        if not title or not title.strip():
+            return
+        filters = self.get_search_filters()
+        
+        def worker():
+            try:
+                report = explain_search(title, filters).format()
+            except Exception as e:
+                logging.error(f"Error explaining search for '{title}': {e}")
+                report = f"Explain failed: {e}"
+            self.after(0, self._show_match_results, report, f"Explain Search - {title}")
+        
+        Thread(target=worker, daemon=True).start()
+    
+    def migrate_storage_dialog(self, storage_format):
+        """Rewrite the series DB in another storage format (on the DB worker) after confirming"""
+        if storage_format == series_db.storage_format:
+            messagebox.showinfo("Series DB Storage", f"The series DB already uses '{storage_format}' storage.")
+            return
+        warning = ("Long fields (Summary, Characters, ...) will be stored compressed. Older versions of "
+                   "this tool can't read them." if storage_format != "compact" else
+                   "Every series will be stored as plain JSON again, readable by older versions.")
+        if not messagebox.askyesno("Series DB Storage",
+                                   f"Rewrite the series DB in '{storage_format}' format?\n\n{warning}"):
+            return
+        
+        future = series_db_worker.submit(series_db.migrate_storage, storage_format)
+        
+        def done(future):
+            try:
+                before, after = future.result()
+                text = (f"Storage format: {after['format']}\n"
+                        f"Database file: {before['file_bytes'] / 1024:,.1f} KB -> {after['file_bytes'] / 1024:,.1f} KB")
+            except Exception as e:
+                logging.error(f"Error migrating series DB storage: {e}")
+                text = f"Migration failed: {e}"
+            self.after(0, self._show_match_results, text, "Series DB Storage")
+        
+        future.add_done_callback(done)
+    
+    def storage_report_dialog(self):
+        """Show how much space the series DB takes in its storage format"""
+        report = series_db.storage_report()
+        cache = series_db.cache_stats()
+        
+        def size(value):
+            return f"{value / 1024:,.1f} KB"
+        
+        stored = report["json_bytes"] + report["blob_bytes"]
+        saved = (1 - stored / report["pretty_bytes"]) * 100 if report["pretty_bytes"] else 0
+        lines = [
+            f"Storage format: {report['format']}",
+            f"Series: {report['rows']} ({report['packed_rows']} with compressed long fields)",
+            "",
+            f"Metadata JSON:        {size(report['json_bytes'])}",
+            f"Compressed fields:    {size(report['blob_bytes'])}",
+            f"Stored total:         {size(stored)}",
+            f"As indented JSON:     {size(report['pretty_bytes'])}  ({saved:.0f}% saved)",
+            "",
+            f"Database file:        {size(report['file_bytes'])} ({size(report['free_bytes'])} free pages)",
+            "",
+            f"Series cache:         {cache['size']}/{series_db.CACHE_SIZE} series, "
+            f"{cache['hits']} hits / {cache['misses']} misses ({cache['hit_rate']:.0%})",
+        ]
+        self._show_match_results("\n".join(lines), "Series DB Storage Report")
+    
     def create_widgets(self):
         main_frame = ttk.Frame(self)
         main_frame.pack(fill='both', expand=True, padx=10, pady=10)
@@ -2276,6 +4635,60 @@ class MetadataGUI(tk.Tk):
         local_only_check = ttk.Checkbutton(top_frame, text="🗂️ Local Only Mode (No API requests)", variable=self.local_only_mode)
         local_only_check.pack(anchor='w', pady=(2, 0))
         ToolTip(local_only_check, "Enable to work only with local database, disable online metadata fetching")
+        
+        speculative_check = ttk.Checkbutton(top_frame, text="⚡ Pre-match files in the background on load",
+                                            variable=self.speculative_matching)
+        speculative_check.pack(anchor='w', pady=(2, 0))
+        ToolTip(speculative_check, "After loading files, match each one against the local dump and the series DB "
+                                   "in the background so Fetch and Match can use the ready results")
+        
+        learn_check = ttk.Checkbutton(top_frame, text="📚 Learn series templates after inserting",
+                                      variable=self.auto_learn_series)
+        learn_check.pack(anchor='w', pady=(2, 0))
+        ToolTip(learn_check, "After metadata is inserted, save every series that was applied to the series DB "
+                             "(filename titles become aliases) so the next run matches those files instantly")
+        
+        accept_frame = ttk.Frame(top_frame)
+        accept_frame.pack(anchor='w', pady=(2, 0))
+        ttk.Label(accept_frame, text="Auto-accept: score ≥").pack(side='left')
+        accept_score_spin = ttk.Spinbox(accept_frame, from_=0, to=100, width=4, textvariable=self.auto_accept_score)
+        accept_score_spin.pack(side='left', padx=(2, 6))
+        ToolTip(accept_score_spin, "Individual mode: a file's top match is accepted without review from this score")
+        ttk.Label(accept_frame, text="lead ≥").pack(side='left')
+        accept_margin_spin = ttk.Spinbox(accept_frame, from_=0, to=100, width=4, textvariable=self.auto_accept_margin)
+        accept_margin_spin.pack(side='left', padx=(2, 10))
+        ToolTip(accept_margin_spin, "...and when it beats the runner-up by at least this many points")
+        sort_check = ttk.Checkbutton(accept_frame, text="Sort files by confidence", variable=self.sort_by_confidence,
+                                     command=self._apply_file_order)
+        sort_check.pack(side='left')
+        ToolTip(sort_check, "List files needing review (lowest match confidence) first")
+        
+        filter_frame = ttk.Frame(top_frame)
+        filter_frame.pack(anchor='w', pady=(2, 0))
+        ttk.Label(filter_frame, text="Search Filters:").pack(side='left')
+        
+        self.facet_filter_vars = {'type': {}, 'content_rating': {}}  # facet -> value -> BooleanVar
+        self.facet_filter_buttons = {}
+        for facet, label in (('type', "Type"), ('content_rating', "Rating")):
+            button = ttk.Menubutton(filter_frame, text=f"{label}: Any")
+            menu = tk.Menu(button, tearoff=False)
+            menu.configure(postcommand=lambda f=facet, m=menu: self._populate_facet_menu(f, m))
+            button['menu'] = menu
+            button.pack(side='left', padx=(5, 0))
+            self.facet_filter_buttons[facet] = (button, label)
+        ToolTip(self.facet_filter_buttons['type'][0], "Only search entries of the checked types (e.g. skip novels). Nothing checked = any type.")
+        ToolTip(self.facet_filter_buttons['content_rating'][0], "Only search entries with the checked content ratings. Nothing checked = any rating.")
+        
+        ttk.Label(filter_frame, text="Year:").pack(side='left', padx=(10, 0))
+        self.year_from_var = tk.StringVar()
+        self.year_to_var = tk.StringVar()
+        year_from_entry = ttk.Entry(filter_frame, textvariable=self.year_from_var, width=6)
+        year_from_entry.pack(side='left', padx=(5, 0))
+        ttk.Label(filter_frame, text="to").pack(side='left', padx=(3, 0))
+        year_to_entry = ttk.Entry(filter_frame, textvariable=self.year_to_var, width=6)
+        year_to_entry.pack(side='left', padx=(3, 0))
+        ToolTip(year_from_entry, "Earliest publication year to include (leave empty for no limit)")
+        ToolTip(year_to_entry, "Latest publication year to include (leave empty for no limit)")
     
         ttk.Label(title_frame, text="Manga Title:").pack(anchor='w')
         title_entry_frame = ttk.Frame(title_frame)
@@ -2285,7 +4698,8 @@ class MetadataGUI(tk.Tk):
         self.title_entry = ttk.Entry(title_entry_frame, textvariable=self.title_var, font=('TkDefaultFont', 10))
         self.title_entry.pack(side='left', fill='x', expand=True)
         self.disable_middle_click_paste(self.title_entry)
-        ToolTip(self.title_entry, "Enter the manga/comic series title to search for metadata")
+        ToolTip(self.title_entry, "Enter the manga/comic series title to search for metadata.\nSuggestions from the local dump and saved series appear while typing.")
+        self._setup_title_autocomplete()
     
         # Metadata fetch buttons with tooltips
         fetch_anilist_btn = ttk.Button(title_entry_frame, text="Fetch AniList", command=self.fetch_anilist_metadata_gui)
@@ -2336,10 +4750,15 @@ class MetadataGUI(tk.Tk):
         match_all_btn = ttk.Button(series_db_frame, text="🔍 Match All", command=self._match_all_files_with_db)
         match_all_btn.pack(side='left', padx=(0, 5))
         ToolTip(match_all_btn, "Try to match all files with saved series using filename analysis")
+        
+        forget_match_btn = ttk.Button(series_db_frame, text="🚫 Forget Match", command=self.forget_learned_match)
+        forget_match_btn.pack(side='left', padx=(0, 5))
+        ToolTip(forget_match_btn, "Forget the match confirmed before for the title (batch mode) or the current file, "
+                                  "so it is no longer pinned first and auto-accepted")
     
         self.dropdown = ttk.Combobox(top_frame, textvariable=self.dropdown_var, state='readonly', font=('TkDefaultFont', 10))
         self.dropdown.pack(fill='x', pady=(10, 0))
-        self.dropdown.bind("<<ComboboxSelected>>", self.update_metadata_from_dropdown)
+        self.dropdown.bind("<<ComboboxSelected>>", self._on_dropdown_selected)
         ToolTip(self.dropdown, "Select from available metadata options found during search")
     
         nav_frame = ttk.Frame(main_frame)
@@ -2472,6 +4891,162 @@ class MetadataGUI(tk.Tk):
         ToolTip(clear_all_btn, "Clear all metadata fields (both original and updated)")
 
 
+    def _populate_facet_menu(self, facet, menu):
+        """Fill a filter menu with the facet values known to the dump index"""
+        menu.delete(0, tk.END)
+        dump_index = get_dump_search_index(wait=False)
+        if dump_index is None:
+            menu.add_command(label="(local dump index not ready)", state='disabled')
+            return
+        
+        filter_vars = self.facet_filter_vars[facet]
+        for value in dump_index.facets.values(facet):
+            var = filter_vars.get(value)
+            if var is None:
+                var = filter_vars[value] = tk.BooleanVar(value=False)
+            menu.add_checkbutton(label=value.title(), variable=var,
+                                 command=lambda f=facet: self._update_facet_button(f))
+        menu.add_separator()
+        menu.add_command(label="Clear", command=lambda f=facet: self._clear_facet_filter(f))
+    
+    def _update_facet_button(self, facet):
+        button, label = self.facet_filter_buttons[facet]
+        selected = [value.title() for value, var in self.facet_filter_vars[facet].items() if var.get()]
+        button.configure(text=f"{label}: {', '.join(selected) if selected else 'Any'}")
+    
+    def _clear_facet_filter(self, facet):
+        for var in self.facet_filter_vars[facet].values():
+            var.set(False)
+        self._update_facet_button(facet)
+    
+    def get_search_filters(self):
+        """Active search filters from the GUI in FacetBitmaps format (None if nothing is set)"""
+        filters = {}
+        for facet, filter_vars in self.facet_filter_vars.items():
+            selected = {value for value, var in filter_vars.items() if var.get()}
+            if selected:
+                filters[facet] = selected
+        
+        years = []
+        for var in (self.year_from_var, self.year_to_var):
+            text = var.get().strip()
+            years.append(int(text) if text.isdigit() else None)
+        if years[0] is not None or years[1] is not None:
+            filters['year'] = tuple(years)
+        
+        return filters or None
+    
+    def _setup_title_autocomplete(self):
+        """Bind the type-ahead suggestion list to the title entry"""
+        self._autocomplete_popup = None
+        self._autocomplete_listbox = None
+        self.title_entry.bind('<KeyRelease>', self._on_title_key_release, add='+')
+        self.title_entry.bind('<Down>', self._focus_autocomplete, add='+')
+        self.title_entry.bind('<Escape>', lambda e: self._hide_autocomplete(), add='+')
+        self.title_entry.bind('<FocusOut>', lambda e: self.after(150, self._hide_autocomplete_if_unfocused), add='+')
+    
+    def _invalidate_series_caches(self):
+        """Drop caches derived from the series DB (call after it changes)"""
+        self._series_version += 1
+        self._series_completer = None
+        self._series_exact_map = None
+        for ready in list(self._speculative_cache.values()):
+            ready.pop("series", None)
+    
+    def _get_title_completions(self, text, limit=10):
+        """Completions for the title entry from saved series/aliases and the local dump"""
+        prefix_norm = normalize_romaji_cached(text.strip())
+        if len(prefix_norm) < 2:
+            return []
+        
+        if self._series_completer is None:
+            titles = []
+            for series_name, _, aliases in series_db.get_all_series_with_aliases():
+                titles.append(series_name)
+                titles.extend(aliases)
+            self._series_completer = PrefixCompleter(titles)
+        
+        # Never block typing on the background index build
+        dump_index = get_dump_search_index(wait=False)
+        dump_completer = dump_index.completer if dump_index else None
+        return rank_completions(prefix_norm, self._series_completer, dump_completer, limit=limit)
+    
+    def _on_title_key_release(self, event):
+        """Refresh the suggestion list on every keystroke in the title entry"""
+        if event.keysym in ('Down', 'Up', 'Return', 'Escape', 'Tab', 'Left', 'Right',
+                            'Shift_L', 'Shift_R', 'Control_L', 'Control_R'):
+            return
+        
+        try:
+            completions = self._get_title_completions(self.title_var.get())
+        except Exception as e:
+            logging.error(f"Autocomplete error: {e}")
+            completions = []
+        
+        if completions:
+            self._show_autocomplete(completions)
+        else:
+            self._hide_autocomplete()
+    
+    def _show_autocomplete(self, completions):
+        """Show (or refresh) the suggestion list right below the title entry"""
+        if self._autocomplete_popup is None:
+            popup = tk.Toplevel(self)
+            popup.wm_overrideredirect(True)
+            listbox = tk.Listbox(popup, height=10, activestyle='dotbox', font=('TkDefaultFont', 10))
+            listbox.pack(fill='both', expand=True)
+            listbox.bind('<ButtonRelease-1>', self._accept_autocomplete)
+            listbox.bind('<Return>', self._accept_autocomplete)
+            listbox.bind('<Escape>', lambda e: self._hide_autocomplete())
+            listbox.bind('<FocusOut>', lambda e: self.after(150, self._hide_autocomplete_if_unfocused))
+            self._autocomplete_popup = popup
+            self._autocomplete_listbox = listbox
+        
+        listbox = self._autocomplete_listbox
+        listbox.delete(0, tk.END)
+        for completion in completions:
+            listbox.insert(tk.END, completion)
+        listbox.configure(height=min(len(completions), 10))
+        
+        x = self.title_entry.winfo_rootx()
+        y = self.title_entry.winfo_rooty() + self.title_entry.winfo_height()
+        self._autocomplete_popup.wm_geometry(f"{self.title_entry.winfo_width()}x{listbox.winfo_reqheight()}+{x}+{y}")
+        self._autocomplete_popup.deiconify()
+        self._autocomplete_popup.lift()
+    
+    def _focus_autocomplete(self, event=None):
+        """Move keyboard focus from the entry into the suggestion list"""
+        if self._autocomplete_popup is not None and self._autocomplete_listbox.size():
+            self._autocomplete_listbox.focus_set()
+            self._autocomplete_listbox.selection_clear(0, tk.END)
+            self._autocomplete_listbox.selection_set(0)
+            self._autocomplete_listbox.activate(0)
+            return "break"
+    
+    def _accept_autocomplete(self, event=None):
+        """Copy the chosen suggestion into the title entry"""
+        selection = self._autocomplete_listbox.curselection()
+        if selection:
+            self.title_var.set(self._autocomplete_listbox.get(selection[0]))
+            self.title_entry.icursor(tk.END)
+        self._hide_autocomplete()
+        self.title_entry.focus_set()
+        return "break"
+    
+    def _hide_autocomplete_if_unfocused(self):
+        try:
+            focused = self.focus_get()
+        except KeyError:  # focus is inside a ttk popdown
+            focused = None
+        if focused not in (self.title_entry, self._autocomplete_listbox):
+            self._hide_autocomplete()
+    
+    def _hide_autocomplete(self):
+        if self._autocomplete_popup is not None:
+            self._autocomplete_popup.destroy()
+            self._autocomplete_popup = None
+            self._autocomplete_listbox = None
+
     def on_dropdown_change(self, field):
         """Handle dropdown field changes"""
         self.on_text_change(field)
@@ -2511,9 +5086,10 @@ class MetadataGUI(tk.Tk):
         if self.metadata_mode.get() == "individual" and current_file in self.individual_metadata_cache:
             cache_data = self.individual_metadata_cache[current_file]
             self.metadata_options = cache_data.get('options', [])
+            scores = cache_data.get('scores') or []
     
             dropdown_values = []
-            for meta in self.metadata_options:
+            for i, meta in enumerate(self.metadata_options):
                 title_text = meta.get("Title", "Unknown")
                 type_text = meta.get("type", "")
                 year_text = meta.get("Year", "")
@@ -2526,19 +5102,20 @@ class MetadataGUI(tk.Tk):
                     parts.append(f"({year_text})")
                 if content_rating_text:
                     parts.append(f"({content_rating_text.title()})")
+                if i < len(scores) and scores[i] is not None:
+                    parts.append(f"[score {scores[i]}]")
             
                 dropdown_values.append(" ".join(parts))
     
             self.dropdown['values'] = dropdown_values
     
-            # Restore user's last selection if available
-            selected_idx = self.dropdown_selection_per_file.get(current_file, 0)
-            if selected_idx < len(dropdown_values):
+            # Show the applied choice (auto-accepted or picked); files needing review stay
+            # unset until the user picks, so nothing unconfirmed reaches file_metadata
+            selected_idx = self.dropdown_selection_per_file.get(current_file)
+            if selected_idx is not None and selected_idx < len(dropdown_values):
                 self.dropdown.set(dropdown_values[selected_idx])
-                self.update_metadata_from_dropdown()
             elif dropdown_values:
-                self.dropdown.set(dropdown_values[0])
-                self.update_metadata_from_dropdown()
+                self.dropdown.set(f"Select a match ({len(dropdown_values)} candidates)")
             else:
                 self.dropdown.set("No matches found")
                 
@@ -2567,6 +5144,7 @@ class MetadataGUI(tk.Tk):
             return
     
         self.cbz_paths = list(paths)
+        self._load_order = {path: i for i, path in enumerate(self.cbz_paths)}
         self.file_listbox.delete(0, tk.END)
         self.file_metadata.clear()
         self.original_metadata.clear()
@@ -2598,6 +5176,75 @@ class MetadataGUI(tk.Tk):
             self.file_listbox.select_set(0)
             self.current_index = 0
             self.load_metadata(0)
+        
+        self._start_speculative_matching()
+    
+    SPECULATIVE_PAUSE = 0.01  # seconds between files, leaves the GIL to the Tk thread
+    
+    def _start_speculative_matching(self):
+        """Opt-in: match every loaded file locally in the background right after a load"""
+        self._speculative_generation += 1
+        self._speculative_cache = {}
+        if not self.speculative_matching.get() or not self.cbz_paths:
+            return
+        thread = Thread(target=self._speculative_worker,
+                        args=(self._speculative_generation, list(self.cbz_paths), self.get_search_filters()),
+                        daemon=True)
+        thread.start()
+    
+    def _speculative_worker(self, generation, paths, filters):
+        """Background thread: local-only dump search and series DB match for each file"""
+        start = time.time()
+        engine = get_search_engine()
+        all_series, all_series_version = None, None
+        
+        for path in paths:
+            # A new folder load supersedes this run
+            if generation != self._speculative_generation:
+                return
+            title = self._extract_title_from_filename(os.path.basename(path))
+            if not title or len(title.strip()) < 2:
+                continue
+            
+            try:
+                # The series DB may change on the Tk thread while this runs
+                series_version = self._series_version
+                if all_series_version != series_version:
+                    all_series, all_series_version = series_db.get_all_series_with_aliases(), series_version
+                learned = self._learned_metadata(title)
+                if engine is not None:
+                    matches = engine.search(title, filters)
+                    options = [self.extract_metadata(m[0]) for m in matches]
+                    scores = [m[1] for m in matches]
+                else:
+                    options, scores = [], []
+                if learned:
+                    options, scores = self._pin_learned(learned, options, scores)
+                series = self._learned_series(title) or (
+                    self._find_best_match(title, all_series) if all_series else None)
+            except Exception as e:
+                logging.error(f"Speculative matching failed for {path}: {e}")
+                continue
+            
+            if generation == self._speculative_generation:
+                ready = {"title": title, "filters": filters, "options": options, "scores": scores}
+                # Matched against a series DB that has changed since: leave it to on-demand matching
+                if series_version == self._series_version:
+                    ready["series"] = series
+                self._speculative_cache[path] = ready
+                if series_version != self._series_version:  # invalidated between the check and the write
+                    ready.pop("series", None)
+            time.sleep(self.SPECULATIVE_PAUSE)
+        
+        logging.info(f"Speculative matching: {len(self._speculative_cache)}/{len(paths)} files ready "
+                     f"in {time.time() - start:.2f}s")
+    
+    def _speculative_result(self, cbz_path, title, filters=None):
+        """Ready background match for a file, if it was made for the same title and filters"""
+        ready = self._speculative_cache.get(cbz_path)
+        if ready and ready["title"] == title and ready["filters"] == filters:
+            return ready
+        return None
 
 
     def clear_all_fields(self):
@@ -2645,6 +5292,7 @@ class MetadataGUI(tk.Tk):
             
             try:
                 if series_db.save_series_metadata(series_name, series_metadata):
+                    self._invalidate_series_caches()
                     messagebox.showinfo("Success", f"Series '{series_name}' saved to database")
                 else:
                     messagebox.showerror("Error", f"Failed to save series '{series_name}'")
@@ -2656,6 +5304,7 @@ class MetadataGUI(tk.Tk):
         """Load series metadata from database"""
         dialog = SeriesManagerDialog(self)
         self.wait_window(dialog)
+        self._invalidate_series_caches()  # aliases may have been edited or series deleted
         
         if dialog.match_mode:
             # Handle match operations
@@ -2754,6 +5403,7 @@ class MetadataGUI(tk.Tk):
                 
                 if dialog.result is not None:
                     series_db.save_series_aliases(series_name, dialog.result)
+                self._invalidate_series_caches()
                 
                 messagebox.showinfo("Success", f"Series '{series_name}' saved to database")
             else:
@@ -2762,6 +5412,60 @@ class MetadataGUI(tk.Tk):
             logging.error(f"Error saving series: {e}")
             messagebox.showerror("Error", f"Failed to save series: {str(e)}")
     
+    def _series_title_variants(self, series_name, aliases, series_metadata=None):
+        """All titles a saved series answers to: name, aliases and alternative titles from its metadata"""
+        # Load metadata for localized titles (unless the caller bulk-loaded it)
+        if series_metadata is None:
+            series_metadata = series_db.load_series_metadata(series_name)
+        if not isinstance(series_metadata, dict):
+            series_metadata = {'Series': series_name}
+        
+        # Collect all title variants
+        all_titles = [series_name]
+        
+        # Add aliases
+        if aliases:
+            all_titles.extend(aliases)
+        
+        # Add LocalizedSeries from metadata
+        if series_metadata and 'LocalizedSeries' in series_metadata and series_metadata['LocalizedSeries']:
+            localized_titles = [title.strip() for title in series_metadata['LocalizedSeries'].split(',') if title.strip()]
+            all_titles.extend(localized_titles)
+        
+        # Add other alternative title fields from metadata
+        if series_metadata and isinstance(series_metadata, dict):
+            for field in ['Native', 'Romaji', 'Secondary']:
+                alt_title = series_metadata.get(field, '').strip()
+                if alt_title and alt_title not in all_titles:
+                    all_titles.append(alt_title)
+        
+        # Remove duplicates while preserving order
+        unique_titles = []
+        for title in all_titles:
+            if title not in unique_titles:
+                unique_titles.append(title)
+        return unique_titles
+    
+    def _get_series_exact_map(self):
+        """Normalized title variant -> series name over the whole series DB (cached)"""
+        if self._series_exact_map is None:
+            # Built on the speculative thread too: don't install a map the DB changed under
+            version = self._series_version
+            exact_map = {}
+            all_series = series_db.get_all_series_with_aliases()
+            metadata_by_series = series_db.load_title_fields_many(name for name, _, _ in all_series)
+            # Same order as the scan (most recently updated first), first series wins
+            for series_name, _, aliases in all_series:
+                for title_variant in self._series_title_variants(
+                        series_name, aliases, metadata_by_series.get(series_name, {})):
+                    key = self._normalize_for_comparison(self._clean_title_for_matching(title_variant))
+                    if key:
+                        exact_map.setdefault(key, series_name)
+            if version == self._series_version:
+                self._series_exact_map = exact_map
+            return exact_map
+        return self._series_exact_map
+    
     # Update the _find_best_match method to use aliases:
     def _find_best_match(self, extracted_title, all_series):
         """Find the best matching series title from the database (now includes aliases)"""
@@ -2772,7 +5476,14 @@ class MetadataGUI(tk.Tk):
         cleaned_extracted = self._clean_title_for_matching(extracted_title)
         normalized_extracted = self._normalize_for_comparison(cleaned_extracted)
         
-        # Get all series with their aliases
+        # Fast path: exact hit on any saved title variant
+        exact_match = self._get_series_exact_map().get(normalized_extracted)
+        if exact_match:
+            return exact_match
+        
+        # Get all series with their aliases (title fields loaded in one pass)
+        metadata_by_series = series_db.load_title_fields_many(
+            item[0] if isinstance(item, tuple) else item for item in all_series)
         series_with_variants = []
         for series_item in all_series:
             if len(series_item) == 3:
@@ -2782,44 +5493,8 @@ class MetadataGUI(tk.Tk):
                 series_name = series_item[0] if isinstance(series_item, tuple) else series_item
                 aliases = []
             
-            # Load metadata for localized titles
-            series_metadata = series_db.load_series_metadata(series_name)
-            if not isinstance(series_metadata, dict):
-                series_metadata = {'Series': series_name}
-            
-            # Collect all title variants
-            all_titles = [series_name]
-            
-            # Add aliases
-            if aliases:
-                all_titles.extend(aliases)
-            
-            # Add LocalizedSeries from metadata
-            if series_metadata and 'LocalizedSeries' in series_metadata and series_metadata['LocalizedSeries']:
-                localized_titles = [title.strip() for title in series_metadata['LocalizedSeries'].split(',') if title.strip()]
-                all_titles.extend(localized_titles)
-            
-            # Add other alternative title fields from metadata
-            if series_metadata and isinstance(series_metadata, dict):
-                for field in ['Native', 'Romaji', 'Secondary']:
-                    alt_title = series_metadata.get(field, '').strip()
-                    if alt_title and alt_title not in all_titles:
-                        all_titles.append(alt_title)
-            
-            # Remove duplicates while preserving order
-            unique_titles = []
-            for title in all_titles:
-                if title not in unique_titles:
-                    unique_titles.append(title)
-            
-            series_with_variants.append((series_name, unique_titles))
-        
-        # First try exact match against all title variants (after cleaning)
-        for series_name, title_variants in series_with_variants:
-            for title_variant in title_variants:
-                cleaned_variant = self._clean_title_for_matching(title_variant)
-                if self._normalize_for_comparison(cleaned_variant) == normalized_extracted:
-                    return series_name
+            series_with_variants.append((series_name, self._series_title_variants(
+                series_name, aliases, metadata_by_series.get(series_name, {}))))
         
         # Then try substring matching (both ways) with cleaned titles
         best_matches = []
@@ -2950,13 +5625,19 @@ class MetadataGUI(tk.Tk):
             messagebox.showwarning("Warning", f"Could not extract title from filename: {filename}")
             return
         
-        # Search for matching series in DB (now includes aliases)
-        all_series = series_db.get_all_series_with_aliases()
-        best_match = self._find_best_match(extracted_title, all_series)
+        # Learned match first, then a ready background match, then search the DB (now includes aliases)
+        best_match = self._learned_series(extracted_title, self.file_metadata.get(current_file))
+        ready = self._speculative_cache.get(current_file)
+        if not best_match and ready is not None and ready["title"] == extracted_title and "series" in ready:
+            best_match = ready["series"]
+        elif not best_match:
+            all_series = series_db.get_all_series_with_aliases()
+            best_match = self._find_best_match(extracted_title, all_series)
         
         if best_match:
             series_metadata = series_db.load_series_metadata(best_match)
             if series_metadata:
+                series_db.save_resolution(extracted_title, series_name=best_match, source="match_series")
                 # Apply to current file only
                 existing_metadata = self.file_metadata.get(current_file, {})
                 file_specific_data = {
@@ -3003,12 +5684,18 @@ class MetadataGUI(tk.Tk):
                 match_results.append(f"❌ {filename} - Could not extract title")
                 continue
             
-            # Search for matching series (now includes aliases)
-            best_match = self._find_best_match(extracted_title, all_series)
+            # Learned match first, then a ready background match, then search (now includes aliases)
+            best_match = self._learned_series(extracted_title, self.file_metadata.get(cbz_path))
+            ready = self._speculative_cache.get(cbz_path)
+            if not best_match and ready is not None and ready["title"] == extracted_title and "series" in ready:
+                best_match = ready["series"]
+            elif not best_match:
+                best_match = self._find_best_match(extracted_title, all_series)
             
             if best_match:
                 series_metadata = series_db.load_series_metadata(best_match)
                 if series_metadata:
+                    series_db.save_resolution(extracted_title, series_name=best_match, source="match_series")
                     # Apply to this file
                     existing_metadata = self.file_metadata.get(cbz_path, {})
                     file_specific_data = {
@@ -3043,10 +5730,10 @@ class MetadataGUI(tk.Tk):
         # Show results in a scrollable dialog
         self._show_match_results(result_text)
     
-    def _show_match_results(self, results_text):
+    def _show_match_results(self, results_text, title="Match Results"):
         """Show match results in a scrollable dialog"""
         dialog = tk.Toplevel(self)
-        dialog.title("Match Results")
+        dialog.title(title)
         dialog.transient(self)
         dialog.grab_set()
         
@@ -3082,6 +5769,7 @@ class MetadataGUI(tk.Tk):
         """Open the series database manager"""
         dialog = SeriesManagerDialog(self)
         self.wait_window(dialog)
+        self._invalidate_series_caches()  # aliases may have been edited or series deleted
         
         if hasattr(dialog, 'selected_series') and dialog.selected_series:
             # Load selected series to files
@@ -3440,40 +6128,12 @@ class MetadataGUI(tk.Tk):
         if not selection:
             return
     
+        # A batch search is for the whole folder, only a per-file search belongs to the old selection
+        if self.metadata_mode.get() == "individual":
+            self._cancel_search_stream()
         self.save_current_metadata()
         self.load_metadata(selection[0])
         self.populate_dropdown_for_current_file()
-    
-        current_file = self.cbz_paths[selection[0]]
-    
-        if self.metadata_mode.get() == "individual" and current_file in self.individual_metadata_cache:
-            cache_data = self.individual_metadata_cache[current_file]
-            self.metadata_options = cache_data.get('options', [])
-    
-            dropdown_values = []
-            for meta in self.metadata_options:
-                title_text = meta.get("Title", "Unknown")
-                type_text = meta.get("type", "")
-                year_text = meta.get("Year", "")
-                content_rating_text = meta.get("content_rating", "")
-    
-                parts = [title_text]
-                if type_text:
-                    parts.append(f"({type_text.title()})")
-                if year_text:
-                    parts.append(f"({year_text})")
-                if content_rating_text:
-                    parts.append(f"({content_rating_text.title()})")
-    
-                dropdown_values.append(" ".join(parts))
-    
-            self.dropdown['values'] = dropdown_values
-    
-            if dropdown_values:
-                self.dropdown.set(dropdown_values[0])
-                self.update_metadata_from_dropdown()
-            else:
-                self.dropdown.set("No matches found")
 
 
     def fetch_metadata_smart(self):
@@ -3486,68 +6146,144 @@ class MetadataGUI(tk.Tk):
             self.fetch_metadata_individual()
 
     def fetch_metadata_batch_fixed(self):
-        """FIXED version of fetch_metadata_batch"""
+        """Search the dump on a worker thread and stream improving matches into the dropdown"""
         title = self.title_var.get().strip()
         if not title:
             messagebox.showerror("Error", "Please enter a manga title")
             return
-            
+        
+        # A new search supersedes any search still streaming
+        self._search_generation += 1
+        generation = self._search_generation
+        self._search_streaming = True
+        
+        learned = self._learned_metadata(title)
+        if learned:
+            # A title confirmed before is applied right away, the search only lists alternatives
+            self.metadata_options = [learned]
+            self.dropdown['values'] = [self._dropdown_label(learned)]
+            self.dropdown.current(0)
+            self.update_metadata_from_dropdown()
+        else:
+            self.metadata_options = []
+            self.dropdown['values'] = []
+            self.dropdown.set("Searching...")
+        
+        thread = Thread(target=self._stream_search_worker,
+                        args=(generation, title, self.get_search_filters(), learned), daemon=True)
+        thread.start()
+    
+    def _stream_search_worker(self, generation, title, filters, learned=None):
+        """Background thread: push search snapshots to the dropdown until done or superseded.
+        
+        A learned option stays pinned as the first entry of every snapshot.
+        """
+        pinned = learned is not None
         try:
-            local_only = self.local_only_mode.get()
-            
-            # Use the optimized search function
-            raw_entries = find_best_match_merge_aware(title)  # This returns raw entries
-            
-            if not raw_entries:
-                messagebox.showinfo("No Results", "No metadata found for this title")
+            engine = get_search_engine()
+            if engine is None:
+                self.after(0, self._finish_search_stream, generation, pinned)
                 return
             
-            # Extract metadata from raw entries
-            self.metadata_options = []
-            for entry in raw_entries:
-                metadata = self.extract_metadata(entry)
-                self.metadata_options.append(metadata)
-            
-            # Update dropdown with results - FIXED LOGIC
-            dropdown_values = []
-            for i, meta in enumerate(self.metadata_options):
-                # Try different title sources in order of preference
-                title_text = (meta.get("Title") or 
-                             meta.get("all_titles", {}).get("romanized") or 
-                             meta.get("all_titles", {}).get("native") or 
-                             "Unknown")
-                
-                type_text = meta.get("type", "")
-                year_text = meta.get("Year", "")
-                content_rating_text = meta.get("content_rating", "")
-                
-                # Build display name
-                parts = [title_text]
-                if type_text:
-                    parts.append(f"({type_text.title()})")
-                if year_text:
-                    parts.append(f"({year_text})")
-                if content_rating_text:
-                    parts.append(f"({content_rating_text.title()})")
-                
-                display_name = " ".join(parts)
-                dropdown_values.append(display_name)
-                
-
-            self.dropdown['values'] = dropdown_values
-            self.dropdown.set("Select a metadata match...")
+            metadata_by_id = {}  # Entries reappear across snapshots, extract each once
+            snapshots = engine.iter_search(title, filters)
+            try:
+                for stage, matches in snapshots:
+                    if generation != self._search_generation:
+                        logging.info(f"Search for '{title}' cancelled during {stage} stage")
+                        return
+                    options = [learned] if pinned else []
+                    for entry, score, match_text, branch in matches:
+                        entry_id = entry.get("id")
+                        if pinned and str(entry_id) == learned.get("entry_id"):
+                            continue
+                        if entry_id not in metadata_by_id:
+                            metadata_by_id[entry_id] = self.extract_metadata(entry)
+                        options.append(metadata_by_id[entry_id])
+                    self.after(0, self._apply_search_snapshot, generation, options, pinned)
+            finally:
+                snapshots.close()
             
-            if len(self.metadata_options) == 1:
-                # Auto-select if only one result
-                self.dropdown.set(dropdown_values[0])
-                self.update_metadata_from_dropdown()
-            else:
-                messagebox.showinfo("Multiple Results", 
-                                  f"Found {len(self.metadata_options)} matches. Please select one from the dropdown.")
-                
+            self.after(0, self._finish_search_stream, generation, pinned)
         except Exception as e:
             logging.error(f"Error fetching metadata: {e}")
-            messagebox.showerror("Error", f"Failed to fetch metadata: {str(e)}")
+            self.after(0, self._fail_search_stream, generation, str(e))
+    
+    @staticmethod
+    def _dropdown_label(meta):
+        """Display name for a metadata option in the dropdown"""
+        # Try different title sources in order of preference
+        title_text = (meta.get("Title") or 
+                     meta.get("all_titles", {}).get("romanized") or 
+                     meta.get("all_titles", {}).get("native") or 
+                     "Unknown")
+        
+        type_text = meta.get("type", "")
+        year_text = meta.get("Year", "")
+        content_rating_text = meta.get("content_rating", "")
+        
+        # Build display name
+        parts = [title_text]
+        if type_text:
+            parts.append(f"({type_text.title()})")
+        if year_text:
+            parts.append(f"({year_text})")
+        if content_rating_text:
+            parts.append(f"({content_rating_text.title()})")
+        return " ".join(parts)
+    
+    def _apply_search_snapshot(self, generation, options, pinned=False):
+        """Show a partial result list; the user may already pick from it"""
+        if generation != self._search_generation:
+            return
+        self.metadata_options = options
+        self.dropdown['values'] = [self._dropdown_label(meta) for meta in options]
+        if pinned:
+            self.dropdown.current(0)
+        else:
+            self.dropdown.set(f"Searching... {len(options)} matches so far")
+    
+    def _finish_search_stream(self, generation, pinned=False):
+        if generation != self._search_generation:
+            return
+        self._search_streaming = False
+        
+        if pinned:
+            # The learned option was applied when the search started
+            self.dropdown.current(0)
+            return
+        
+        if not self.metadata_options:
+            self.dropdown.set("No matches found")
+            messagebox.showinfo("No Results", "No metadata found for this title")
+            return
+        
+        self.dropdown.set("Select a metadata match...")
+        if len(self.metadata_options) == 1:
+            # Auto-select if only one result (not learned, nobody confirmed it)
+            self.dropdown.current(0)
+            self.update_metadata_from_dropdown()
+        else:
+            messagebox.showinfo("Multiple Results", 
+                              f"Found {len(self.metadata_options)} matches. Please select one from the dropdown.")
+    
+    def _fail_search_stream(self, generation, error):
+        if generation != self._search_generation:
+            return
+        self._search_streaming = False
+        self.dropdown.set("Search failed")
+        messagebox.showerror("Error", f"Failed to fetch metadata: {error}")
+    
+    def _cancel_search_stream(self):
+        """Stop a streaming search; the worker notices at its next snapshot"""
+        if self._search_streaming:
+            self._search_generation += 1
+            self._search_streaming = False
+    
+    def _on_dropdown_selected(self, event=None):
+        """Picking a result while a search is streaming keeps that pick and stops the search"""
+        self._cancel_search_stream()
+        self.update_metadata_from_dropdown(learn=True)
 
     def fetch_metadata_individual(self):
         """Fetch different metadata for each file based on filename"""
@@ -3603,7 +6339,7 @@ class MetadataGUI(tk.Tk):
         try:
             local_only = self.local_only_mode.get()
             # Use the same function as batch mode but for individual file
-            raw_entries = find_best_match_merge_aware(title)
+            raw_entries = find_best_match_merge_aware(title, self.get_search_filters())
             
             if not raw_entries:
                 messagebox.showinfo("No Matches", f"No metadata found for '{title}'")
@@ -3620,7 +6356,9 @@ class MetadataGUI(tk.Tk):
                 'title_used': title
             }
             self.dropdown_selection_per_file[cbz_path] = 0
+            self._apply_metadata_option(cbz_path, metadata_options[0].copy())
             self.populate_dropdown_for_current_file()
+            self.load_metadata(self.current_index)
             messagebox.showinfo("Success", f"Updated metadata options for:\n{filename}")
         except Exception as e:
             logging.error(f"Error refetching metadata: {e}")
@@ -3634,6 +6372,10 @@ class MetadataGUI(tk.Tk):
             successful_fetches = 0
             failed_extractions = []
             failed_fetches = []
+            filters = self.get_search_filters()
+            learned_hits = 0
+            accept_score, accept_margin = self._auto_accept_settings()
+            auto_accepted = 0
     
             for i, cbz_path in enumerate(self.cbz_paths):
                 filename = os.path.basename(cbz_path)
@@ -3646,31 +6388,44 @@ class MetadataGUI(tk.Tk):
     
                 try:
                     local_only = self.local_only_mode.get()
+                    learned = self._learned_metadata(title)
                     
-                    if local_only:
-                        # Use optimized local search
-                        raw_entries = find_best_match_merge_aware(title)
-                        
-                        if raw_entries:
-                            # Extract metadata from raw entries
-                            metadata_options = []
-                            for entry in raw_entries:
-                                metadata = self.extract_metadata(entry)
-                                metadata_options.append(metadata)
-                        else:
-                            metadata_options = []
+                    ready = self._speculative_result(cbz_path, title, filters)
+                    
+                    if ready is not None and (ready["options"] or local_only or learned):
+                        # Already matched in the background after the folder was loaded
+                        metadata_options, scores = ready["options"], ready["scores"]
                     else:
-                        # Use the full search function (local + API)
-                        metadata_options = get_metadata_from_dump_or_api(title, local_only=local_only)
+                        # Use optimized local search, keeping the scores
+                        scored = find_best_match_scored(title, filters)
+                        metadata_options = [self.extract_metadata(entry) for entry, _ in scored]
+                        scores = [score for _, score in scored]
+                        
+                        if not metadata_options and not local_only and not learned:
+                            # Use the full search function (local + API), API results carry no score
+                            metadata_options = get_metadata_from_dump_or_api(title, local_only=local_only, filters=filters)
+                            scores = [None] * len(metadata_options)
+                    
+                    if learned:
+                        # Confirmed before: first and accepted, the search results stay as alternatives
+                        metadata_options, scores = self._pin_learned(learned, metadata_options, scores)
+                        learned_hits += 1
     
                     print(f"[R] Matches for '{title}': {len(metadata_options)}")
     
                     # Only cache if we found matches
                     if metadata_options:
+                        confidence, accepted = match_confidence(scores, accept_score, accept_margin)
+                        if learned:
+                            confidence, accepted = 100, True
                         self.individual_metadata_cache[cbz_path] = {
                             'options': metadata_options,
-                            'title_used': title
+                            'title_used': title,
+                            'scores': scores,
+                            'confidence': confidence,
+                            'auto_accepted': accepted
                         }
+                        auto_accepted += accepted
                         successful_fetches += 1
                     else:
                         failed_fetches.append(filename)
@@ -3679,6 +6434,8 @@ class MetadataGUI(tk.Tk):
                     failed_fetches.append(f"{filename} (error: {str(e)})")
                     logging.error(f"Error fetching metadata for {filename}: {e}")
     
+            logging.info(f"Individual fetch: {learned_hits}/{total_files} files resolved from learned titles, "
+                         f"{auto_accepted}/{successful_fetches} auto-accepted")
             self.after(0, self._finish_individual_fetch, successful_fetches, total_files,
                        failed_extractions, failed_fetches)
     
@@ -3699,10 +6456,20 @@ class MetadataGUI(tk.Tk):
         """Finish individual fetch process"""
         self._hide_progress()
         
+        # Auto-accepted files get their top match now; the rest wait for a pick
+        for cbz_path, cache_data in self.individual_metadata_cache.items():
+            self.dropdown_selection_per_file.pop(cbz_path, None)
+            if cache_data.get('auto_accepted') and cache_data.get('options'):
+                self._apply_metadata_option(cbz_path, cache_data['options'][0].copy())
+                self.dropdown_selection_per_file[cbz_path] = 0
+        
         # Create detailed results message
         results = []
         if successful > 0:
             results.append(f"✓ Successfully fetched metadata for {successful}/{total} files")
+            accepted = sum(1 for data in self.individual_metadata_cache.values() if data.get('auto_accepted'))
+            results.append(f"✓ Auto-accepted {accepted}, {successful - accepted} need review "
+                           f"(marked ? in the file list)")
         
         if failed_extractions:
             results.append(f"\n⚠ Could not extract titles from {len(failed_extractions)} files:")
@@ -3731,8 +6498,8 @@ class MetadataGUI(tk.Tk):
         if self.cbz_paths and self.current_index < len(self.cbz_paths):
             self.load_metadata(self.current_index)
         
-        # Update file listbox to show which files have metadata
-        self._update_file_listbox_indicators()
+        # Update file listbox to show which files have metadata (sorted by confidence if enabled)
+        self._apply_file_order()
         
         # Show results
         messagebox.showinfo("Fetch Complete", "\n".join(results))
@@ -3741,6 +6508,112 @@ class MetadataGUI(tk.Tk):
         """Hide progress UI"""
         self.progress_frame.pack_forget()
 
+    def _learned_metadata(self, title):
+        """Metadata of the dump entry (else the saved series) confirmed before for this title, or None"""
+        resolution = series_db.load_resolution(title)
+        if not resolution:
+            return None
+        entry = find_dump_entry(resolution["entry_id"]) if resolution["entry_id"] else None
+        if entry is not None:
+            logging.info(f"Learned resolution for '{title}': entry {resolution['entry_id']} ({resolution['source']})")
+            return self.extract_metadata(entry)
+        # No dump entry (API result, or no dump loaded): a learned series template still answers
+        if resolution["series_name"]:
+            template = series_db.load_series_metadata(resolution["series_name"])
+            if template:
+                logging.info(f"Learned resolution for '{title}': series '{resolution['series_name']}' "
+                             f"({resolution['source']})")
+                return template
+        return None
+    
+    def _learned_series(self, title, file_metadata=None):
+        """Saved series matched before to this title, if it still exists.
+        
+        Falls back to an indexed id lookup: a series saved from the dump entry
+        confirmed for this title, or sharing the file's entry_id / AniList link.
+        """
+        resolution = series_db.load_resolution(title) or {}
+        if resolution.get("series_name") and series_db.load_series_metadata(resolution["series_name"]) is not None:
+            return resolution["series_name"]
+        if resolution.get("entry_id"):
+            series_name = series_db.find_series_by_id(entry_id=resolution["entry_id"])
+            if series_name:
+                return series_name
+        
+        file_metadata = file_metadata or {}
+        if file_metadata.get("entry_id"):
+            series_name = series_db.find_series_by_id(entry_id=file_metadata["entry_id"])
+            if series_name:
+                return series_name
+        web = file_metadata.get("Web") or ""
+        if "anilist.co" in web.lower():
+            try:
+                return series_db.find_series_by_id(anilist_id=extract_anilist_id_from_url(web))
+            except ValueError:
+                return None
+        return None
+    
+    @staticmethod
+    def _pin_learned(learned, options, scores):
+        """(options, scores) with the learned option first at 100, its duplicate among the results dropped"""
+        entry_id = learned.get("entry_id")
+        pinned_options, pinned_scores = [learned], [100]
+        for meta, score in zip(options, scores):
+            if meta is learned or meta == learned or (entry_id and str(meta.get("entry_id")) == str(entry_id)):
+                continue
+            pinned_options.append(meta)
+            pinned_scores.append(score)
+        return pinned_options, pinned_scores
+    
+    def _remember_dropdown_choice(self, metadata, source="dropdown"):
+        """Learn a confirmed dropdown choice for the title(s) it was picked for.
+        
+        In batch mode that is the searched title only: the loaded files may be
+        more than one series.
+        """
+        entry_id = metadata.get("entry_id")
+        if not entry_id or not self.cbz_paths:
+            return
+        if self.metadata_mode.get() == "batch":
+            titles = [self.title_var.get()]
+        elif self.current_index < len(self.cbz_paths):
+            current_file = self.cbz_paths[self.current_index]
+            titles = [self._extract_title_from_filename(os.path.basename(current_file)),
+                      self.individual_metadata_cache.get(current_file, {}).get('title_used')]
+        else:
+            return
+        for title in {t.strip() for t in titles if t and t.strip()}:
+            series_db.save_resolution(title, entry_id=entry_id, source=source)
+    
+    def forget_learned_match(self):
+        """Delete the learned resolution of the searched title (batch) or the current file's title(s)"""
+        if self.metadata_mode.get() == "batch" or not self.cbz_paths:
+            titles = [self.title_var.get()]
+        elif self.current_index < len(self.cbz_paths):
+            current_file = self.cbz_paths[self.current_index]
+            titles = [self._extract_title_from_filename(os.path.basename(current_file)),
+                      self.individual_metadata_cache.get(current_file, {}).get('title_used')]
+        else:
+            return
+        titles = sorted({t.strip() for t in titles if t and t.strip()})
+        learned = [t for t in titles if series_db.load_resolution(t)]
+        if not learned:
+            messagebox.showinfo("Forget Match", "No learned match for: " + ", ".join(f"'{t}'" for t in titles or [""]))
+            return
+        if not messagebox.askyesno("Forget Match", "Forget the learned match for:\n\n" +
+                                   "\n".join(f"• {t}" for t in learned)):
+            return
+        
+        for title in learned:
+            series_db.delete_resolution(title)
+        # Background matches pinned the old choice
+        for path, ready in list(self._speculative_cache.items()):
+            if ready["title"] in learned:
+                self._speculative_cache.pop(path, None)
+        logging.info(f"Forgot learned matches for {learned}")
+        messagebox.showinfo("Forget Match", f"Forgot {len(learned)} learned match(es). Fetch again to see the "
+                                            f"search results without them.")
+    
     def _extract_title_from_filename(self, filename):
         """Extract title from filename, removing file extension and chapter/volume info"""
         # Remove file extension
@@ -3752,7 +6625,7 @@ class MetadataGUI(tk.Tk):
         return cleaned_title.strip()
 
     def _update_file_listbox_indicators(self):
-        """Update file listbox to show which files have metadata"""
+        """Update file listbox to show which files have metadata and how confident the match is"""
         if not hasattr(self, 'file_listbox'):
             return
         
@@ -3762,13 +6635,54 @@ class MetadataGUI(tk.Tk):
         # Re-populate with indicators
         for cbz_path in self.cbz_paths:
             filename = os.path.basename(cbz_path)
-            # Add indicator if metadata was fetched individually
-            if cbz_path in self.individual_metadata_cache:
+            # Add indicator if metadata was fetched individually: ✓ auto-accepted, ? needs review
+            cache_data = self.individual_metadata_cache.get(cbz_path)
+            if cache_data is None:
+                indicator = ""
+            elif 'confidence' not in cache_data:
                 indicator = "✓ "
             else:
-                indicator = ""
+                mark = "✓" if cache_data.get('auto_accepted') else "?"
+                indicator = f"{mark} [{cache_data['confidence']}] "
             
             self.file_listbox.insert(tk.END, f"{indicator}{filename}")
+        
+        if self.cbz_paths and self.current_index < len(self.cbz_paths):
+            self.file_listbox.select_set(self.current_index)
+    
+    def _auto_accept_settings(self):
+        """Auto-accept (score, margin) from the UI, defaults when the fields hold junk"""
+        try:
+            score = int(self.auto_accept_score.get())
+        except (tk.TclError, ValueError):
+            score = AUTO_ACCEPT_SCORE
+        try:
+            margin = int(self.auto_accept_margin.get())
+        except (tk.TclError, ValueError):
+            margin = AUTO_ACCEPT_MARGIN
+        return score, margin
+    
+    def _file_confidence(self, cbz_path):
+        """Sort key for review order: no match first, then lowest confidence, then needing review"""
+        cache_data = self.individual_metadata_cache.get(cbz_path)
+        if cache_data is None:
+            return (-1, False)
+        return (cache_data.get('confidence', 0), bool(cache_data.get('auto_accepted')))
+    
+    def _apply_file_order(self):
+        """Order the file list by confidence (low first) or restore the loaded order"""
+        if not self.cbz_paths:
+            return
+        current_file = self.cbz_paths[self.current_index] if self.current_index < len(self.cbz_paths) else None
+        
+        if self.sort_by_confidence.get():
+            self.cbz_paths.sort(key=lambda path: (self._file_confidence(path), self._load_order.get(path, 0)))
+        else:
+            self.cbz_paths.sort(key=lambda path: self._load_order.get(path, 0))
+        
+        if current_file in self.cbz_paths:
+            self.current_index = self.cbz_paths.index(current_file)
+        self._update_file_listbox_indicators()
 
     def fetch_anilist_metadata_gui(self):
         """Fetch AniList metadata for ALL files based on current mode"""
@@ -3849,18 +6763,22 @@ class MetadataGUI(tk.Tk):
         if not self.cbz_paths:
             return
         
+        if self._anilist_fetch_running:
+            messagebox.showinfo("Fetch AniList Metadata", "An AniList fetch is already running.")
+            return
+        
         # Confirm with user since this will make multiple API calls
         result = messagebox.askyesno("Fetch AniList Metadata", 
                                     f"This will fetch AniList metadata for all {len(self.cbz_paths)} files.\n\n"
-                                    f"Each file may have different AniList links, so this will make separate API calls.\n\n"
+                                    f"Each file may have different AniList links; distinct links are fetched in batched API calls.\n\n"
                                     f"Continue?")
         if not result:
             return
         
         try:
-            files_updated = 0
             files_with_no_links = []
             files_with_errors = []
+            files_by_id = {}
             
             print(f"\n{'='*60}")
             print(f"🔍 ANILIST METADATA FETCH STARTING")
@@ -3871,9 +6789,6 @@ class MetadataGUI(tk.Tk):
                 filename = os.path.basename(cbz_path)
                 print(f"📁 Processing [{i+1}/{len(self.cbz_paths)}]: {filename}")
                 
-                # Update progress (you might want to add a progress bar here)
-                self.update_idletasks()
-                
                 current_metadata = self.file_metadata.get(cbz_path, {})
                 web_links = current_metadata.get('Web', '')
                 
@@ -3914,22 +6829,48 @@ class MetadataGUI(tk.Tk):
                     print(f"   ❌ Error extracting AniList ID: {str(e)}")
                     continue
                 
-                # Fetch AniList metadata for this file
-                try:
-                    anilist_metadata = fetch_anilist_metadata(anilist_id)
-                    
-                    if anilist_metadata:
-                        current_metadata.update(anilist_metadata)
-                        self.file_metadata[cbz_path] = current_metadata
-                        files_updated += 1
-                        print(f"   ✅ Successfully fetched metadata (ID: {anilist_id})")
-                    else:
+                files_by_id.setdefault(anilist_id, []).append(cbz_path)
+            
+            # The batched requests wait on the AniList rate limit, keep them off the Tk thread
+            print(f"🌐 Fetching {len(files_by_id)} distinct AniList IDs for {sum(map(len, files_by_id.values()))} files")
+            self._anilist_fetch_running = True
+            thread = Thread(target=self._anilist_fetch_worker,
+                            args=(files_by_id, files_with_no_links, files_with_errors), daemon=True)
+            thread.start()
+            
+        except Exception as e:
+            self._anilist_fetch_running = False
+            logging.error(f"Error in fetch_anilist_metadata_individual_all: {e}")
+            messagebox.showerror("Error", f"Failed to fetch AniList metadata: {str(e)}")
+    
+    def _anilist_fetch_worker(self, files_by_id, files_with_no_links, files_with_errors):
+        """Background thread: fetch every distinct AniList ID at once, then apply on the Tk thread"""
+        try:
+            # Aliased batch queries, one result shared by all files of the same series
+            anilist_results = fetch_anilist_metadata_many(files_by_id)
+        except Exception as e:
+            logging.error(f"AniList batch fetch failed: {e}")
+            print(f"   ❌ AniList API error: {str(e)}")
+            anilist_results = {}
+        self.after(0, self._apply_anilist_results, files_by_id, anilist_results,
+                   files_with_no_links, files_with_errors)
+    
+    def _apply_anilist_results(self, files_by_id, anilist_results, files_with_no_links, files_with_errors):
+        """Merge fetched AniList metadata into the files and report (Tk thread)"""
+        self._anilist_fetch_running = False
+        try:
+            files_updated = 0
+            for anilist_id, paths in files_by_id.items():
+                anilist_metadata = anilist_results.get(anilist_id)
+                for cbz_path in paths:
+                    filename = os.path.basename(cbz_path)
+                    if not anilist_metadata:
                         files_with_errors.append(filename)
-                        print(f"   ❌ AniList API returned no data for ID: {anilist_id}")
-                        
-                except Exception as e:
-                    files_with_errors.append(filename)
-                    print(f"   ❌ AniList API error: {str(e)}")
+                        print(f"   ❌ {filename}: AniList API returned no data for ID: {anilist_id}")
+                    elif cbz_path in self.file_metadata:  # Skip files unloaded during the fetch
+                        self.file_metadata[cbz_path].update(anilist_metadata)
+                        files_updated += 1
+                        print(f"   ✅ {filename}: fetched metadata (ID: {anilist_id})")
             
             # Print summary to console
             print(f"\n{'='*60}")
@@ -3977,13 +6918,18 @@ class MetadataGUI(tk.Tk):
             messagebox.showerror("Error", f"Failed to fetch AniList metadata: {str(e)}")
 
 
-    def update_metadata_from_dropdown(self, *args):
-        """Updated method to handle both batch and individual modes"""
+    def update_metadata_from_dropdown(self, *args, learn=False):
+        """Updated method to handle both batch and individual modes.
+        
+        learn=True marks a user-confirmed choice, remembered for the file titles.
+        """
         selection_idx = self.dropdown.current()
         if selection_idx < 0 or selection_idx >= len(self.metadata_options):
             return
     
         selected_metadata = self.metadata_options[selection_idx].copy()
+        if learn:
+            self._remember_dropdown_choice(selected_metadata)
     
         if self.cbz_paths and self.current_index < len(self.cbz_paths):
             current_file = self.cbz_paths[self.current_index]
@@ -3993,23 +6939,21 @@ class MetadataGUI(tk.Tk):
     
         if mode == "batch":
             for cbz_path in self.cbz_paths:
-                volume = extract_volume_from_filename(os.path.basename(cbz_path))
-                if volume:
-                    selected_metadata["Volume"] = volume
-                if "Web" in selected_metadata:
-                    selected_metadata["Web"] = self.clean_links(selected_metadata["Web"])
-                self.file_metadata[cbz_path].update(selected_metadata)
+                self._apply_metadata_option(cbz_path, selected_metadata)
         else:
             if self.cbz_paths and self.current_index < len(self.cbz_paths):
-                current_file = self.cbz_paths[self.current_index]
-                volume = extract_volume_from_filename(os.path.basename(current_file))
-                if volume:
-                    selected_metadata["Volume"] = volume
-                if "Web" in selected_metadata:
-                    selected_metadata["Web"] = self.clean_links(selected_metadata["Web"])
-                self.file_metadata[current_file].update(selected_metadata)
+                self._apply_metadata_option(self.cbz_paths[self.current_index], selected_metadata)
     
         self.load_metadata(self.current_index)
+    
+    def _apply_metadata_option(self, cbz_path, selected_metadata):
+        """Write a chosen metadata option into file_metadata (what Insert writes) for one file"""
+        volume = extract_volume_from_filename(os.path.basename(cbz_path))
+        if volume:
+            selected_metadata["Volume"] = volume
+        if "Web" in selected_metadata:
+            selected_metadata["Web"] = self.clean_links(selected_metadata["Web"])
+        self.file_metadata.setdefault(cbz_path, {field: "" for field in self.fields}).update(selected_metadata)
 
         
     def insert_metadata(self):
@@ -4335,6 +7279,8 @@ class MetadataGUI(tk.Tk):
             total_files = len(self.cbz_paths)
             success_count = 0
             error_files = []
+            succeeded_paths = []
+            auto_learn = self.auto_learn_series.get()
             
             # Pre-process all metadata to avoid repeated lookups
             processed_metadata = {}
@@ -4391,6 +7337,7 @@ class MetadataGUI(tk.Tk):
                         result = future.result()
                         if result is True:
                             success_count += 1
+                            succeeded_paths.append(cbz_path)
                         else:
                             error_files.append(f"{filename}: {result}")
                     except Exception as e:
@@ -4398,8 +7345,10 @@ class MetadataGUI(tk.Tk):
                         error_files.append(f"{filename}: {error_msg}")
                         logging.error(f"Failed to process {cbz_path}: {e}")
             
+            learned_count = self._learn_series_from_files(succeeded_paths) if auto_learn else 0
+            
             # Finished successfully
-            self.after(0, self._finish_insertion, success_count, total_files, error_files)
+            self.after(0, self._finish_insertion, success_count, total_files, error_files, learned_count)
             
         except Exception as e:
             # Handle unexpected errors
@@ -4407,6 +7356,49 @@ class MetadataGUI(tk.Tk):
             logging.error(error_msg)
             self.after(0, lambda: self._handle_insertion_error(error_msg, 0))
     
+    def _learn_series_from_files(self, paths):
+        """Save the series applied to these files as templates in one transaction.
+        
+        Each distinct Series not saved yet gets the first file's metadata (minus
+        file-specific fields) as its template; existing templates are kept as
+        they are. Every series gains its files' filename titles as extra aliases
+        and a learned title resolution per filename title, so Fetch and Match
+        resolve those files directly next time. Returns the number of new templates.
+        """
+        by_series = {}
+        for path in sorted(paths):
+            metadata = self.file_metadata.get(path) or {}
+            series_name = str(metadata.get('Series', '')).strip()
+            if not series_name:
+                continue
+            if series_name not in by_series:
+                template = metadata.copy()
+                for field in ('Number', 'Volume', 'PageCount'):
+                    if field in template:
+                        template[field] = ""
+                by_series[series_name] = (template, set())
+            title = self._extract_title_from_filename(os.path.basename(path))
+            if title and title.strip():
+                by_series[series_name][1].add(title.strip())
+        if not by_series:
+            return 0
+        
+        items = []
+        resolutions = []
+        for series_name, (template, titles) in by_series.items():
+            aliases = sorted(t for t in titles if t.casefold() != series_name.casefold())
+            items.append((series_name, template, aliases))
+            resolutions.extend((title, template.get('entry_id'), series_name, "auto_learn") for title in titles)
+        
+        existing = series_db.load_series_metadata_many(by_series)
+        if not series_db.save_series_many(items, resolutions=resolutions, replace_aliases=False,
+                                          keep_existing=True):
+            return 0
+        created = len(items) - len(existing)
+        logging.info(f"Learned {created} new series templates, {len(existing)} kept "
+                     f"({len(resolutions)} filename titles)")
+        return created
+    
     def _process_single_cbz_file(self, cbz_path, metadata):
         """Process a single CBZ file (called by thread pool)"""
         try:
@@ -4449,9 +7441,12 @@ class MetadataGUI(tk.Tk):
         # Force UI update
         self.update_idletasks()
     
-    def _finish_insertion(self, success_count, total_files, error_files):
+    def _finish_insertion(self, success_count, total_files, error_files, learned_count=0):
         """Handle successful completion (called on main thread)"""
         self._hide_insertion_progress()
+        if learned_count:
+            self._invalidate_series_caches()
+        learned_note = f"\n\n📚 Learned {learned_count} series templates." if learned_count else ""
         
         # Show results
         if error_files:
@@ -4466,12 +7461,12 @@ class MetadataGUI(tk.Tk):
                 self._show_detailed_results(success_count, total_files, error_files)
             else:
                 error_msg = (f"Processed {success_count}/{total_files} files successfully.\n\n"
-                            f"Errors in {len(error_files)} files:\n{error_display}")
+                            f"Errors in {len(error_files)} files:\n{error_display}{learned_note}")
                 messagebox.showwarning("Partial Success", error_msg)
         else:
             messagebox.showinfo("Success", 
                                f"✅ Successfully inserted metadata into all {success_count} CBZ files "
-                               f"using {getattr(self, '_max_workers', 1)} parallel threads!")
+                               f"using {getattr(self, '_max_workers', 1)} parallel threads!{learned_note}")
     
     def _handle_insertion_cancelled(self, success_count, error_files):
         """Handle user cancellation (called on main thread)"""
@@ -4635,6 +7630,25 @@ class MetadataGUI(tk.Tk):
 
 
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="CBZ metadata manager (starts the GUI without options)")
+    parser.add_argument('--export-series', metavar='FILE.jsonl', help="export the series database and exit")
+    parser.add_argument('--import-series', metavar='FILE.jsonl', help="merge a series export (newer wins) and exit")
+    parser.add_argument('--explain', metavar='TITLE', help="print how the local dump search ranks TITLE and exit")
+    parser.add_argument('--strategy', choices=sorted(SEARCH_STRATEGIES), help="search strategy for --explain")
+    args = parser.parse_args()
+    if args.explain:
+        if not local_dump:
+            raise SystemExit(f"No local dump at {DUMP_PATH}, nothing to explain")
+        print(explain_search(args.explain, strategy=args.strategy).format())
+        raise SystemExit(0)
+    if args.export_series or args.import_series:
+        if args.import_series:
+            print(f"Imported {args.import_series}: {series_db.import_jsonl(args.import_series)}")
+        if args.export_series:
+            print(f"Exported {series_db.export_jsonl(args.export_series)} series to {args.export_series}")
+        raise SystemExit(0)
+    
     try:
         app = MetadataGUI()
         app.mainloop()
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# cbz_metadata_manager keeps its log, series.db and API cache in the working
+# directory; import it from a scratch directory so tests don't touch the repo
+os.chdir(tempfile.mkdtemp(prefix="cbz-tests-"))
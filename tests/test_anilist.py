@@ -0,0 +1,79 @@
+"""AniList batching against a fake GraphQL endpoint"""
+import re
+
+import pytest
+
+import cbz_metadata_manager as cmm
+
+MAX_ALIASES = 5  # the fake endpoint refuses larger documents, like AniList's complexity limit
+PAGES = {7: 3, 14: 2}  # media with more than one page of staff and characters
+MISSING = {13}
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+        self.headers = {}
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise cmm.requests.exceptions.HTTPError(str(self.status_code))
+
+
+def connection(name, media_id, page):
+    return {"pageInfo": {"hasNextPage": page < PAGES.get(media_id, 1), "currentPage": page},
+            "edges": [{"role": "MAIN", "node": {"name": {"full": f"{name} {media_id}-{page}"}}}]}
+
+
+@pytest.fixture
+def anilist(monkeypatch):
+    documents = []
+
+    def post(url, json=None):
+        query, variables = json["query"], json["variables"]
+        aliases = re.findall(r"(m\d+): Media\(id: \$id\d+, type: MANGA\) \{\s*(\w+)", query)
+        documents.append(len(aliases))
+        if len(aliases) > MAX_ALIASES:
+            return FakeResponse(400, {"data": None, "errors": [{"message": "Max query complexity"}]})
+        data = {}
+        for i, (alias, first_field) in enumerate(aliases):
+            media_id = variables[f"id{i}"]
+            if media_id in MISSING:
+                data[alias] = None
+            elif first_field == "id":
+                data[alias] = {"id": media_id, "title": {"romaji": f"Title {media_id}"},
+                               "characters": connection("Character", media_id, 1),
+                               "staff": connection("Staff", media_id, 1)}
+            else:
+                data[alias] = {first_field: connection(first_field.title(), media_id, variables[f"page{i}"])}
+        if any(value is None for value in data.values()):
+            return FakeResponse(404, {"data": data, "errors": [{"message": "Not Found.", "status": 404}]})
+        return FakeResponse(200, {"data": data})
+
+    monkeypatch.setattr(cmm.http_client, "post", post)
+    monkeypatch.setattr(cmm, "_anilist_batch_size", cmm.ANILIST_BATCH_SIZE)
+    return documents
+
+
+def test_fetch_many_batches_and_paginates_only_when_needed(anilist):
+    ids = [str(i) for i in range(1, 17)] + ["7", "abc"]
+    results = cmm.fetch_anilist_metadata_many(ids)
+
+    assert set(results) == {str(i) for i in range(1, 17)}
+    assert results["13"] is None
+    assert results["7"]["Characters"] == "Character 7-1, Characters 7-2, Characters 7-3"
+    assert results["14"]["Characters"].count(",") == 1
+    assert results["1"]["Characters"] == "Character 1-1"
+    # One refused 10-media document, then 5 per document for the rest of the run;
+    # further pages only for media 7 (two rounds) and 14 (one round)
+    assert anilist == [10, 5, 5, 5, 1, 4, 2]
+
+
+def test_single_fetch_uses_the_batch_path(anilist):
+    assert cmm.fetch_anilist_metadata("14")["Characters"] == "Character 14-1, Characters 14-2"
+    assert cmm.fetch_anilist_metadata("13") is None
+    assert cmm.fetch_anilist_metadata("abc") is None
@@ -0,0 +1,50 @@
+"""ApiCache: positive and negative entries, expiry, eviction and the legacy JSON import"""
+import json
+import os
+
+import pytest
+
+import cbz_metadata_manager as cmm
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return cmm.ApiCache(str(tmp_path / "api_cache.db"), max_entries=5)
+
+
+def test_put_and_get(cache):
+    assert cache.get("one piece") is None
+    cache.put("one piece", [{"id": 1, "title": "One Piece"}])
+    cache.put("no such title", [])
+    assert cache.get("one piece") == [{"id": 1, "title": "One Piece"}]
+    assert cache.get("no such title") == []
+
+
+def test_entries_expire(cache, monkeypatch):
+    now = cmm.time.time()
+    cache.put("found", [{"id": 1}])
+    cache.put("missing", [])
+    monkeypatch.setattr(cmm.time, "time", lambda: now + cmm.API_CACHE_NEGATIVE_TTL + 1)
+    assert cache.get("missing") is None
+    assert cache.get("found") == [{"id": 1}]
+    monkeypatch.setattr(cmm.time, "time", lambda: now + cmm.API_CACHE_TTL + 1)
+    assert cache.get("found") is None
+
+
+def test_evict_keeps_the_newest_entries(cache, monkeypatch):
+    now = cmm.time.time()
+    for i in range(8):
+        monkeypatch.setattr(cmm.time, "time", lambda: now + i)
+        cache.put(f"query {i}", [{"id": i}])
+    cache.evict()
+    assert [cache.get(f"query {i}") is not None for i in range(8)] == [False] * 3 + [True] * 5
+
+
+def test_legacy_json_is_imported_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open(cmm.CACHE_PATH, "w", encoding="utf-8") as f:
+        json.dump({"old query": [{"id": 7}], "single": {"id": 8}}, f)
+    cache = cmm.ApiCache(str(tmp_path / "api_cache.db"))
+    assert cache.get("old query") == [{"id": 7}]
+    assert cache.get("single") == [{"id": 8}]
+    assert not os.path.exists(cmm.CACHE_PATH) and os.path.exists(cmm.CACHE_PATH + ".migrated")
@@ -0,0 +1,75 @@
+"""Headless checks that individual-mode auto-accept decides what Insert writes (no display needed)"""
+import cbz_metadata_manager as cmm
+
+FIELDS = ["Series", "Volume", "Summary"]
+
+
+class StubVar:
+    def __init__(self, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class StubDropdown(StubVar):
+    def __init__(self):
+        super().__init__("")
+        self.values = []
+
+    def __setitem__(self, key, value):
+        self.values = value
+
+
+def make_gui(monkeypatch, cache):
+    """A MetadataGUI without a Tk window, holding the result of an individual fetch"""
+    monkeypatch.setattr(cmm.messagebox, "showinfo", lambda *args: None)
+    gui = cmm.MetadataGUI.__new__(cmm.MetadataGUI)
+    gui.fields = FIELDS
+    gui.cbz_paths = list(cache)
+    gui.current_index = 0
+    gui.file_metadata = {path: {field: "" for field in FIELDS} for path in cache}
+    gui.individual_metadata_cache = cache
+    gui.dropdown_selection_per_file = {}
+    gui.metadata_mode = StubVar("individual")
+    gui.dropdown = StubDropdown()
+    gui._hide_progress = gui._apply_file_order = lambda: None
+    gui.load_metadata = lambda idx: None
+    return gui
+
+
+def options(*names):
+    return [{"Series": name, "Title": name, "Summary": f"About {name}"} for name in names]
+
+
+def test_only_auto_accepted_files_get_their_top_match(monkeypatch):
+    gui = make_gui(monkeypatch, {
+        "/comics/Sure Thing v03.cbz": {"options": options("Sure Thing", "Sure Thing Side"), "auto_accepted": True},
+        "/comics/Unsure v01.cbz": {"options": options("Unsure A", "Unsure B"), "auto_accepted": False},
+    })
+
+    gui._finish_individual_fetch(2, 2, [], [])
+    assert gui.file_metadata["/comics/Sure Thing v03.cbz"] == {
+        "Series": "Sure Thing", "Title": "Sure Thing", "Summary": "About Sure Thing", "Volume": "3"}
+    assert gui.file_metadata["/comics/Unsure v01.cbz"] == {field: "" for field in FIELDS}
+
+    gui.current_index = 1
+    gui.populate_dropdown_for_current_file()
+    assert gui.dropdown.get() == "Select a match (2 candidates)"
+    assert gui.file_metadata["/comics/Unsure v01.cbz"] == {field: "" for field in FIELDS}
+
+    gui.current_index = 0
+    gui.populate_dropdown_for_current_file()
+    assert gui.dropdown.get() == "Sure Thing"
+
+
+def test_learned_option_is_pinned_above_the_search_results():
+    learned = {"Title": "One Piece", "entry_id": "1"}
+    results = [{"Title": "One Piece", "entry_id": 1}, {"Title": "One Piece Party", "entry_id": 2}]
+
+    options, scores = cmm.MetadataGUI._pin_learned(learned, results, [100, 80])
+    assert options == [learned, results[1]] and scores == [100, 80]
+    assert cmm.MetadataGUI._pin_learned(learned, options, scores) == (options, scores)
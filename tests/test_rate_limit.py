@@ -0,0 +1,104 @@
+"""TokenBucket pacing and rate limit header handling, on a fake clock"""
+import pytest
+
+import cbz_metadata_manager as cmm
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return 1_700_000_000.0 + self.now
+
+    def sleep(self, seconds):
+        self.slept += seconds
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cmm.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(cmm.time, "time", fake.time)
+    monkeypatch.setattr(cmm.time, "sleep", fake.sleep)
+    return fake
+
+
+def test_bucket_paces_requests_to_the_rate(clock):
+    bucket = cmm.TokenBucket(per_minute=60, burst=1)
+    for _ in range(5):
+        bucket.acquire()
+    assert clock.slept == pytest.approx(4.0, abs=0.01)
+
+
+def test_spent_budget_blocks_until_reset(clock):
+    bucket = cmm.TokenBucket(per_minute=600, burst=5)
+    bucket.update({"X-RateLimit-Limit": "60", "X-RateLimit-Remaining": "0",
+                   "X-RateLimit-Reset": str(clock.time() + 30)})
+    assert bucket.rate == pytest.approx(55 / 60)  # the burst stays headroom
+    bucket.acquire()
+    assert clock.slept >= 30
+
+
+def test_retry_after_blocks_the_bucket(clock):
+    bucket = cmm.TokenBucket(per_minute=600, burst=5)
+    bucket.update({"Retry-After": "12"})
+    bucket.acquire()
+    assert clock.slept == pytest.approx(12, abs=0.2)
+
+
+def test_garbage_headers_are_ignored(clock):
+    bucket = cmm.TokenBucket(per_minute=60, burst=2)
+    bucket.update({"X-RateLimit-Limit": "n/a", "Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    assert bucket.rate == pytest.approx(1.0) and bucket.blocked_until == 0.0
+
+
+def test_bare_429_blocks_for_the_default_backoff(clock):
+    bucket = cmm.TokenBucket(per_minute=600, burst=5)
+    bucket.update({}, status=429)
+    bucket.acquire()
+    assert clock.slept == pytest.approx(cmm.RATE_LIMIT_BACKOFF, abs=0.2)
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        return FakeResponse(self.statuses.pop(0))
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self, host):
+        self.acquired += 1
+
+    def update(self, host, headers, status=None):
+        pass
+
+
+def test_every_5xx_retry_takes_a_token(clock):
+    limiter = CountingLimiter()
+    client = cmm.HttpClient(retries=3, limiter=limiter)
+    session = client._sessions["example.org"] = FakeSession([503, 502, 200])
+
+    assert client.get("https://example.org/api").status_code == 200
+    assert session.calls == limiter.acquired == 3
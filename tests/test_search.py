@@ -0,0 +1,156 @@
+"""Dump search: scoring branches and strategy parity on a fixed corpus"""
+import cbz_metadata_manager as cmm
+
+
+def score(query, title):
+    query_norm = cmm.normalize_romaji_cached(query)
+    return cmm.score_title_match(query_norm, set(query_norm.split()),
+                                 [(title, cmm.normalize_romaji_cached(title))])
+
+
+def test_shingle_branch_matches_spaceless_and_typo_titles():
+    for query in ("onepiece", "kimetsunoyaiba", "kimetsunoyaibq"):
+        title = "One Piece" if query == "onepiece" else "Kimetsu no Yaiba"
+        points, match_text, branch = score(query, title)
+        assert points >= cmm.MATCH_THRESHOLD, query
+        assert (match_text, branch) == (title, "shingle")
+
+
+def test_shingle_branch_leaves_unrelated_titles_alone():
+    points, _, branch = score("shingeki no kyojin", "Shingeki no Bahamut")
+    assert branch != "shingle"
+    assert score("naruto", "Boruto")[0] < cmm.MATCH_THRESHOLD
+
+
+def test_suffix_array_matches_brute_force():
+    keys = [cmm.normalize_romaji_cached(e["title"]) for e in PARITY_DUMP] + ["進撃の巨人", "a", "an"]
+    suffix_array = cmm.TitleSuffixArray(set(keys))
+    text = suffix_array.text
+    prefixes = [text[p:p + suffix_array.KEY_PREFIX] for p in suffix_array.suffixes]
+    assert prefixes == sorted(prefixes)
+    assert len(prefixes) == sum(len(key.replace(" ", "")) for key in set(keys))
+
+    for query in ("no", "kaisen", "tokyo ghoul re", "の巨", "boruto naruto next generations", "xyz"):
+        assert suffix_array.containing(query) == {key for key in keys if query in key}, query
+        assert suffix_array.contained_in(query, min_length=2) == {
+            key for key in keys if len(key) >= 2 and key in query}, query
+
+
+def test_phonetic_key_folds_romaji_only():
+    def key(title):
+        return cmm.phonetic_key(cmm.normalize_romaji_cached(title))
+
+    assert key("Sōsō no Furīren") == key("Soso no Furiren") == key("Sousou no Furiren")
+    assert key("Tokyo Ghoul:re") == key("Tokyo Ghoul re")
+    for english, other in (("Good Night", "God Night"), ("Shoot", "Shot"), ("Moon Light", "Mon Light")):
+        assert key(english) != key(other), english
+
+
+def test_phonetic_match_only_when_no_title_contains_the_term():
+    dump = [entry(1, "Soso no Furiren"), entry(2, "Sousou no Furiren Gaiden")]
+    engine = cmm.SearchEngine(cmm.DumpSearchIndex(dump))
+    results = engine.search("sousou no furiren")
+    assert (results[0][0]["id"], results[0][3]) == (2, "substring")
+    assert "phonetic" not in [m[3] for m in results]
+    assert [(m[0]["id"], m[3]) for m in engine.search("soso no furiren gaiden")][0] == (2, "phonetic")
+
+
+def test_get_dump_search_index_without_wait_builds_in_background(monkeypatch):
+    monkeypatch.setattr(cmm, "local_dump", [{"id": 1, "title": "One Piece"}])
+    monkeypatch.setattr(cmm, "_dump_search_index", None)
+    monkeypatch.setattr(cmm, "_dump_search_index_size", 0)
+
+    with cmm._dump_search_index_lock:  # a build in progress elsewhere
+        assert cmm.get_dump_search_index(wait=False) is None
+        builder = cmm._dump_search_index_builder
+        assert builder.is_alive()
+    builder.join(5)
+
+    index = cmm.get_dump_search_index(wait=False)
+    assert index is not None and index.exact_matches("one piece")
+    assert cmm.get_dump_search_index() is index
+
+
+def entry(entry_id, title, **fields):
+    return {"id": entry_id, "title": title, "state": "active", "type": "manga", **fields}
+
+
+PARITY_DUMP = [
+    entry(1, "One Piece", year=1997, secondary_titles={"en": [{"title": "One Piece Color Walk"}]}),
+    entry(2, "One Punch-Man", year=2012),
+    entry(3, "Shingeki no Kyojin", native_title="進撃の巨人", year=2009,
+          secondary_titles={"en": [{"title": "Attack on Titan"}]}),
+    entry(4, "Attack on Titan: Before the Fall", year=2013),
+    entry(5, "Shingeki no Bahamut: Genesis", year=2014),
+    entry(6, "Kimetsu no Yaiba", year=2016, secondary_titles={"en": [{"title": "Demon Slayer"}]}),
+    entry(7, "Kimetsu no Yaiba: Tomioka Giyuu Gaiden", year=2019),
+    entry(8, "Sousou no Frieren", year=2020, type="manga"),
+    entry(9, "Frieren Anthology", year=2022, type="anthology"),
+    {"id": 10, "title": "Sousou no Furiren", "state": "merged", "merged_with": 8},
+    entry(11, "Boku no Hero Academia", year=2014),
+    entry(12, "Boku no Hero Academia: Vigilantes", year=2016),
+    entry(13, "Tokyo Ghoul", year=2011),
+    entry(14, "Tokyo Ghoul:re", year=2014),
+    entry(15, "Tokyo Revengers", year=2017),
+    entry(16, "Chainsaw Man", year=2018),
+    entry(17, "Chainsaw Man: Buddy Stories", year=2021, type="anthology"),
+    entry(18, "Jujutsu Kaisen", year=2018),
+    entry(19, "Jujutsu Kaisen 0", year=2017),
+    entry(20, "Naruto", year=1999),
+    entry(21, "Boruto: Naruto Next Generations", year=2016),
+]
+
+PARITY_QUERIES = [
+    "One Piece", "one piece vol 3", "onepiece", "attack on titan", "shingeki", "kimetsunoyaiba",
+    "demon slayer", "Soso no Furiren", "frieren", "hero academia", "tokyo ghoul re", "tokyo",
+    "chainsaw", "jujutsu kaisen 0", "naruto", "boruto naruto", "man", "the fall of titan",
+    "kimetsu no yaibq", "jujutsukaisan", "tokyo revenger", "boku no hero", "chainsawman buddy",
+]
+
+
+def test_search_strategies_agree_on_fixed_corpus():
+    engine = cmm.SearchEngine(cmm.DumpSearchIndex(PARITY_DUMP), strategy="full_scan")
+    strategies = [name for name, cls in cmm.SEARCH_STRATEGIES.items() if cls.is_available()]
+    assert {"inverted", "fts", "vectorized", "full_scan"} <= set(strategies)
+
+    for filters in (None, {"type": ["manga"]}, {"year": (2015, None)}):
+        for query in PARITY_QUERIES:
+            expected = [(m[0]["id"], m[1]) for m in engine.search(query, filters, limit=5, strategy="full_scan")]
+            for name in strategies:
+                actual = [(m[0]["id"], m[1]) for m in engine.search(query, filters, limit=5, strategy=name)]
+                assert actual == expected, (name, query, filters)
+
+
+def test_shingle_index_is_only_built_for_searches_nothing_else_answers():
+    index = cmm.DumpSearchIndex(PARITY_DUMP)
+    engine = cmm.SearchEngine(index, strategy="inverted")
+    assert engine.search("tokyo ghoul re") and index._lsh is None
+
+    results = engine.search("jujutsukaisan")
+    assert index._lsh is not None
+    assert [(m[0]["id"], m[3]) for m in results] == [(18, "shingle"), (19, "shingle")]
+
+
+def test_full_scan_takes_near_duplicates_from_the_shared_index(monkeypatch):
+    index = cmm.DumpSearchIndex(PARITY_DUMP)
+    engine = cmm.SearchEngine(index)
+    monkeypatch.setattr(index, "similar_title_ids", lambda term: {19})  # as if banding missed 18
+
+    for name in ("full_scan", "inverted"):
+        assert [m[0]["id"] for m in engine.search("jujutsukaisan", strategy=name)] == [19], name
+
+
+def test_explain_times_tier_split_apart_from_scoring(monkeypatch):
+    engine = cmm.SearchEngine(cmm.DumpSearchIndex(PARITY_DUMP), strategy="inverted")
+    monkeypatch.setattr(cmm, "get_search_engine", lambda wait=True: engine)
+    trace = cmm.explain_search("tokyo ghoul re")
+
+    assert {"tier_split", "scoring", "ranking"} <= set(trace.timings)
+    assert trace.results == [m[0]["id"] for m in engine.search("tokyo ghoul re")]
+
+
+def test_fixed_corpus_top_results():
+    engine = cmm.SearchEngine(cmm.DumpSearchIndex(PARITY_DUMP))
+    top = {query: engine.search(query)[0][0]["id"]
+           for query in ("onepiece", "Soso no Furiren", "demon slayer", "tokyo ghoul re")}
+    assert top == {"onepiece": 1, "Soso no Furiren": 8, "demon slayer": 6, "tokyo ghoul re": 14}
@@ -0,0 +1,43 @@
+"""SeriesDatabase LRU cache: copies, invalidation on writes and the size bound"""
+import pytest
+
+import cbz_metadata_manager as cmm
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = cmm.SeriesDatabase(str(tmp_path / "series.db"))
+    for name in ("Alpha", "Beta", "Gamma"):
+        database.save_series_metadata(name, {"Series": name, "Genre": "Action"})
+    return database
+
+
+def test_repeated_loads_hit_the_cache_and_return_copies(db):
+    first = db.load_series_metadata("Alpha")
+    first["Genre"] = "changed by the caller"
+    assert db.load_series_metadata("Alpha")["Genre"] == "Action"
+    assert db.cache_stats()["hits"] >= 1
+
+
+def test_writes_invalidate_cached_values(db):
+    assert db.load_series_metadata("Alpha")["Genre"] == "Action"
+    assert db.load_series_aliases("Alpha") == []
+    db.save_series_metadata("Alpha", {"Series": "Alpha", "Genre": "Drama"})
+    db.save_series_aliases("Alpha", ["First"])
+    assert db.load_series_metadata("Alpha")["Genre"] == "Drama"
+    assert db.load_series_aliases("Alpha") == ["First"]
+
+
+def test_stale_reads_are_not_cached(db):
+    _, _, version = db._cache_get("Beta", "metadata")
+    db._cache_invalidate(["Beta"])  # a write landed between the read and the put
+    db._cache_put("Beta", "metadata", {"Series": "Beta", "Genre": "stale"}, version)
+    assert db.load_series_metadata("Beta")["Genre"] == "Action"
+
+
+def test_cache_is_bounded(db):
+    db.CACHE_SIZE = 2
+    for name in ("Alpha", "Beta", "Gamma"):
+        db.load_series_metadata(name)
+    assert db.cache_stats()["size"] == 2
+    assert "Alpha" not in db._cache
@@ -0,0 +1,97 @@
+"""SeriesDatabase search behaviour against a throwaway database"""
+import pytest
+
+import cbz_metadata_manager as cmm
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = cmm.SeriesDatabase(str(tmp_path / "series.db"))
+    for name in ("Toaru Kagaku no Railgun", "Zzaru Chronicles", "Saru Mountain"):
+        database.save_series_metadata(name, {"Series": name, "Publisher": "Test"})
+    database.save_series_aliases("Toaru Kagaku no Railgun", ["To Aru Kagaku no Railgun"])
+    return database
+
+
+def names(rows):
+    return sorted(row[0] for row in rows)
+
+
+def test_filter_series_applies_short_terms(db):
+    assert db.has_search_index
+    assert names(db.filter_series("aru")) == ["Saru Mountain", "Toaru Kagaku no Railgun", "Zzaru Chronicles"]
+    assert names(db.filter_series("zz aru")) == ["Zzaru Chronicles"]
+    assert names(db.filter_series("to aru")) == ["Toaru Kagaku no Railgun"]
+
+
+def test_filter_series_short_term_only_uses_like(db):
+    assert names(db.filter_series("sa")) == ["Saru Mountain"]
+
+
+def test_auto_learn_keeps_curated_templates(db, monkeypatch):
+    monkeypatch.setattr(cmm, "series_db", db)
+    db.save_series_metadata("Saru Mountain", {"Series": "Saru Mountain", "Publisher": "Curated", "Genre": "Drama"})
+
+    app = cmm.MetadataGUI.__new__(cmm.MetadataGUI)
+    app.file_metadata = {
+        "/tmp/Saru Mountain v01.cbz": {"Series": "Saru Mountain", "Publisher": "Per-file", "Volume": "1"},
+        "/tmp/Brand New Series v01.cbz": {"Series": "Brand New Series", "Publisher": "Fresh", "Volume": "1"},
+    }
+
+    assert app._learn_series_from_files(list(app.file_metadata)) == 1
+    assert db.load_series_metadata("Saru Mountain")["Publisher"] == "Curated"
+    assert db.load_series_metadata("Brand New Series")["Publisher"] == "Fresh"
+    assert db.load_series_metadata("Brand New Series")["Volume"] == ""
+
+
+def test_speculative_match_dropped_when_series_db_changes(db, monkeypatch):
+    monkeypatch.setattr(cmm, "series_db", db)
+    monkeypatch.setattr(cmm, "get_search_engine", lambda wait=True: None)
+    monkeypatch.setattr(cmm.MetadataGUI, "SPECULATIVE_PAUSE", 0)
+
+    app = cmm.MetadataGUI.__new__(cmm.MetadataGUI)
+    app._series_completer = app._series_exact_map = None
+    app._series_version = 0
+    app._speculative_cache = {}
+    app._speculative_generation = 1
+    find_best_match = app._find_best_match
+
+    def edited_meanwhile(title, all_series):
+        match = find_best_match(title, all_series)
+        app._invalidate_series_caches()  # the Tk thread saves a series mid-match
+        return match
+
+    app._find_best_match = edited_meanwhile
+    app._speculative_worker(1, ["/tmp/Saru Mountain v01.cbz"], None)
+
+    ready = app._speculative_cache["/tmp/Saru Mountain v01.cbz"]
+    assert ready["title"] == "Saru Mountain" and "series" not in ready
+
+
+def test_delete_resolution_forgets_only_that_title(db):
+    db.save_resolution("One Piece", entry_id=1)
+    db.save_resolution("Naruto", entry_id=20)
+
+    assert db.delete_resolution("one  piece ")
+    assert db.load_resolution("One Piece") is None
+    assert db.load_resolution("Naruto")["entry_id"] == "20"
+    assert not db.delete_resolution("One Piece")
+
+
+def test_metadata_column_migration_resumes(tmp_path):
+    path = str(tmp_path / "series.db")
+    database = cmm.SeriesDatabase(path)
+    database.save_series_metadata("Saru Mountain", {"Series": "Saru Mountain", "Genre": "Drama"})
+    conn = database._connect()
+    # As left by an interrupted run of an earlier build: one column gone, a LIKE-only column indexed
+    conn.execute("DROP INDEX idx_series_meta_anilist_id")
+    conn.execute("ALTER TABLE series_metadata DROP COLUMN meta_anilist_id")
+    conn.execute("CREATE INDEX idx_series_meta_genre ON series_metadata (meta_genre COLLATE NOCASE)")
+    conn.commit()
+
+    reopened = cmm.SeriesDatabase(path)
+    assert reopened.has_metadata_columns
+    indexes = {row[0] for row in reopened._connect().execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_series_meta_%'")}
+    assert indexes == {"idx_series_meta_publisher", "idx_series_meta_entry_id", "idx_series_meta_anilist_id"}
+    assert names(reopened.filter_series(genre="dram")) == ["Saru Mountain"]
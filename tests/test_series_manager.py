@@ -0,0 +1,61 @@
+"""Headless checks for SeriesManagerDialog's chunked tree fill (no display needed)"""
+import cbz_metadata_manager as cmm
+
+
+class StubTree:
+    def __init__(self):
+        self.rows = []
+
+    def get_children(self):
+        return list(range(len(self.rows)))
+
+    def delete(self, *items):
+        self.rows = []
+
+    def insert(self, parent, index, values=()):
+        self.rows.append(values)
+
+
+class StubVar:
+    def set(self, value):
+        self.value = value
+
+
+def make_dialog():
+    """A SeriesManagerDialog without a Tk window; idle callbacks are queued instead of run"""
+    dialog = cmm.SeriesManagerDialog.__new__(cmm.SeriesManagerDialog)
+    dialog.tree = StubTree()
+    dialog.status_var = StubVar()
+    dialog._fill_after = None
+    dialog.idle_queue = []
+    dialog.after_idle = lambda func, *args: dialog.idle_queue.append((func, args)) or len(dialog.idle_queue)
+    dialog.after_cancel = lambda after_id: None
+    return dialog
+
+
+def run_idle(dialog):
+    while dialog.idle_queue:
+        func, args = dialog.idle_queue.pop(0)
+        func(*args)
+
+
+def test_populate_tree_inserts_every_row_in_chunks():
+    dialog = make_dialog()
+    rows = [(f"Series {i}", "2024-01-02T03:04:05", [f"Alias {i}"]) for i in range(1200)]
+
+    dialog.populate_tree(rows)
+    assert len(dialog.tree.rows) == dialog.TREE_CHUNK_SIZE
+    assert len(dialog.idle_queue) == 1
+
+    run_idle(dialog)
+    assert len(dialog.tree.rows) == 1200
+    assert dialog.tree.rows[0] == ("Series 0", "Alias 0", "2024-01-02 03:04")
+    assert dialog.status_var.value == "1200 series"
+
+
+def test_populate_tree_replaces_previous_rows():
+    dialog = make_dialog()
+    dialog.populate_tree([("Old", None, [])])
+    dialog.populate_tree([("New", None, [])])
+    run_idle(dialog)
+    assert [row[0] for row in dialog.tree.rows] == ["New"]
@@ -0,0 +1,97 @@
+"""SeriesDatabase storage formats: codec round trips and migration between formats"""
+import sqlite3
+
+import cbz_metadata_manager as cmm
+
+LONG_SUMMARY = ("A quiet girl moves to the seaside town and joins the swimming club. " * 12).strip()
+
+
+def series_metadata(i):
+    return {"Series": f"Series {i}", "Publisher": "Test", "Summary": f"{LONG_SUMMARY} Part {i}.",
+            "Characters": ", ".join(f"Character {i}-{n}" for n in range(60)), "Year": "2020"}
+
+
+def raw_row(path, series_name):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT metadata_json, metadata_blob FROM series_metadata WHERE series_name = ?",
+                            (series_name,)).fetchone()
+
+
+def test_formats_round_trip(tmp_path):
+    for storage_format in ("compact", "zlib", "zlib-dict"):
+        path = str(tmp_path / f"{storage_format}.db")
+        db = cmm.SeriesDatabase(path, storage_format=storage_format)
+        db.save_series_metadata("Series 1", series_metadata(1))
+        reopened = cmm.SeriesDatabase(path, storage_format=storage_format)
+        assert reopened.load_series_metadata("Series 1") == series_metadata(1)
+
+        metadata_json, metadata_blob = raw_row(path, "Series 1")
+        if storage_format == "compact":
+            assert metadata_blob is None and LONG_SUMMARY[:40] in metadata_json
+        else:
+            assert metadata_blob is not None and LONG_SUMMARY[:40] not in metadata_json
+            assert '"Series":"Series 1"' in metadata_json  # fields read by SQL stay inline
+
+
+def test_migration_between_formats_keeps_every_value(tmp_path):
+    path = str(tmp_path / "series.db")
+    db = cmm.SeriesDatabase(path, storage_format="compact")
+    for i in range(cmm.SeriesDatabase.ZDICT_TRAIN_MIN_ROWS):
+        db.save_series_metadata(f"Series {i}", series_metadata(i))
+
+    packed = cmm.SeriesDatabase(path, storage_format="zlib-dict")
+    assert raw_row(path, "Series 3")[1][:1] == b"D"  # compressed with the trained dictionary
+    assert packed.load_series_metadata("Series 3") == series_metadata(3)
+
+    compact = cmm.SeriesDatabase(path, storage_format="compact")
+    assert raw_row(path, "Series 3")[1] is None
+    assert compact.load_series_metadata("Series 3") == series_metadata(3)
+    assert compact.filter_series(missing_field="Summary") == []
+
+
+def count_migrations(monkeypatch):
+    calls = []
+    migrate = cmm.SeriesDatabase.migrate_storage
+    monkeypatch.setattr(cmm.SeriesDatabase, "migrate_storage",
+                        lambda self, *args: calls.append(self.storage_format) or migrate(self, *args))
+    return calls
+
+
+def test_default_open_keeps_the_stored_format(tmp_path, monkeypatch):
+    path = str(tmp_path / "series.db")
+    cmm.SeriesDatabase(path, storage_format="zlib").save_series_metadata("Series 1", series_metadata(1))
+    calls = count_migrations(monkeypatch)
+
+    db = cmm.SeriesDatabase(path)
+    assert calls == [] and db.storage_format == "zlib"
+    db.save_series_metadata("Series 2", series_metadata(2))
+    assert raw_row(path, "Series 2")[1] is not None
+
+
+def test_default_format_is_compact_and_legacy_rows_are_not_rewritten(tmp_path, monkeypatch):
+    path = str(tmp_path / "series.db")
+    cmm.SeriesDatabase(path).save_series_metadata("Series 1", series_metadata(1))
+    assert raw_row(path, "Series 1")[1] is None
+    with sqlite3.connect(path) as conn:  # as written by builds before storage formats
+        conn.execute("DELETE FROM storage_meta")
+        conn.execute("UPDATE series_metadata SET metadata_json = ?", (cmm.json.dumps(series_metadata(1), indent=2),))
+    calls = count_migrations(monkeypatch)
+
+    db = cmm.SeriesDatabase(path)
+    assert calls == [] and db.storage_format == "compact"
+    assert "\n" in raw_row(path, "Series 1")[0]
+    assert db.load_series_metadata("Series 1") == series_metadata(1)
+
+
+def test_failed_dictionary_training_is_not_retried_on_every_open(tmp_path, monkeypatch):
+    path = str(tmp_path / "series.db")
+    db = cmm.SeriesDatabase(path, storage_format="zlib-dict")
+    # Long values without a single repeated word pair leave nothing to train on
+    for i in range(cmm.SeriesDatabase.ZDICT_TRAIN_MIN_ROWS):
+        db.save_series_metadata(f"Series {i}", {"Series": f"Series {i}",
+                                                "Summary": " ".join(f"w{i}x{n}" for n in range(200))})
+    calls = count_migrations(monkeypatch)
+
+    cmm.SeriesDatabase(path)
+    cmm.SeriesDatabase(path)
+    assert calls == ["zlib-dict"]  # one attempt, remembered for the next start